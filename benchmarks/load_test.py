@@ -0,0 +1,242 @@
+"""
+Load test - drives the API concurrently against a seeded offline backend
+
+Starts the app in-process on the local SQLite backend (DATA_BACKEND=local),
+seeds synthetic faculty data, then runs each scenario concurrently and
+reports throughput and p50/p95/p99 latency.
+
+Run:
+    python -m benchmarks.load_test --faculty 1000 --concurrency 16 --requests 200
+    python -m benchmarks.load_test --update-baseline      # record a new baseline
+    python -m benchmarks.load_test --scenarios login,export_excel
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port: int):
+    """Run uvicorn in a background thread and wait until it accepts requests"""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def build_scenarios(users: List[Dict], admin_token: str, faculty_tokens: List[str]) -> Dict[str, Callable]:
+    """
+    Build request factories keyed by scenario name.
+    Each factory returns (method, path, kwargs) for one request.
+    """
+    from benchmarks.seed import BENCH_PASSWORD, ACADEMIC_YEARS, DEPARTMENTS
+
+    admin = {"Authorization": f"Bearer {admin_token}"}
+
+    def faculty_headers():
+        return {"Authorization": f"Bearer {random.choice(faculty_tokens)}"}
+
+    return {
+        "login": lambda: ("POST", "/api/login", {
+            "json": {"email": random.choice(users)["email"], "password": BENCH_PASSWORD}}),
+        "faculty_dashboard": lambda: ("GET", "/api/faculty/all-data", {
+            "headers": faculty_headers(), "params": {"academic_year": random.choice(ACADEMIC_YEARS)}}),
+        "admin_dashboard": lambda: ("GET", "/api/admin/faculty", {"headers": admin}),
+        "faculty_bootstrap": lambda: ("GET", "/api/faculty/bootstrap", {"headers": faculty_headers()}),
+        "admin_bootstrap": lambda: ("GET", "/api/admin/bootstrap", {"headers": admin}),
+        "faculty_details": lambda: ("GET", f"/api/admin/faculty/{random.choice(users)['id']}", {
+            "headers": admin}),
+        "export_excel": lambda: ("GET", "/api/admin/export/all/excel", {
+            "headers": admin, "params": {"academic_year": random.choice(ACADEMIC_YEARS)}}),
+        "export_pdf": lambda: ("GET", "/api/admin/export/all/pdf", {
+            "headers": admin, "params": {"department": random.choice(DEPARTMENTS)}}),
+    }
+
+
+async def run_scenario(base_url: str, factory: Callable, total: int, concurrency: int) -> Dict:
+    """Fire `total` requests with at most `concurrency` in flight"""
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        async def one():
+            nonlocal errors
+            method, path, kwargs = factory()
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def compare_with_baseline(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a list of regression messages (empty when within tolerance)"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']}ms > baseline {base['p95_ms']}ms")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']} rps < baseline {base['throughput_rps']} rps")
+    return regressions
+
+
+def failed_scenarios(results: Dict) -> List[str]:
+    """Scenarios with failed requests; their timings measure error responses, not the endpoint"""
+    return [f"{name}: {r['errors']} of {r['requests']} requests failed"
+            for name, r in results["scenarios"].items() if r["errors"]]
+
+
+def print_report(results: Dict):
+    print(f"\n{'scenario':<20}{'reqs':>7}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print("-" * 75)
+    for name, r in results["scenarios"].items():
+        print(f"{name:<20}{r['requests']:>7}{r['errors']:>8}{r['throughput_rps']:>10}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the API against an offline backend")
+    parser.add_argument("--faculty", type=int, default=100, help="synthetic faculty count (100-10000)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--scenarios", default="", help="comma-separated subset of scenarios")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression ratio")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="write results JSON to this path")
+    args = parser.parse_args()
+
+    # Configure the offline backend before the app (and config) is imported
+    db_dir = tempfile.mkdtemp(prefix="fms-bench-")
+    os.environ["DATA_BACKEND"] = "local"
+    os.environ["LOCAL_DB_PATH"] = os.path.join(db_dir, "bench.db")
+    os.environ["LOCAL_STORAGE_DIR"] = os.path.join(db_dir, "storage")
+    os.environ["SHARED_CACHE_PATH"] = os.path.join(db_dir, "shared_cache.db")
+
+    import main as app_main
+    from database import supabase
+    from benchmarks.seed import seed, BENCH_PASSWORD, BENCH_ADMIN_EMAIL
+    import httpx
+
+    print(f"Seeding {args.faculty} faculty...")
+    users = seed(supabase, args.faculty)
+
+    port = _free_port()
+    server, thread = start_server(app_main.app, port)
+    base_url = f"http://127.0.0.1:{port}"
+
+    def token(email):
+        response = httpx.post(f"{base_url}/api/login", json={"email": email, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+    admin_token = token(BENCH_ADMIN_EMAIL)
+    faculty_tokens = [token(u["email"]) for u in random.sample(users, min(10, len(users)))]
+    scenarios = build_scenarios(users, admin_token, faculty_tokens)
+    if args.scenarios:
+        scenarios = {k: v for k, v in scenarios.items() if k in args.scenarios.split(",")}
+
+    results = {
+        "faculty": args.faculty,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "scenarios": {},
+    }
+    for name, factory in scenarios.items():
+        print(f"Running {name}...")
+        results["scenarios"][name] = asyncio.run(
+            run_scenario(base_url, factory, args.requests, args.concurrency))
+
+    server.should_exit = True
+    thread.join(timeout=10)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    failures = failed_scenarios(results)
+    for message in failures:
+        print(f"FAILED {message}")
+
+    if args.update_baseline:
+        if failures:
+            print("Baseline not written: fix the failing scenarios first.")
+            return 1
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --update-baseline to record one.")
+        return 1 if failures else 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if (baseline.get("faculty"), baseline.get("concurrency")) != (args.faculty, args.concurrency):
+        print("Baseline was recorded with different --faculty/--concurrency; skipping comparison.")
+        return 1 if failures else 0
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions or failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
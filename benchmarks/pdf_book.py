@@ -0,0 +1,75 @@
+"""
+Department faculty book benchmark - render time of the consolidated PDF
+as the department grows, compared with one document per faculty member
+
+Run: python -m benchmarks.pdf_book --faculty 500
+"""
+import argparse
+import random
+import time
+import uuid
+
+from benchmarks.seed import ACADEMIC_YEARS, ROW_FACTORIES
+from services.export_service import (
+    PROFILE_SECTIONS,
+    generate_department_book_pdf,
+    generate_faculty_pdf
+)
+
+DEPARTMENT = "Computer Science"
+
+
+def synthetic_faculty(count: int, rows_per_section: int, random_seed: int = 42) -> list:
+    """Build load_department_faculty-shaped data without a database"""
+    random.seed(random_seed)
+    faculty = []
+    counter = 0
+    for i in range(count):
+        user_id = str(uuid.uuid4())
+        data = {
+            "user": {"id": user_id, "name": f"Faculty {i:04d}", "email": f"faculty{i}@example.edu",
+                     "employee_id": f"EMP{i:05d}", "phone": f"98{i:08d}"},
+            "profile": [{"user_id": user_id, "name_prefix": "Dr.", "designation": "Professor",
+                         "department": DEPARTMENT}],
+            "previous_work": [{"institution": "Institute of Technology", "position_held": "Lecturer",
+                               "from_year": 2010, "to_year": 2015}],
+            "courses_taught": [{"si_no": n, "course_name": f"Course {n}"} for n in range(1, rows_per_section + 1)],
+            "pg_dissertations": [{"si_no": n, "student_name": f"Student {n}", "usn": f"2GI{n:05d}"}
+                                 for n in range(1, rows_per_section + 1)],
+        }
+        for table, factory in ROW_FACTORIES.items():
+            rows = []
+            for _ in range(rows_per_section):
+                counter += 1
+                rows.append({"user_id": user_id, "academic_year": random.choice(ACADEMIC_YEARS),
+                             **factory(counter, f"Synthetic {table.replace('_', ' ')} {counter}")})
+            data[table] = rows
+        faculty.append(data)
+    return faculty
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the department faculty book PDF")
+    parser.add_argument("--faculty", type=int, default=500, help="faculty members at the largest size")
+    parser.add_argument("--rows", type=int, default=3, help="rows per section per faculty member")
+    args = parser.parse_args()
+
+    faculty = synthetic_faculty(args.faculty, args.rows)
+    records = sum(len(data.get(key, [])) for data in faculty for key, _, _, _ in PROFILE_SECTIONS)
+    print(f"\nDepartment book ({args.faculty} faculty, {records} records, {len(PROFILE_SECTIONS) + 1} sections)")
+    print(f"{'faculty':>8}{'seconds':>10}{'ms/faculty':>12}{'MB':>8}")
+    for size in sorted({max(1, args.faculty // 5), max(1, args.faculty // 2), args.faculty}):
+        start = time.perf_counter()
+        pdf = generate_department_book_pdf(faculty[:size], DEPARTMENT)
+        elapsed = time.perf_counter() - start
+        print(f"{size:>8}{elapsed:>10.2f}{elapsed / size * 1000:>12.2f}{len(pdf) / 1e6:>8.2f}")
+
+    start = time.perf_counter()
+    for data in faculty:
+        generate_faculty_pdf(data)
+    elapsed = time.perf_counter() - start
+    print(f"\nOne document per faculty: {elapsed:.2f}s ({elapsed / len(faculty) * 1000:.2f} ms/faculty)")
+
+
+if __name__ == "__main__":
+    main()
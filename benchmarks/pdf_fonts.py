@@ -0,0 +1,90 @@
+"""
+PDF font benchmark - per-document cost of the embedded Unicode font,
+cached once per process, against core Helvetica and against parsing
+the TTF in every document (plain fpdf2 add_font)
+
+Run: python -m benchmarks.pdf_fonts --documents 50
+"""
+import argparse
+import logging
+import time
+
+from fpdf import FPDF
+
+from benchmarks.pdf_book import synthetic_faculty
+from services.export_service import FacultyPDF, render_faculty_profile
+from services.pdf_fonts import CORE_FAMILY, FONT_FAMILY, font_files
+
+# Titles pasted from publisher sites; core fonts can only approximate these
+UNICODE_TITLES = [
+    "Résumé of “smart” title parsing — a survey",
+    "Łukasiewicz logic … ≥ 5 cases ‐ revisited",
+    "Čapek’s robots: 20 years on – a retrospective",
+]
+
+
+class CorePDF(FacultyPDF):
+    def __init__(self):
+        FPDF.__init__(self)
+        self.base_font = CORE_FAMILY
+
+
+class UncachedPDF(FacultyPDF):
+    def __init__(self):
+        FPDF.__init__(self)
+        for style, path in font_files().items():
+            self.add_font(FONT_FAMILY, style, path)
+        self.base_font = FONT_FAMILY
+
+
+def render(pdf_class, data) -> int:
+    pdf = pdf_class()
+    pdf.add_page()
+    render_faculty_profile(pdf, data)
+    return len(pdf.output())
+
+
+def timed(pdf_class, documents) -> tuple:
+    start = time.perf_counter()
+    size = sum(render(pdf_class, data) for data in documents)
+    return time.perf_counter() - start, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedded PDF fonts")
+    parser.add_argument("--documents", type=int, default=50, help="single-faculty PDFs per variant")
+    parser.add_argument("--rows", type=int, default=3, help="rows per section per faculty member")
+    parser.add_argument("--rounds", type=int, default=3, help="interleaved rounds, best one is reported")
+    args = parser.parse_args()
+
+    if not font_files():
+        raise SystemExit("No readable PDF_FONT_PATH; nothing to compare against core fonts")
+    logging.getLogger("fpdf").setLevel(logging.ERROR)
+
+    documents = synthetic_faculty(args.documents, args.rows)
+    for i, data in enumerate(documents):
+        data["publications"][0]["title"] = UNICODE_TITLES[i % len(UNICODE_TITLES)]
+
+    # Pay the one-off parse before timing, as a warm worker would
+    start = time.perf_counter()
+    render(FacultyPDF, documents[0])
+    print(f"\nFirst document (parses fonts once per process): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    variants = {
+        "core Helvetica (Latin-1)": CorePDF,
+        "TTF, cached per process": FacultyPDF,
+        "TTF, parsed per document": UncachedPDF,
+    }
+    best = {name: (float("inf"), 0) for name in variants}
+    for _ in range(args.rounds):
+        for name, pdf_class in variants.items():
+            best[name] = min(best[name], timed(pdf_class, documents))
+
+    print(f"\n{args.documents} single-faculty PDFs (best of {args.rounds} rounds)")
+    print(f"{'variant':<28}{'ms/doc':>10}{'KB/doc':>10}")
+    for name, (elapsed, size) in best.items():
+        print(f"{name:<28}{elapsed / args.documents * 1000:>10.1f}{size / args.documents / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
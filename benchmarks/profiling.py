@@ -0,0 +1,100 @@
+"""
+Profiling check - a profiled export must show the export code
+
+Exports run in the threadpool, where the event-loop profiler of the
+middleware sees nothing but the await, and bulk exports produce their
+data while the response is streamed. Seeds an offline backend, requests
+the faculty summary spreadsheet and a bulk CSV with X-Profile: 1 and fails
+(exit 1) unless each stored speedscope profile contains the frame of the
+function that builds the file, or if an admin of another tenant can see
+the profiles.
+
+Run: python -m benchmarks.profiling --faculty 50
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+# Profiled path -> module and function that build the file, whose frame its profile must contain
+EXPORTS = {
+    "/api/admin/export/all/excel": ("export_service.py", "generate_all_faculty_excel"),
+    "/api/admin/export/bulk/faculty_profiles.csv": ("bulk_export.py", "stream_table_csv"),
+}
+OTHER_TENANT = "profiling-other"
+
+
+def offline_env(work_dir: str):
+    os.environ.update({
+        "DATA_BACKEND": "local",
+        "LOCAL_DB_PATH": os.path.join(work_dir, "profiling.db"),
+        "LOCAL_STORAGE_DIR": os.path.join(work_dir, "storage"),
+        "SHARED_CACHE_PATH": os.path.join(work_dir, "shared_cache.db"),
+        "PROFILING_ENABLED": "true",
+        "PROFILES_DIR": os.path.join(work_dir, "profiles"),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that profiled exports sample the export code")
+    parser.add_argument("--faculty", type=int, default=50, help="faculty members to seed")
+    args = parser.parse_args()
+
+    offline_env(tempfile.mkdtemp(prefix="fms-profiling-"))
+    # Configuration is read at import, so the app is imported after the environment is set
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+    from benchmarks import seed
+    from database import supabase
+    from config import DEFAULT_TENANT
+    from services.profiling_service import get_profile_path
+
+    seed.seed(supabase, args.faculty)
+    seed.seed(supabase, 1, tenant_id=OTHER_TENANT)
+    failed = False
+    with TestClient(app_main.app) as client:
+        headers = {**admin_headers(client, seed.BENCH_ADMIN_EMAIL, seed.BENCH_PASSWORD), "X-Profile": "1"}
+        names = []
+        for export_path, (expected_file, expected_function) in EXPORTS.items():
+            response = client.get(export_path, headers=headers)
+            name = response.headers.get("X-Profile-Id")
+            path = get_profile_path(DEFAULT_TENANT, name) if name else None
+            if response.status_code != 200 or path is None:
+                print(f"REGRESSION {export_path} answered {response.status_code} without a stored profile")
+                failed = True
+                continue
+            names.append(name)
+            failed |= not check_frames(export_path, name, path, expected_file, expected_function)
+
+        other = admin_headers(client, f"bench.admin@{seed.bench_domain(OTHER_TENANT)}", seed.BENCH_PASSWORD)
+        listed = {p["name"] for p in client.get("/api/admin/profiles", headers=other).json()["profiles"]}
+        leaked = [n for n in names if n in listed or client.get(f"/api/admin/profiles/{n}", headers=other).status_code != 404]
+        if leaked:
+            print(f"REGRESSION an admin of {OTHER_TENANT} can see {leaked}")
+            failed = True
+    return 1 if failed else 0
+
+
+def admin_headers(client, email: str, password: str) -> dict:
+    login = client.post("/api/login", json={"email": email, "password": password})
+    return {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+
+def check_frames(export_path: str, name: str, path: str, expected_file: str, expected_function: str) -> bool:
+    """Print the profile's frames from expected_file; False unless expected_function is among them"""
+    with open(path, encoding="utf-8") as f:
+        frames = json.load(f)["shared"]["frames"]
+    export_frames = sorted({frame["name"] for frame in frames if (frame.get("file") or "").endswith(expected_file)})
+    print(f"{name}: {len(frames)} frames, {len(export_frames)} from {expected_file}")
+    for frame_name in export_frames[:8]:
+        print(f"  {frame_name}")
+    if expected_function not in export_frames:
+        print(f"REGRESSION the profile of {export_path} has no {expected_file}:{expected_function} frame")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Synthetic data generator for benchmarks and offline development
+Run: python -m benchmarks.seed --faculty 1000
+"""
+import argparse
+import random
+from typing import Dict, List
+
+from config import DEFAULT_TENANT
+from services.auth_utils import hash_password
+
+DEPARTMENTS = [
+    "Computer Science", "Information Science", "Electronics & Communication",
+    "Electrical & Electronics", "Mechanical", "Civil", "Mathematics", "Physics"
+]
+DESIGNATIONS = ["Professor", "Associate Professor", "Assistant Professor"]
+ACADEMIC_YEARS = ["2022-2023", "2023-2024", "2024-2025", "2025-2026"]
+LEVELS = ["National", "International", "State"]
+
+BENCH_PASSWORD = "Bench@12345"
+BENCH_ADMIN_EMAIL = "bench.admin@example.edu"
+
+
+def bench_domain(tenant_id: str = DEFAULT_TENANT) -> str:
+    """Email domain of a tenant's synthetic users (emails are unique across tenants)"""
+    return "example.edu" if tenant_id == DEFAULT_TENANT else f"{tenant_id}.example.edu"
+
+
+ROW_FACTORIES = {
+    "publications": lambda n, title: {
+        "authors": "A. Author, B. Author", "title": title, "journal_name": "Journal of Benchmarks",
+        "issn_isbn": f"{1000 + n % 9000}-{n % 10000:04d}", "url": f"https://doi.org/10.1000/{n}"},
+    "book_publications": lambda n, title: {
+        "chapter_book_name": title, "level": random.choice(LEVELS), "editor_author": "C. Editor",
+        "issn_isbn": f"978-{n}"},
+    "awards": lambda n, title: {
+        "title": title, "awarding_agency": "Benchmark Society", "level": random.choice(LEVELS)},
+    "ict_creations": lambda n, title: {
+        "title": title, "content": "Lecture videos", "url": f"https://example.edu/ict/{n}"},
+    "research_guidance": lambda n, title: {
+        "number_enrolled": random.randint(0, 5), "thesis_submitted": random.randint(0, 2),
+        "degree_awarded": random.randint(0, 2)},
+    "research_projects": lambda n, title: {
+        "title": title, "agency": "DST", "period": "2 years", "investigator_type": "PI",
+        "grant_amount": round(random.uniform(1e5, 5e6), 2)},
+    "patents": lambda n, title: {"title": title, "patent_number": f"IN{n:08d}"},
+    "conferences": lambda n, title: {
+        "paper_title": title, "issn_isbn": f"979-{n}", "conference_details": "Benchmark Conf",
+        "level": random.choice(LEVELS)},
+    "seminars": lambda n, title: {"title": title, "details": "Two-day workshop"},
+    "lectures": lambda n, title: {"lecture_name": title, "location": "Bengaluru"},
+    "other_details": lambda n, title: {"details": title, "location": "Belagavi"},
+    "memberships": lambda n, title: {"details": "Life member", "institute": "ISTE", "date_period": "2020-"},
+}
+
+ACTIVITY_TABLES = list(ROW_FACTORIES)
+
+
+def seed(client, faculty_count: int, max_rows_per_year: int = 3, random_seed: int = 42,
+         tenant_id: str = DEFAULT_TENANT) -> List[Dict]:
+    """
+    Populate a data client with synthetic faculty and activity rows
+
+    Args:
+        client: Data client (any backend implementing table().insert())
+        faculty_count: Number of faculty members to create
+        max_rows_per_year: Upper bound of rows per activity table per year
+        random_seed: Seed for reproducible data sets
+        tenant_id: Tenant (institution) the rows belong to; created if missing.
+            Its admin is bench.admin@<bench_domain(tenant_id)>
+
+    Returns:
+        List of created faculty_users rows
+    """
+    random.seed(random_seed)
+    password_hash = hash_password(BENCH_PASSWORD)
+    domain = bench_domain(tenant_id)
+
+    client.table("tenants").upsert({"id": tenant_id, "name": tenant_id}, ignore_duplicates=True,
+                                   returning="minimal").execute()
+    client.table("admins").insert({
+        "tenant_id": tenant_id, "email": f"bench.admin@{domain}", "password_hash": password_hash,
+        "name": "Bench Admin", "is_active": True
+    }, returning="minimal").execute()
+
+    users = client.table("faculty_users").insert([
+        {"tenant_id": tenant_id, "email": f"faculty{i}@{domain}", "password_hash": password_hash,
+         "name": f"Faculty {i}", "employee_id": f"EMP{i:05d}", "phone": f"98{i:08d}", "is_active": True}
+        for i in range(faculty_count)
+    ]).execute().data
+
+    client.table("faculty_profiles").insert([
+        {"tenant_id": tenant_id, "user_id": u["id"], "name_prefix": "Dr.", "name": u["name"], "email": u["email"],
+         "employee_id": u["employee_id"], "designation": random.choice(DESIGNATIONS),
+         "department": random.choice(DEPARTMENTS)}
+        for u in users
+    ], returning="minimal").execute()
+
+    counter = 0
+    for table in ACTIVITY_TABLES:
+        rows = []
+        for u in users:
+            for year in ACADEMIC_YEARS:
+                for _ in range(random.randint(0, max_rows_per_year)):
+                    counter += 1
+                    title = f"Synthetic {table.replace('_', ' ')} {counter}"
+                    rows.append({"tenant_id": tenant_id, "user_id": u["id"], "academic_year": year,
+                                 **ROW_FACTORIES[table](counter, title)})
+        if rows:
+            client.table(table).insert(rows, returning="minimal").execute()
+
+    client.table("courses_taught").insert([
+        {"tenant_id": tenant_id, "user_id": u["id"], "si_no": 1, "course_name": "Data Structures"} for u in users
+    ], returning="minimal").execute()
+    return users
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the local backend with synthetic faculty data")
+    parser.add_argument("--faculty", type=int, default=100)
+    parser.add_argument("--rows-per-year", type=int, default=3)
+    parser.add_argument("--tenant", default=DEFAULT_TENANT)
+    args = parser.parse_args()
+
+    from database import supabase
+    created = seed(supabase, args.faculty, args.rows_per_year, tenant_id=args.tenant)
+    print(f"Seeded {len(created)} faculty (login password: {BENCH_PASSWORD})")
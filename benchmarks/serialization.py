@@ -0,0 +1,82 @@
+"""
+Serialization benchmark - JSON encoding CPU and bytes on the wire
+for a heavy faculty record (all 16 data tables populated)
+
+Run: python -m benchmarks.serialization --rows 60
+"""
+import argparse
+import gzip
+import json
+import time
+import uuid
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from routers.faculty import FacultyDataResponse
+
+
+def heavy_record(rows_per_table: int) -> dict:
+    """Build an all-data payload with `rows_per_table` rows in every table"""
+    user_id = str(uuid.uuid4())
+    row = {
+        "user_id": user_id, "si_no": 1, "academic_year": "2024-2025",
+        "title": "Design and analysis of a low-power approximate multiplier for edge inference",
+        "journal_name": "International Journal of Engineering Research", "issn_isbn": "2278-0181",
+        "url": "https://doi.org/10.1000/example", "file_url": None,
+        "created_at": "2025-08-14T09:12:44.120931+00:00",
+    }
+    return {
+        field: [{**row, "id": str(uuid.uuid4())} for _ in range(rows_per_table)]
+        for field in FacultyDataResponse.model_fields
+    }
+
+
+def timed(fn, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = fn()
+    return (time.perf_counter() - start) / iterations * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON encoders and compression for a heavy record")
+    parser.add_argument("--rows", type=int, default=60, help="rows per table")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    payload = heavy_record(args.rows)
+    adapter = TypeAdapter(FacultyDataResponse)
+
+    encoders = {
+        "jsonable_encoder + json": lambda: json.dumps(jsonable_encoder(payload)).encode(),
+        "pydantic dump_json": lambda: adapter.dump_json(adapter.validate_python(payload)),
+        "orjson (FastJSONResponse)": lambda: orjson.dumps(payload),
+    }
+    print(f"\nSerialization ({args.rows} rows x {len(payload)} tables)")
+    print(f"{'encoder':<30}{'ms':>10}{'bytes':>12}")
+    body = b""
+    for name, fn in encoders.items():
+        ms, body = timed(fn, args.iterations)
+        print(f"{name:<30}{ms:>10.2f}{len(body):>12}")
+
+    codecs = {
+        "identity": lambda: body,
+        "gzip (level 6)": lambda: gzip.compress(body, compresslevel=6),
+    }
+    try:
+        import brotli
+        codecs["brotli (quality 4)"] = lambda: brotli.compress(body, quality=4)
+    except ImportError:
+        pass
+
+    print("\nBytes on the wire")
+    print(f"{'encoding':<30}{'ms':>10}{'bytes':>12}")
+    for name, fn in codecs.items():
+        ms, encoded = timed(fn, args.iterations)
+        print(f"{name:<30}{ms:>10.2f}{len(encoded):>12}")
+
+
+if __name__ == "__main__":
+    main()
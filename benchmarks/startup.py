@@ -0,0 +1,162 @@
+"""
+Startup benchmark - import-time budget and time to live/ready
+
+Imports the app in fresh interpreters and fails (exit 1) when the median
+import time exceeds --budget-ms or when a library that must stay lazy is
+imported by `import main`. Then starts a server on an empty offline
+backend and reports how long /api/health/live and /api/health/ready take
+to answer 200, with the warm-up steps reported by readiness.
+
+Run: python -m benchmarks.startup --runs 5 --budget-ms 1000
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use (data client, exports); importing any of them at
+# startup puts their import cost on every worker boot
+LAZY_MODULES = ("supabase", "asyncpg", "openpyxl", "fpdf", "fontTools", "pyarrow")
+
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = time.perf_counter() - started\n"
+    f"lazy = [name for name in {LAZY_MODULES!r} if name in sys.modules]\n"
+    "print(json.dumps({'ms': elapsed * 1000, 'lazy_imported': lazy}))\n"
+)
+
+
+def offline_env(db_dir: str) -> Dict[str, str]:
+    return {
+        **os.environ,
+        "DATA_BACKEND": "local",
+        "LOCAL_DB_PATH": os.path.join(db_dir, "startup.db"),
+        "LOCAL_STORAGE_DIR": os.path.join(db_dir, "storage"),
+        "SHARED_CACHE_PATH": os.path.join(db_dir, "shared_cache.db"),
+    }
+
+
+def slowest_imports(importtime_output: str, count: int) -> List[tuple]:
+    """Top-level-ish modules by cumulative import time from -X importtime output"""
+    modules = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 2:
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def measure_imports(runs: int, env: Dict[str, str]) -> Dict:
+    samples = []
+    lazy_imported = set()
+    importtime = ""
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", IMPORT_PROBE], cwd=ROOT, env=env,
+                                capture_output=True, text=True, check=True)
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(probe["ms"])
+        lazy_imported.update(probe["lazy_imported"])
+        importtime = result.stderr
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "min_ms": round(min(samples), 1),
+        "max_ms": round(max(samples), 1),
+        "lazy_imported": sorted(lazy_imported),
+        "slowest": slowest_imports(importtime, 8),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url: str, deadline: float) -> Optional[httpx.Response]:
+    while time.monotonic() < deadline:
+        try:
+            response = httpx.get(url, timeout=1)
+            if response.status_code == 200:
+                return response
+        except httpx.TransportError:
+            pass
+        time.sleep(0.02)
+    return None
+
+
+def measure_server(env: Dict[str, str], timeout: float) -> Dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env)
+    try:
+        deadline = started + timeout
+        live = _wait_for(f"{base_url}/api/health/live", deadline)
+        live_s = time.monotonic() - started
+        ready = _wait_for(f"{base_url}/api/health/ready", deadline)
+        ready_s = time.monotonic() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return {
+        "live_s": round(live_s, 3) if live else None,
+        "ready_s": round(ready_s, 3) if ready else None,
+        "readiness": ready.json() if ready else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app import time and time to ready")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to import the app in")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="maximum median import time")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for readiness")
+    parser.add_argument("--skip-server", action="store_true", help="only check the import budget")
+    args = parser.parse_args()
+
+    env = offline_env(tempfile.mkdtemp(prefix="fms-startup-"))
+    imports = measure_imports(args.runs, env)
+    print(f"import main: median {imports['median_ms']}ms "
+          f"(min {imports['min_ms']}, max {imports['max_ms']}, budget {args.budget_ms:g}ms)")
+    for cumulative_ms, name in imports["slowest"]:
+        print(f"  {cumulative_ms:>8.1f}ms  {name}")
+
+    if not args.skip_server:
+        server = measure_server(env, args.timeout)
+        print(f"live after {server['live_s']}s, ready after {server['ready_s']}s")
+        if server["readiness"]:
+            for name, step in server["readiness"]["warmup"]["steps"].items():
+                print(f"  warm-up {name:<18}{step['ms']:>8}ms{'  ' + step['error'] if 'error' in step else ''}")
+            for name, check in server["readiness"]["checks"].items():
+                print(f"  check   {name:<18}{check.get('latency_ms', check.get('detail'))}")
+
+    failures = []
+    if imports["median_ms"] > args.budget_ms:
+        failures.append(f"median import time {imports['median_ms']}ms > budget {args.budget_ms:g}ms")
+    if imports["lazy_imported"]:
+        failures.append(f"imported at startup: {', '.join(imports['lazy_imported'])}")
+    if not args.skip_server and server["ready_s"] is None:
+        failures.append(f"not ready within {args.timeout:g}s")
+    for message in failures:
+        print(f"REGRESSION {message}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
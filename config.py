@@ -1,11 +1,26 @@
 """
 Configuration module - loads environment variables
 """
+import hashlib
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Data backend: "supabase" (default), "postgres" (direct asyncpg pool)
+# or "local" (in-process SQLite stand-in)
+DATA_BACKEND = os.getenv("DATA_BACKEND", "supabase")
+LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", "local.db")
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", "local_storage")
+
+# Direct Postgres (use Supabase's session-mode connection string; transaction
+# pooling on port 6543 does not support prepared statements)
+DATABASE_URL = os.getenv("DATABASE_URL")
+PG_POOL_MIN_SIZE = int(os.getenv("PG_POOL_MIN_SIZE", "2"))
+PG_POOL_MAX_SIZE = int(os.getenv("PG_POOL_MAX_SIZE", "10"))
+PG_STATEMENT_CACHE_SIZE = int(os.getenv("PG_STATEMENT_CACHE_SIZE", "256"))
+
 # Supabase
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
@@ -19,4 +34,147 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 # JWT
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "default-secret-key")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-JWT_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "1440"))
+# Access tokens are short-lived; sessions are kept alive with rotating refresh tokens
+JWT_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# A refresh token presented again this soon after its rotation (another
+# tab, a retried request) gets the same successor instead of counting as reuse
+REFRESH_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_REUSE_GRACE_SECONDS", "10"))
+
+# Request profiling (opt-in)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_EVERY = int(os.getenv("PROFILING_SAMPLE_EVERY", "0"))
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.001"))
+PROFILES_DIR = os.getenv("PROFILES_DIR", "profiles")
+PROFILES_RETENTION = int(os.getenv("PROFILES_RETENTION", "50"))
+
+# Templates: re-render pages on every request (development only)
+TEMPLATE_HOT_RELOAD = os.getenv("TEMPLATE_HOT_RELOAD", "false").lower() == "true"
+
+# Response compression (gzip/brotli) for bodies at least this many bytes
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Admission control: per route class "concurrency:queue" limits.
+# Classes: auth, faculty, admin, export (see services/admission.py)
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+ADMISSION_LIMITS = {
+    name: tuple(int(n) for n in limits.split(":"))
+    for name, limits in (
+        item.split("=") for item in os.getenv(
+            "ADMISSION_LIMITS", "auth=32:256,faculty=32:128,admin=16:64,export=2:8"
+        ).split(",")
+    )
+}
+# Per tenant "concurrency:queue" limits inside a class, so one institution
+# cannot take every slot of it (classes not listed are shared freely).
+# Off by default: on a single-tenant install a share only caps the one
+# tenant below the class limit. Multi-tenant hosts set e.g.
+# "export=1:4,admin=8:32".
+ADMISSION_TENANT_LIMITS = {
+    name: tuple(int(n) for n in limits.split(":"))
+    for name, limits in (
+        item.split("=") for item in os.getenv("ADMISSION_TENANT_LIMITS", "").split(",")
+        if item
+    )
+}
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+
+# Analytics: seconds the department rollups are served from memory
+ANALYTICS_CACHE_SECONDS = int(os.getenv("ANALYTICS_CACHE_SECONDS", "30"))
+
+# Sync change feed: rows per table per page, and how far behind "now" the
+# feed stops so writes from in-flight transactions are never skipped
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "500"))
+SYNC_SAFETY_LAG_SECONDS = int(os.getenv("SYNC_SAFETY_LAG_SECONDS", "5"))
+
+# Bulk CSV/Parquet export: rows fetched per keyset batch
+BULK_EXPORT_BATCH_SIZE = int(os.getenv("BULK_EXPORT_BATCH_SIZE", "1000"))
+
+# PDF exports: Unicode TTF fonts embedded (subsetted) in every document.
+# Bold/italic fall back to the regular file; with no readable regular file
+# the core Helvetica font is used and text is reduced to Latin-1.
+# PDF_FALLBACK_FONTS: comma-separated TTFs for scripts the body font lacks
+PDF_FONT_PATH = os.getenv("PDF_FONT_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf")
+PDF_FONT_BOLD_PATH = os.getenv("PDF_FONT_BOLD_PATH", "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf")
+PDF_FONT_ITALIC_PATH = os.getenv("PDF_FONT_ITALIC_PATH", "")
+PDF_FALLBACK_FONTS = [path for path in os.getenv("PDF_FALLBACK_FONTS", "").split(",") if path]
+
+# Multi-worker serving (gunicorn.conf.py): worker processes, defaulting to
+# one per core. Admission limits and connection pools apply per worker.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1
+
+# Cross-worker cache (SQLite, see services/shared_cache.py): revoked tokens,
+# lookup lists, analytics rollups, idempotency replays and the event log.
+# Keep it on local disk or tmpfs. The default file is named after the app
+# directory, so other deployments on the host (a staging copy, a
+# benchmark) do not share it; manage.py run from the same directory does.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", os.path.join(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+    f"faculty_shared_cache_{hashlib.sha256(APP_DIR.encode()).hexdigest()[:12]}.db"
+))
+LOOKUP_CACHE_SECONDS = int(os.getenv("LOOKUP_CACHE_SECONDS", "60"))
+
+# In-memory faculty directory (services/faculty_directory.py): seconds
+# between incremental polls, and the oldest snapshot a read may be served
+# from before it polls inline
+DIRECTORY_POLL_SECONDS = float(os.getenv("DIRECTORY_POLL_SECONDS", "2"))
+DIRECTORY_MAX_STALENESS_SECONDS = float(os.getenv("DIRECTORY_MAX_STALENESS_SECONDS", "10"))
+
+# Publication de-duplication index (services/work_index.py): estimated
+# title similarity at which two entries count as the same work, and the
+# replica's poll interval and staleness bound
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.75"))
+WORK_INDEX_POLL_SECONDS = float(os.getenv("WORK_INDEX_POLL_SECONDS", "10"))
+WORK_INDEX_MAX_STALENESS_SECONDS = float(os.getenv("WORK_INDEX_MAX_STALENESS_SECONDS", "60"))
+
+# Idempotency-Key handling for writes (services/idempotency.py): how long
+# a completed response is replayed to retries, and how long a running
+# request holds its key before a retry may run it again
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "3600"))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+
+# Multi-institution mode: tenant of tokens issued before tenants existed
+# and of single-institution installs
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "default")
+
+# Server-Sent Events (services/event_bus.py): events kept in the shared log
+# for other workers and for reconnecting clients (Last-Event-ID), how often
+# a worker with open streams tails that log, per-stream buffer, keepalive
+# interval, open streams per worker, and the minimum gap between two
+# progress events of one export
+EVENTS_RETENTION_SECONDS = int(os.getenv("EVENTS_RETENTION_SECONDS", "300"))
+EVENTS_RELAY_POLL_SECONDS = float(os.getenv("EVENTS_RELAY_POLL_SECONDS", "0.25"))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_HEARTBEAT_SECONDS = int(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+EVENTS_MAX_STREAMS = int(os.getenv("EVENTS_MAX_STREAMS", "500"))
+EXPORT_PROGRESS_INTERVAL_SECONDS = float(os.getenv("EXPORT_PROGRESS_INTERVAL_SECONDS", "0.25"))
+
+# Startup and health probes (services/lifecycle.py): readiness checks that
+# must pass for /api/health/ready to return 200 (the others are reported
+# only), the timeout of each check, and how long a worker reuses its last
+# check results so frequent probes do not load the database or SMTP server
+READINESS_REQUIRED_CHECKS = [name.strip() for name in os.getenv("READINESS_REQUIRED_CHECKS", "database").split(",")
+                             if name.strip()]
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "2"))
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", "5"))
+
+# Cold archive (services/archive_service.py): Parquet snapshots of closed
+# academic years written by `python -m manage archive`, one folder per
+# tenant and year
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+
+# Password hashing (services/password_policy.py): the scheme for new
+# hashes (bcrypt, or argon2 with argon2-cffi installed) and the verify
+# time its cost is calibrated to on this host. The calibration is kept in
+# PASSWORD_POLICY_FILE and redone when that file was made on other
+# hardware or for other settings (set PASSWORD_HASH_CALIBRATE=false to use
+# the library defaults instead). Stored hashes with other parameters or a
+# lower cost are rehashed on the user's next successful login.
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+PASSWORD_HASH_CALIBRATE = os.getenv("PASSWORD_HASH_CALIBRATE", "true").lower() == "true"
+PASSWORD_POLICY_FILE = os.getenv("PASSWORD_POLICY_FILE", "password_policy.json")
+PASSWORD_ARGON2_MEMORY_KIB = int(os.getenv("PASSWORD_ARGON2_MEMORY_KIB", "65536"))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "2"))
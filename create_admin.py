@@ -4,6 +4,7 @@ Run: python create_admin.py
 """
 import sys
 import getpass
+from config import DEFAULT_TENANT
 from database import supabase
 from services.auth_utils import hash_password
 
@@ -31,6 +32,16 @@ def create_admin():
         print(f"Error: Admin with email '{email}' already exists")
         sys.exit(1)
     
+    # Institution the admin manages (created on first use)
+    tenant_id = input(f"Enter institution (tenant) id [{DEFAULT_TENANT}]: ").strip() or DEFAULT_TENANT
+    tenant = supabase.table("tenants").select("id").eq("id", tenant_id).execute()
+    tenant_name = None
+    if not tenant.data:
+        tenant_name = input(f"New institution '{tenant_id}', enter its name: ").strip()
+        if not tenant_name:
+            print("Error: Institution name is required")
+            sys.exit(1)
+    
     # Get password
     password = getpass.getpass("Enter password: ")
     if len(password) < 6:
@@ -46,7 +57,11 @@ def create_admin():
     hashed = hash_password(password)
     
     try:
+        if tenant_name:
+            supabase.table("tenants").insert({"id": tenant_id, "name": tenant_name}, returning="minimal").execute()
+        
         result = supabase.table("admins").insert({
+            "tenant_id": tenant_id,
             "email": email,
             "password_hash": hashed,
             "name": name,
@@ -59,6 +74,7 @@ def create_admin():
             print("="*50)
             print(f"\n   Name:  {name}")
             print(f"   Email: {email}")
+            print(f"   Institution: {tenant_id}")
             print("\n   You can now login at /templates/login.html")
             print("="*50 + "\n")
         else:
@@ -1,14 +1,174 @@
 """
-Database module - Supabase client initialization
+Database module - data client initialization
+
+The data client is created lazily in the process that uses it. Under
+gunicorn the app is imported once in the master and then forked; a
+client built at import time would share its sockets, connection pool
+and event-loop thread with every worker. The proxy below builds one
+client per process on first use instead, and supabase-py itself is only
+imported then, so importing the app stays cheap.
 """
-from supabase import create_client, Client
-from config import SUPABASE_URL, SUPABASE_KEY
+import os
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+from config import (
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    DATA_BACKEND,
+    LOCAL_DB_PATH,
+    LOCAL_STORAGE_DIR,
+    DATABASE_URL,
+    PG_POOL_MIN_SIZE,
+    PG_POOL_MAX_SIZE,
+    PG_STATEMENT_CACHE_SIZE
+)
+
+if TYPE_CHECKING:
+    from supabase import Client
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
     """Create and return Supabase client"""
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError("Supabase URL and Key must be set in environment variables")
+    # supabase-py (httpx, gotrue, realtime, storage) is most of the app's import
+    # time; the offline and Postgres backends never need it
+    from supabase import create_client
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Global client instance
-supabase: Client = get_supabase_client()
+
+def get_client():
+    """Create the data client for the configured DATA_BACKEND"""
+    if DATA_BACKEND == "local":
+        from services.local_backend import LocalClient
+        return LocalClient(LOCAL_DB_PATH, LOCAL_STORAGE_DIR)
+    if DATA_BACKEND == "postgres":
+        from services.postgres_backend import PostgresClient
+        if not DATABASE_URL:
+            raise ValueError("DATABASE_URL must be set for the postgres backend")
+        # Profile photos still live in Supabase Storage
+        storage = get_supabase_client().storage if SUPABASE_URL and SUPABASE_KEY else None
+        return PostgresClient(
+            DATABASE_URL,
+            min_size=PG_POOL_MIN_SIZE,
+            max_size=PG_POOL_MAX_SIZE,
+            statement_cache_size=PG_STATEMENT_CACHE_SIZE,
+            storage=storage
+        )
+    if DATA_BACKEND != "supabase":
+        raise ValueError(f"Unknown DATA_BACKEND: {DATA_BACKEND}")
+    return get_supabase_client()
+
+
+def fetch_all(build_query: Callable, page_size: int = 1000) -> List[Dict]:
+    """
+    Fetch every row of a query, paging past PostgREST's max-rows limit
+
+    Args:
+        build_query: Callable returning a fresh, filtered and ordered query
+        page_size: Rows per request
+
+    Returns:
+        All matching rows
+    """
+    rows = []
+    start = 0
+    while True:
+        page = build_query().range(start, start + page_size - 1).execute().data
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+def runs_queries_concurrently() -> bool:
+    """Whether independent queries gain from running at once (the SQLite client runs one at a time)"""
+    return DATA_BACKEND != "local"
+
+
+class ClientProxy:
+    """Forwards attribute access to a data client created once per process"""
+
+    def __init__(self, factory: Callable):
+        self._factory = factory
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _reset_after_fork(self):
+        # The parent's client (and possibly a held lock) must not be reused
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The client of the current process, created on first call"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._client = self._factory()
+                    self._pid = os.getpid()
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+# Global client instance (one real client per process)
+supabase: "Client" = ClientProxy(get_client)
+os.register_at_fork(after_in_child=supabase._reset_after_fork)
+
+
+class TenantTable:
+    """Query entry point that scopes every statement to one tenant"""
+
+    def __init__(self, client, table: str, tenant_id: str):
+        self._client = client
+        self._table = table
+        self._tenant_id = tenant_id
+
+    def _with_tenant(self, data):
+        if isinstance(data, list):
+            return [{**row, "tenant_id": self._tenant_id} for row in data]
+        return {**data, "tenant_id": self._tenant_id}
+
+    def select(self, *args, **kwargs):
+        return self._client.table(self._table).select(*args, **kwargs).eq("tenant_id", self._tenant_id)
+
+    def insert(self, data, **kwargs):
+        return self._client.table(self._table).insert(self._with_tenant(data), **kwargs)
+
+    def upsert(self, data, **kwargs):
+        return self._client.table(self._table).upsert(self._with_tenant(data), **kwargs)
+
+    def update(self, data, **kwargs):
+        # tenant_id itself is never changed through a scoped client
+        data = {key: value for key, value in data.items() if key != "tenant_id"}
+        return self._client.table(self._table).update(data, **kwargs).eq("tenant_id", self._tenant_id)
+
+    def delete(self, **kwargs):
+        return self._client.table(self._table).delete(**kwargs).eq("tenant_id", self._tenant_id)
+
+
+class TenantClient:
+    """The process's data client restricted to one tenant's rows"""
+
+    def __init__(self, tenant_id: str):
+        self.tenant_id = tenant_id
+
+    def table(self, name: str) -> TenantTable:
+        return TenantTable(supabase, name, self.tenant_id)
+
+    @property
+    def storage(self):
+        return supabase.storage
+
+
+def for_tenant(tenant_id: str) -> TenantClient:
+    """
+    Data client whose reads, updates and deletes only see one tenant's rows
+    and whose inserts and upserts are stamped with it
+
+    Args:
+        tenant_id: The tenant resolved from the request's access token (tid claim)
+    """
+    return TenantClient(tenant_id)
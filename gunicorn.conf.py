@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration - production serving with one worker per core
+
+Run: gunicorn -c gunicorn.conf.py main:app
+(WEB_CONCURRENCY overrides the worker count; `python main.py` stays the
+single-process development server)
+"""
+from config import WEB_CONCURRENCY
+
+bind = "0.0.0.0:8000"
+workers = WEB_CONCURRENCY
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Import the app once in the master so workers fork with code, rendered
+# pages and parsed PDF fonts already loaded (when_ready below). Data
+# clients and shared cache connections are opened per worker after the
+# fork (see database.py and services/lifecycle.py).
+preload_app = True
+
+# PDF books and bulk exports stream for a while on large departments
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Render pages and parse PDF fonts once in the master, before workers fork"""
+    import main
+
+    main.lifecycle.preload(main.page_cache)
@@ -1,23 +1,46 @@
 """
 Faculty Management System - Main FastAPI Application
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 import os
 
+from config import PROFILING_ENABLED, TEMPLATE_HOT_RELOAD, COMPRESSION_MIN_SIZE, ADMISSION_CONTROL_ENABLED
+from services.asset_pipeline import AssetStaticFiles, asset_url
+from services.template_cache import TemplateCache
+from services.responses import FastJSONResponse
+from services.compression import CompressionMiddleware
+from services.idempotency import IdempotencyMiddleware
+from services.lifecycle import lifecycle
+
 # Import routers
-from routers import auth, faculty, admin
+from routers import auth, faculty, admin, events
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm this worker (data client, replicas, lookups, pages, PDF fonts) in the
+    # background; /api/health/ready reports 503 until it is done
+    lifecycle.start(page_cache)
+    yield
+    lifecycle.stop()
+
 
 # Create FastAPI app
 app = FastAPI(
     title="Faculty Management System",
     description="Engineering College Faculty Information Management System",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
+# Retried writes with an Idempotency-Key replay the first response (innermost,
+# so stored bodies are uncompressed and replays still get CORS headers)
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -27,38 +50,60 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# gzip/brotli for JSON and HTML above the size threshold
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
+# Opt-in request profiling
+if PROFILING_ENABLED:
+    from services.profiling_service import profile_request
+    app.middleware("http")(profile_request)
+
+# Per route class concurrency limits (outermost, so rejected requests stay cheap)
+if ADMISSION_CONTROL_ENABLED:
+    from services.admission import AdmissionControlMiddleware, admission_controller
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
+# Mount static files (fingerprinted build output under /static/dist is cached immutably)
+app.mount("/static", AssetStaticFiles(directory="static"), name="static")
 
 # Templates
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = asset_url
+page_cache = TemplateCache(templates, hot_reload=TEMPLATE_HOT_RELOAD)
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(faculty.router)
 app.include_router(admin.router)
+app.include_router(events.router)
 
 
 # Template routes
 @app.get("/", response_class=HTMLResponse)
 async def root(request: Request):
     """Redirect to login page"""
-    return templates.TemplateResponse("login.html", {"request": request})
+    return page_cache.response(request, "login.html")
 
 
 @app.get("/templates/{template_name}", response_class=HTMLResponse)
 async def serve_template(request: Request, template_name: str):
-    """Serve HTML templates"""
-    try:
-        return templates.TemplateResponse(template_name, {"request": request})
-    except Exception:
-        return HTMLResponse(content="Template not found", status_code=404)
+    """Serve HTML templates (pre-rendered once, see services/template_cache.py)"""
+    return page_cache.response(request, template_name)
 
 
-# Health check
+# Health checks
 @app.get("/api/health")
-async def health_check():
-    return {"status": "healthy", "message": "Faculty Management System is running"}
+@app.get("/api/health/live")
+async def liveness():
+    """Liveness: the process serves requests (touches no dependency)"""
+    return lifecycle.liveness()
+
+
+@app.get("/api/health/ready")
+async def readiness():
+    """Readiness: warmed up, with measured database/storage/SMTP latency"""
+    status_code, body = await lifecycle.readiness()
+    return FastJSONResponse(body, status_code=status_code, headers={"Cache-Control": "no-store"})
 
 
 if __name__ == "__main__":
@@ -0,0 +1,334 @@
+"""
+Management CLI - offline batch jobs and admin setup
+Run: python -m manage reports --tenant all --year 2025-2026 --dept all --format pdf,xlsx --jobs 8
+     python -m manage archive --year 2019-2020
+     python -m manage partition
+     python -m manage calibrate-passwords --scheme argon2 --target-ms 250
+     python -m manage create-admin
+
+`reports` builds every tenant x department x academic year report outside
+web traffic: the department faculty book (PDF) and the faculty summary
+spreadsheet (Excel), rendered by services/export_service in a process
+pool, into one output folder per tenant (reports/<tenant>/). Each output
+is recorded in that folder's manifest with a fingerprint of its
+inputs (the department's faculty and their data versions, see
+migrations/004_data_versions.sql, plus the report code), and is skipped
+on the next run if that fingerprint has not changed.
+
+`archive` moves closed academic years of every tenant out of the
+partitioned activity tables into Parquet snapshots (see
+services/archive_service.py); `partition` gives academic years still in
+the default partitions a partition of their own. `calibrate-passwords`
+measures this host and stores the password hashing cost that meets the
+target verify time (see services/password_policy.py).
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from config import PASSWORD_HASH_SCHEME, PASSWORD_HASH_TARGET_MS
+from database import supabase, for_tenant, fetch_all
+
+REPORT_FORMATS = ("pdf", "xlsx")
+MANIFEST_NAME = ".manifest.json"
+
+# Source files whose changes alter report output
+REPORT_SOURCES = ("services/export_service.py", "services/pdf_fonts.py", "services/work_index.py",
+                  "services/archive_service.py", "routers/admin.py", "manage.py")
+
+# (format, tenant, department, academic year, output path)
+Job = Tuple[str, str, str, str, str]
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", value).strip("_")
+
+
+def report_filename(report_format: str, department: str, academic_year: str) -> str:
+    if report_format == "pdf":
+        return f"faculty_book_{_slug(department)}_{academic_year}.pdf"
+    return f"faculty_summary_{_slug(department)}_{academic_year}.xlsx"
+
+
+def _code_version() -> str:
+    root = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for path in REPORT_SOURCES:
+        with open(os.path.join(root, path), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def input_fingerprints(tenant_id: str, departments: List[str]) -> Dict[str, str]:
+    """
+    Digest of everything a tenant's department reports are built from
+
+    Any write to a faculty member's rows bumps their data version, so the
+    sorted (faculty id, version) pairs of a department change exactly when
+    one of its reports could.
+    """
+    from services.faculty_directory import directory
+
+    db = for_tenant(tenant_id)
+    versions = {row["user_id"]: row["version"]
+                for row in fetch_all(lambda: db.table("data_versions").select("user_id, version").order("user_id"))}
+    code_version = _code_version()
+    fingerprints = {}
+    for department in departments:
+        members = sorted((record.id, versions.get(record.id, 0))
+                         for record in directory.list(tenant_id, department=department))
+        payload = json.dumps([code_version, tenant_id, department, members]).encode()
+        fingerprints[department] = hashlib.sha256(payload).hexdigest()
+    return fingerprints
+
+
+def build_report(job: Job) -> Tuple[Job, int, float]:
+    """Render one report into place (runs in a pool worker)"""
+    from routers.admin import load_department_faculty, load_faculty_summary_rows
+    from services.export_service import generate_all_faculty_excel, generate_department_book_pdf
+    from services.faculty_directory import directory
+    from services.work_index import work_index
+
+    report_format, tenant_id, department, academic_year, path = job
+    start = time.perf_counter()
+    if report_format == "pdf":
+        content = generate_department_book_pdf(load_department_faculty(tenant_id, department, academic_year),
+                                               department, academic_year)
+    else:
+        user_ids = {record.id for record in directory.list(tenant_id, department=department)}
+        content = generate_all_faculty_excel(load_faculty_summary_rows(tenant_id, academic_year, department),
+                                             academic_year, work_index.unique_counts(tenant_id, academic_year, user_ids))
+
+    # Readers of the output directory never see a half-written file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+    return job, len(content), time.perf_counter() - start
+
+
+def _load_manifest(output_dir: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(output_dir: str, manifest: Dict[str, str]):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def _select(requested: str, available: List[str], label: str) -> List[str]:
+    if requested == "all":
+        return available
+    selected = [value.strip() for value in requested.split(",") if value.strip()]
+    unknown = [value for value in selected if value not in available]
+    if unknown:
+        raise SystemExit(f"Unknown {label}: {', '.join(unknown)} (known: {', '.join(available)})")
+    return selected
+
+
+def _warm_fonts():
+    """Parse the PDF fonts once so forked workers inherit them"""
+    from fpdf import FPDF
+    from services.pdf_fonts import register_fonts
+
+    register_fonts(FPDF())
+
+
+def _tenants() -> List[str]:
+    return [row["id"] for row in fetch_all(lambda: supabase.table("tenants").select("id").order("id"))]
+
+
+def run_reports(args) -> int:
+    from services import lookup_service
+    from services.faculty_directory import directory
+
+    formats = [value.strip() for value in args.format.split(",") if value.strip()]
+    unknown = set(formats) - set(REPORT_FORMATS)
+    if unknown:
+        raise SystemExit(f"Unknown format: {', '.join(sorted(unknown))} (known: {', '.join(REPORT_FORMATS)})")
+
+    # Departments and years are per tenant; a named one only has to exist in some tenant
+    tenants = _select(args.tenant, _tenants(), "tenant")
+    scopes = {tenant_id: (directory.departments(tenant_id), lookup_service.academic_years(tenant_id))
+              for tenant_id in tenants}
+    departments = _select(args.dept, sorted({value for known, _ in scopes.values() for value in known}),
+                          "department")
+    years = _select(args.year, sorted({value for _, known in scopes.values() for value in known}),
+                    "academic year")
+
+    jobs: List[Job] = []
+    skipped = 0
+    manifests: Dict[str, Dict[str, str]] = {}
+    fingerprints: Dict[Tuple[str, str], str] = {}
+    for tenant_id, (tenant_departments, tenant_years) in scopes.items():
+        output_dir = os.path.join(args.output, _slug(tenant_id))
+        os.makedirs(output_dir, exist_ok=True)
+        manifest = manifests[output_dir] = _load_manifest(output_dir)
+        selected = [department for department in departments if department in tenant_departments]
+        for department, fingerprint in input_fingerprints(tenant_id, selected).items():
+            fingerprints[(tenant_id, department)] = fingerprint
+        for department in selected:
+            for academic_year in (year for year in years if year in tenant_years):
+                for report_format in formats:
+                    name = report_filename(report_format, department, academic_year)
+                    path = os.path.join(output_dir, name)
+                    if (not args.force and manifest.get(name) == fingerprints[(tenant_id, department)]
+                            and os.path.exists(path)):
+                        skipped += 1
+                        continue
+                    jobs.append((report_format, tenant_id, department, academic_year, path))
+
+    print(f"{len(tenants)} tenants x {len(departments)} departments x {len(years)} years x {len(formats)} formats: "
+          f"{len(jobs)} to build, {skipped} unchanged")
+    if not jobs:
+        return 0
+    if "pdf" in formats:
+        _warm_fonts()
+
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs))) as pool:
+        futures = {pool.submit(build_report, job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            report_format, tenant_id, department, academic_year, path = futures[future]
+            name = os.path.relpath(path, args.output)
+            try:
+                _, size, elapsed = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done:>{len(str(len(jobs)))}}/{len(jobs)}] FAILED {name}: {e}", file=sys.stderr, flush=True)
+                continue
+            output_dir = os.path.dirname(path)
+            manifests[output_dir][os.path.basename(path)] = fingerprints[(tenant_id, department)]
+            _save_manifest(output_dir, manifests[output_dir])
+            print(f"[{done:>{len(str(len(jobs)))}}/{len(jobs)}] {name} ({size / 1024:.0f} KB, {elapsed:.1f} s)", flush=True)
+
+    print(f"Built {len(jobs) - failed} reports in {time.perf_counter() - start:.1f} s into {args.output}"
+          + (f", {failed} failed" if failed else ""))
+    return 1 if failed else 0
+
+
+def run_archive(args) -> int:
+    from services import archive_service, lookup_service
+
+    years = [value.strip() for value in args.year.split(",") if value.strip()]
+    tenants = _tenants()
+    # The newest year with data is still being entered
+    in_use = {year for tenant_id in tenants for year in lookup_service.academic_years(tenant_id)}
+    newest = max(in_use, default=None)
+    if newest in years:
+        raise SystemExit(f"{newest} is the newest academic year in use and cannot be archived")
+
+    failed = 0
+    for academic_year in years:
+        start = time.perf_counter()
+        try:
+            archived = archive_service.archive_year(academic_year, tenants)
+        except Exception as e:
+            failed += 1
+            print(f"{academic_year}: FAILED {e}", file=sys.stderr, flush=True)
+            continue
+        for tenant_id, counts in archived.items():
+            detail = ", ".join(f"{table} {count}" for table, count in counts.items() if count)
+            print(f"{academic_year} {tenant_id}: {sum(counts.values())} rows ({detail or 'none'})", flush=True)
+        print(f"{academic_year}: archived in {time.perf_counter() - start:.1f} s into {archive_service.ARCHIVE_DIR}")
+    return 1 if failed else 0
+
+
+def run_partition(args) -> int:
+    if args.year:
+        for academic_year in (value.strip() for value in args.year.split(",") if value.strip()):
+            created = supabase.rpc("create_academic_year_partitions", {"p_year": academic_year}).execute().data
+            print(f"{academic_year}: {created} partitions created")
+    else:
+        created = supabase.rpc("partition_academic_years", {}).execute().data
+        print(f"{created} partitions created")
+    return 0
+
+
+def run_calibrate_passwords(args) -> int:
+    from services import password_policy
+
+    print(f"Calibrating {args.scheme} for {args.target_ms:g}ms per verify on {password_policy.host_fingerprint()}")
+    cost_name = password_policy.COST_PARAMETERS[args.scheme][0]
+    policy = password_policy.calibrate(args.scheme, args.target_ms,
+                                       report=lambda cost, ms: print(f"  {cost_name} {cost:>2}: {ms:8.1f}ms"))
+    print(f"Chosen: {policy.params} ({policy.measured_ms}ms)")
+    if args.dry_run:
+        return 0
+    password_policy.save_policy(policy)
+    print(f"Saved to {password_policy.PASSWORD_POLICY_FILE}")
+    settings = [f"{name}={value}" for name, value, configured in (
+        ("PASSWORD_HASH_SCHEME", args.scheme, PASSWORD_HASH_SCHEME),
+        ("PASSWORD_HASH_TARGET_MS", f"{args.target_ms:g}", f"{PASSWORD_HASH_TARGET_MS:g}")) if value != configured]
+    if settings:
+        print(f"Set {' and '.join(settings)} for the app to use it; otherwise it calibrates again at startup")
+
+    # Stored hashes that the next successful login will replace
+    password_policy.use_policy(policy)
+    for table in ("admins", "faculty_users"):
+        hashes = [row["password_hash"] for row in
+                  fetch_all(lambda: supabase.table(table).select("id, password_hash").order("id"))]
+        outdated = sum(1 for value in hashes if value and password_policy.needs_update(value))
+        print(f"{table}: {outdated} of {len(hashes)} password hashes will be rehashed at their next login")
+    return 0
+
+
+def run_create_admin(args) -> int:
+    from create_admin import create_admin
+
+    create_admin()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="manage", description="Faculty Management System management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reports = commands.add_parser("reports", help="build department x year reports in parallel")
+    reports.add_argument("--tenant", default="all", help="tenants, comma-separated, or 'all'")
+    reports.add_argument("--year", default="all", help="academic years, comma-separated, or 'all'")
+    reports.add_argument("--dept", default="all", help="departments, comma-separated, or 'all'")
+    reports.add_argument("--format", default="pdf,xlsx", help="report formats: pdf, xlsx")
+    reports.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    reports.add_argument("--output", default="reports", help="output directory (one folder per tenant)")
+    reports.add_argument("--force", action="store_true", help="rebuild reports whose inputs are unchanged")
+    reports.set_defaults(handler=run_reports)
+
+    archive = commands.add_parser("archive", help="move closed academic years into Parquet snapshots")
+    archive.add_argument("--year", required=True, help="academic years, comma-separated")
+    archive.set_defaults(handler=run_archive)
+
+    partition = commands.add_parser("partition", help="create academic-year partitions of the activity tables")
+    partition.add_argument("--year", help="academic years, comma-separated (default: every year in the data)")
+    partition.set_defaults(handler=run_partition)
+
+    calibrate = commands.add_parser("calibrate-passwords", help="pick the password hashing cost for this host")
+    calibrate.add_argument("--scheme", choices=("bcrypt", "argon2"), default=PASSWORD_HASH_SCHEME,
+                           help="hash scheme (default: PASSWORD_HASH_SCHEME)")
+    calibrate.add_argument("--target-ms", type=float, default=PASSWORD_HASH_TARGET_MS,
+                           help="verify time to aim for (default: PASSWORD_HASH_TARGET_MS)")
+    calibrate.add_argument("--dry-run", action="store_true", help="measure without saving the policy")
+    calibrate.set_defaults(handler=run_calibrate_passwords)
+
+    create = commands.add_parser("create-admin", help="create an admin user interactively")
+    create.set_defaults(handler=run_create_admin)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
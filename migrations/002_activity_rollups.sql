@@ -0,0 +1,89 @@
+-- ============================================
+-- 002: Analytics rollups
+-- Creates activity_rollups, its triggers and the department_rollups
+-- view, and backfills the rollups from existing rows. The activity
+-- tables are locked for writes until the migration commits so no row
+-- is counted twice or missed.
+-- ============================================
+BEGIN;
+
+CREATE TABLE activity_rollups (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL,
+    academic_year VARCHAR(20) NOT NULL,
+    metric VARCHAR(50) NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    amount_sum DECIMAL(15, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX idx_activity_rollups_key ON activity_rollups(user_id, academic_year, metric);
+
+CREATE OR REPLACE FUNCTION apply_activity_rollup() RETURNS TRIGGER AS $$
+DECLARE
+    v_metric TEXT := TG_ARGV[0];
+    v_amount_column TEXT := TG_ARGV[1];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+        INSERT INTO activity_rollups (user_id, academic_year, metric, row_count, amount_sum)
+        VALUES (OLD.user_id, OLD.academic_year, v_metric, -1,
+                -COALESCE((to_jsonb(OLD) ->> v_amount_column)::NUMERIC, 0))
+        ON CONFLICT (user_id, academic_year, metric) DO UPDATE SET
+            row_count = activity_rollups.row_count + EXCLUDED.row_count,
+            amount_sum = activity_rollups.amount_sum + EXCLUDED.amount_sum,
+            updated_at = NOW();
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+        INSERT INTO activity_rollups (user_id, academic_year, metric, row_count, amount_sum)
+        VALUES (NEW.user_id, NEW.academic_year, v_metric, 1,
+                COALESCE((to_jsonb(NEW) ->> v_amount_column)::NUMERIC, 0))
+        ON CONFLICT (user_id, academic_year, metric) DO UPDATE SET
+            row_count = activity_rollups.row_count + EXCLUDED.row_count,
+            amount_sum = activity_rollups.amount_sum + EXCLUDED.amount_sum,
+            updated_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+LOCK TABLE publications, awards, patents, conferences, research_projects IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO activity_rollups (user_id, academic_year, metric, row_count, amount_sum)
+SELECT user_id, academic_year, 'publications', COUNT(*), 0 FROM publications
+WHERE user_id IS NOT NULL GROUP BY user_id, academic_year
+UNION ALL
+SELECT user_id, academic_year, 'awards', COUNT(*), 0 FROM awards
+WHERE user_id IS NOT NULL GROUP BY user_id, academic_year
+UNION ALL
+SELECT user_id, academic_year, 'patents', COUNT(*), 0 FROM patents
+WHERE user_id IS NOT NULL GROUP BY user_id, academic_year
+UNION ALL
+SELECT user_id, academic_year, 'conferences', COUNT(*), 0 FROM conferences
+WHERE user_id IS NOT NULL GROUP BY user_id, academic_year
+UNION ALL
+SELECT user_id, academic_year, 'research_projects', COUNT(*), COALESCE(SUM(grant_amount), 0) FROM research_projects
+WHERE user_id IS NOT NULL GROUP BY user_id, academic_year;
+
+CREATE TRIGGER publications_rollup AFTER INSERT OR UPDATE OR DELETE ON publications
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('publications');
+CREATE TRIGGER awards_rollup AFTER INSERT OR UPDATE OR DELETE ON awards
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('awards');
+CREATE TRIGGER patents_rollup AFTER INSERT OR UPDATE OR DELETE ON patents
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('patents');
+CREATE TRIGGER conferences_rollup AFTER INSERT OR UPDATE OR DELETE ON conferences
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('conferences');
+CREATE TRIGGER research_projects_rollup AFTER INSERT OR UPDATE OR DELETE ON research_projects
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('research_projects', 'grant_amount');
+
+CREATE VIEW department_rollups AS
+SELECT p.department, p.designation, r.academic_year, r.metric,
+       SUM(r.row_count) AS row_count, SUM(r.amount_sum) AS amount_sum
+FROM activity_rollups r
+LEFT JOIN faculty_profiles p ON p.user_id = r.user_id
+GROUP BY p.department, p.designation, r.academic_year, r.metric
+HAVING SUM(r.row_count) > 0;
+
+ALTER TABLE activity_rollups ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role has full access" ON activity_rollups FOR ALL USING (true);
+
+COMMIT;
@@ -0,0 +1,139 @@
+-- ============================================
+-- 003: Sync change feed
+-- Adds updated_at to every synced table (existing rows are stamped with
+-- the migration time, so the first sync is a full snapshot), the
+-- deleted_rows tombstone table and the triggers maintaining both.
+-- ============================================
+BEGIN;
+
+ALTER TABLE previous_work ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE courses_taught ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE publications ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE book_publications ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE awards ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE ict_creations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE research_guidance ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE pg_dissertations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE research_projects ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE patents ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE conferences ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE seminars ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE lectures ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE other_details ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE memberships ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+CREATE TABLE deleted_rows (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    table_name VARCHAR(50) NOT NULL,
+    row_id UUID NOT NULL,
+    user_id UUID,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_faculty_users_updated_at ON faculty_users(updated_at, id);
+CREATE INDEX idx_faculty_profiles_updated_at ON faculty_profiles(updated_at, id);
+CREATE INDEX idx_previous_work_updated_at ON previous_work(updated_at, id);
+CREATE INDEX idx_courses_taught_updated_at ON courses_taught(updated_at, id);
+CREATE INDEX idx_publications_updated_at ON publications(updated_at, id);
+CREATE INDEX idx_book_publications_updated_at ON book_publications(updated_at, id);
+CREATE INDEX idx_awards_updated_at ON awards(updated_at, id);
+CREATE INDEX idx_ict_creations_updated_at ON ict_creations(updated_at, id);
+CREATE INDEX idx_research_guidance_updated_at ON research_guidance(updated_at, id);
+CREATE INDEX idx_pg_dissertations_updated_at ON pg_dissertations(updated_at, id);
+CREATE INDEX idx_research_projects_updated_at ON research_projects(updated_at, id);
+CREATE INDEX idx_patents_updated_at ON patents(updated_at, id);
+CREATE INDEX idx_conferences_updated_at ON conferences(updated_at, id);
+CREATE INDEX idx_seminars_updated_at ON seminars(updated_at, id);
+CREATE INDEX idx_lectures_updated_at ON lectures(updated_at, id);
+CREATE INDEX idx_other_details_updated_at ON other_details(updated_at, id);
+CREATE INDEX idx_memberships_updated_at ON memberships(updated_at, id);
+CREATE INDEX idx_deleted_rows_deleted_at ON deleted_rows(deleted_at, id);
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_deleted_row() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO deleted_rows (table_name, row_id, user_id)
+    VALUES (TG_TABLE_NAME, OLD.id, (to_jsonb(OLD) ->> 'user_id')::UUID);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER faculty_users_updated_at BEFORE INSERT OR UPDATE ON faculty_users
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER faculty_users_tombstone AFTER DELETE ON faculty_users
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER faculty_profiles_updated_at BEFORE INSERT OR UPDATE ON faculty_profiles
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER faculty_profiles_tombstone AFTER DELETE ON faculty_profiles
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER previous_work_updated_at BEFORE INSERT OR UPDATE ON previous_work
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER previous_work_tombstone AFTER DELETE ON previous_work
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER courses_taught_updated_at BEFORE INSERT OR UPDATE ON courses_taught
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER courses_taught_tombstone AFTER DELETE ON courses_taught
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER publications_updated_at BEFORE INSERT OR UPDATE ON publications
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER publications_tombstone AFTER DELETE ON publications
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER book_publications_updated_at BEFORE INSERT OR UPDATE ON book_publications
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER book_publications_tombstone AFTER DELETE ON book_publications
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER awards_updated_at BEFORE INSERT OR UPDATE ON awards
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER awards_tombstone AFTER DELETE ON awards
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER ict_creations_updated_at BEFORE INSERT OR UPDATE ON ict_creations
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER ict_creations_tombstone AFTER DELETE ON ict_creations
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER research_guidance_updated_at BEFORE INSERT OR UPDATE ON research_guidance
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER research_guidance_tombstone AFTER DELETE ON research_guidance
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER pg_dissertations_updated_at BEFORE INSERT OR UPDATE ON pg_dissertations
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER pg_dissertations_tombstone AFTER DELETE ON pg_dissertations
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER research_projects_updated_at BEFORE INSERT OR UPDATE ON research_projects
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER research_projects_tombstone AFTER DELETE ON research_projects
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER patents_updated_at BEFORE INSERT OR UPDATE ON patents
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER patents_tombstone AFTER DELETE ON patents
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER conferences_updated_at BEFORE INSERT OR UPDATE ON conferences
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER conferences_tombstone AFTER DELETE ON conferences
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER seminars_updated_at BEFORE INSERT OR UPDATE ON seminars
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER seminars_tombstone AFTER DELETE ON seminars
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER lectures_updated_at BEFORE INSERT OR UPDATE ON lectures
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER lectures_tombstone AFTER DELETE ON lectures
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER other_details_updated_at BEFORE INSERT OR UPDATE ON other_details
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER other_details_tombstone AFTER DELETE ON other_details
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER memberships_updated_at BEFORE INSERT OR UPDATE ON memberships
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER memberships_tombstone AFTER DELETE ON memberships
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+
+ALTER TABLE deleted_rows ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role has full access" ON deleted_rows FOR ALL USING (true);
+
+COMMIT;
@@ -0,0 +1,76 @@
+-- ============================================
+-- 004: Data versions
+-- Adds the per-faculty data_versions counter and the triggers bumping it
+-- on every write, for the ETag / If-None-Match support on the faculty
+-- and admin read endpoints. Existing faculty start without a row, which
+-- reads as version 0 until their first write.
+-- ============================================
+BEGIN;
+
+CREATE TABLE data_versions (
+    user_id UUID PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS TRIGGER AS $$
+DECLARE
+    v_owner_column TEXT := TG_ARGV[0];
+    v_old_owner UUID;
+    v_new_owner UUID;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_old_owner := (to_jsonb(OLD) ->> v_owner_column)::UUID;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_new_owner := (to_jsonb(NEW) ->> v_owner_column)::UUID;
+    END IF;
+    INSERT INTO data_versions (user_id, version)
+    SELECT DISTINCT owner, 1 FROM unnest(ARRAY[v_old_owner, v_new_owner]) AS owner
+    WHERE owner IS NOT NULL
+    ON CONFLICT (user_id) DO UPDATE SET
+        version = data_versions.version + 1,
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER faculty_users_data_version AFTER INSERT OR UPDATE OR DELETE ON faculty_users
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('id');
+CREATE TRIGGER faculty_profiles_data_version AFTER INSERT OR UPDATE OR DELETE ON faculty_profiles
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER previous_work_data_version AFTER INSERT OR UPDATE OR DELETE ON previous_work
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER courses_taught_data_version AFTER INSERT OR UPDATE OR DELETE ON courses_taught
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER publications_data_version AFTER INSERT OR UPDATE OR DELETE ON publications
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER book_publications_data_version AFTER INSERT OR UPDATE OR DELETE ON book_publications
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER awards_data_version AFTER INSERT OR UPDATE OR DELETE ON awards
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER ict_creations_data_version AFTER INSERT OR UPDATE OR DELETE ON ict_creations
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER research_guidance_data_version AFTER INSERT OR UPDATE OR DELETE ON research_guidance
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER pg_dissertations_data_version AFTER INSERT OR UPDATE OR DELETE ON pg_dissertations
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER research_projects_data_version AFTER INSERT OR UPDATE OR DELETE ON research_projects
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER patents_data_version AFTER INSERT OR UPDATE OR DELETE ON patents
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER conferences_data_version AFTER INSERT OR UPDATE OR DELETE ON conferences
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER seminars_data_version AFTER INSERT OR UPDATE OR DELETE ON seminars
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER lectures_data_version AFTER INSERT OR UPDATE OR DELETE ON lectures
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER other_details_data_version AFTER INSERT OR UPDATE OR DELETE ON other_details
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER memberships_data_version AFTER INSERT OR UPDATE OR DELETE ON memberships
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+
+ALTER TABLE data_versions ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role has full access" ON data_versions FOR ALL USING (true);
+
+COMMIT;
@@ -0,0 +1,149 @@
+-- ============================================
+-- 005: Tenants
+-- Runs several institutions from one deployment. Adds the tenants
+-- registry and a tenant_id column to every table. Existing rows, and
+-- writes from code that does not set the column, land in the 'default'
+-- tenant. The indexes now lead with tenant_id, employee IDs are unique
+-- per tenant, and the trigger-maintained tables (rollups, tombstones,
+-- data versions) copy the tenant of the row that changed.
+-- ============================================
+BEGIN;
+
+CREATE TABLE tenants (
+    id VARCHAR(50) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO tenants (id, name) VALUES ('default', 'Default Institution') ON CONFLICT (id) DO NOTHING;
+
+ALTER TABLE admins ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE faculty_users ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE faculty_profiles ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE previous_work ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE courses_taught ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE publications ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE book_publications ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE awards ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE ict_creations ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE research_guidance ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE pg_dissertations ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE research_projects ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE patents ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE conferences ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE seminars ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE lectures ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE other_details ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE memberships ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE refresh_tokens ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE activity_rollups ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE deleted_rows ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+ALTER TABLE data_versions ADD COLUMN tenant_id VARCHAR(50) NOT NULL DEFAULT 'default';
+
+-- Employee IDs are unique within an institution, not across all of them
+ALTER TABLE faculty_users DROP CONSTRAINT IF EXISTS faculty_users_employee_id_key;
+DROP INDEX IF EXISTS idx_faculty_users_employee_id;
+DROP INDEX IF EXISTS idx_publications_academic_year;
+DROP INDEX IF EXISTS idx_awards_academic_year;
+DROP INDEX IF EXISTS idx_research_projects_academic_year;
+DROP INDEX IF EXISTS idx_patents_academic_year;
+DROP INDEX IF EXISTS idx_conferences_academic_year;
+
+CREATE UNIQUE INDEX idx_faculty_users_tenant_employee_id ON faculty_users(tenant_id, employee_id);
+CREATE INDEX idx_publications_tenant_academic_year ON publications(tenant_id, academic_year);
+CREATE INDEX idx_awards_tenant_academic_year ON awards(tenant_id, academic_year);
+CREATE INDEX idx_research_projects_tenant_academic_year ON research_projects(tenant_id, academic_year);
+CREATE INDEX idx_patents_tenant_academic_year ON patents(tenant_id, academic_year);
+CREATE INDEX idx_conferences_tenant_academic_year ON conferences(tenant_id, academic_year);
+CREATE INDEX idx_faculty_profiles_tenant_department ON faculty_profiles(tenant_id, department);
+CREATE INDEX idx_activity_rollups_tenant ON activity_rollups(tenant_id, academic_year);
+CREATE INDEX idx_faculty_profiles_tenant_user ON faculty_profiles(tenant_id, user_id);
+CREATE INDEX idx_previous_work_tenant_user ON previous_work(tenant_id, user_id);
+CREATE INDEX idx_courses_taught_tenant_user ON courses_taught(tenant_id, user_id);
+CREATE INDEX idx_publications_tenant_user ON publications(tenant_id, user_id);
+CREATE INDEX idx_book_publications_tenant_user ON book_publications(tenant_id, user_id);
+CREATE INDEX idx_awards_tenant_user ON awards(tenant_id, user_id);
+CREATE INDEX idx_ict_creations_tenant_user ON ict_creations(tenant_id, user_id);
+CREATE INDEX idx_research_guidance_tenant_user ON research_guidance(tenant_id, user_id);
+CREATE INDEX idx_pg_dissertations_tenant_user ON pg_dissertations(tenant_id, user_id);
+CREATE INDEX idx_research_projects_tenant_user ON research_projects(tenant_id, user_id);
+CREATE INDEX idx_patents_tenant_user ON patents(tenant_id, user_id);
+CREATE INDEX idx_conferences_tenant_user ON conferences(tenant_id, user_id);
+CREATE INDEX idx_seminars_tenant_user ON seminars(tenant_id, user_id);
+CREATE INDEX idx_lectures_tenant_user ON lectures(tenant_id, user_id);
+CREATE INDEX idx_other_details_tenant_user ON other_details(tenant_id, user_id);
+CREATE INDEX idx_memberships_tenant_user ON memberships(tenant_id, user_id);
+
+CREATE OR REPLACE FUNCTION apply_activity_rollup() RETURNS TRIGGER AS $$
+DECLARE
+    v_metric TEXT := TG_ARGV[0];
+    v_amount_column TEXT := TG_ARGV[1];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+        INSERT INTO activity_rollups (tenant_id, user_id, academic_year, metric, row_count, amount_sum)
+        VALUES (OLD.tenant_id, OLD.user_id, OLD.academic_year, v_metric, -1,
+                -COALESCE((to_jsonb(OLD) ->> v_amount_column)::NUMERIC, 0))
+        ON CONFLICT (user_id, academic_year, metric) DO UPDATE SET
+            row_count = activity_rollups.row_count + EXCLUDED.row_count,
+            amount_sum = activity_rollups.amount_sum + EXCLUDED.amount_sum,
+            updated_at = NOW();
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+        INSERT INTO activity_rollups (tenant_id, user_id, academic_year, metric, row_count, amount_sum)
+        VALUES (NEW.tenant_id, NEW.user_id, NEW.academic_year, v_metric, 1,
+                COALESCE((to_jsonb(NEW) ->> v_amount_column)::NUMERIC, 0))
+        ON CONFLICT (user_id, academic_year, metric) DO UPDATE SET
+            row_count = activity_rollups.row_count + EXCLUDED.row_count,
+            amount_sum = activity_rollups.amount_sum + EXCLUDED.amount_sum,
+            updated_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_deleted_row() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO deleted_rows (tenant_id, table_name, row_id, user_id)
+    VALUES (OLD.tenant_id, TG_TABLE_NAME, OLD.id, (to_jsonb(OLD) ->> 'user_id')::UUID);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS TRIGGER AS $$
+DECLARE
+    v_owner_column TEXT := TG_ARGV[0];
+    v_old_owner UUID;
+    v_new_owner UUID;
+    v_tenant VARCHAR(50);
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_old_owner := (to_jsonb(OLD) ->> v_owner_column)::UUID;
+        v_tenant := OLD.tenant_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_new_owner := (to_jsonb(NEW) ->> v_owner_column)::UUID;
+        v_tenant := NEW.tenant_id;
+    END IF;
+    INSERT INTO data_versions (user_id, tenant_id, version)
+    SELECT DISTINCT owner, v_tenant, 1 FROM unnest(ARRAY[v_old_owner, v_new_owner]) AS owner
+    WHERE owner IS NOT NULL
+    ON CONFLICT (user_id) DO UPDATE SET
+        version = data_versions.version + 1,
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP VIEW IF EXISTS department_rollups;
+CREATE VIEW department_rollups AS
+SELECT r.tenant_id, p.department, p.designation, r.academic_year, r.metric,
+       SUM(r.row_count) AS row_count, SUM(r.amount_sum) AS amount_sum
+FROM activity_rollups r
+LEFT JOIN faculty_profiles p ON p.user_id = r.user_id
+GROUP BY r.tenant_id, p.department, p.designation, r.academic_year, r.metric
+HAVING SUM(r.row_count) > 0;
+
+ALTER TABLE tenants ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role has full access" ON tenants FOR ALL USING (true);
+
+COMMIT;
@@ -0,0 +1,152 @@
+-- ============================================
+-- 006: Academic-year partitions
+-- LIST-partitions the twelve activity tables by academic_year (see the
+-- ACADEMIC-YEAR PARTITIONS section of supabase_schema.sql). Each table is
+-- rebuilt as a partitioned table with a DEFAULT partition, its rows are
+-- copied before its triggers are recreated (so rollups and updated_at are
+-- untouched) and its indexes, triggers and RLS policies are carried over.
+-- The primary key becomes (id, academic_year): a partitioned table's
+-- unique keys must include the partition column. Run
+-- `python -m manage partition` afterwards to give every academic year in
+-- the data its own partition.
+-- ============================================
+BEGIN;
+
+CREATE OR REPLACE FUNCTION activity_tables() RETURNS TEXT[] AS $$
+    SELECT ARRAY['publications', 'book_publications', 'awards', 'ict_creations', 'research_guidance',
+                 'research_projects', 'patents', 'conferences', 'seminars', 'lectures', 'other_details',
+                 'memberships'];
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION academic_year_partition(p_table TEXT, p_year TEXT) RETURNS TEXT AS $$
+    SELECT p_table || '_y' || regexp_replace(p_year, '[^A-Za-z0-9]+', '_', 'g');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Returns the number of partitions created
+CREATE OR REPLACE FUNCTION create_academic_year_partitions(p_year TEXT) RETURNS INTEGER AS $$
+DECLARE
+    v_table TEXT;
+    v_partition TEXT;
+    v_default TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    FOREACH v_table IN ARRAY activity_tables() LOOP
+        v_partition := academic_year_partition(v_table, p_year);
+        v_default := v_table || '_default';
+        CONTINUE WHEN to_regclass(v_partition) IS NOT NULL;
+        -- The year's rows may sit in the default partition, which may not
+        -- overlap a new partition: move them while it is detached
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', v_table, v_default);
+        EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_partition, v_table);
+        EXECUTE format('INSERT INTO %I SELECT * FROM %I WHERE academic_year = %L', v_partition, v_default, p_year);
+        EXECUTE format('DELETE FROM %I WHERE academic_year = %L', v_default, p_year);
+        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES IN (%L)', v_table, v_partition, p_year);
+        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', v_table, v_default);
+        v_created := v_created + 1;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION partition_academic_years() RETURNS INTEGER AS $$
+DECLARE
+    v_table TEXT;
+    v_year TEXT;
+    v_years TEXT[] := '{}';
+    v_created INTEGER := 0;
+BEGIN
+    FOREACH v_table IN ARRAY activity_tables() LOOP
+        FOR v_year IN EXECUTE format('SELECT DISTINCT academic_year FROM %I', v_table || '_default') LOOP
+            v_years := array_append(v_years, v_year);
+        END LOOP;
+    END LOOP;
+    FOR v_year IN SELECT DISTINCT unnest(v_years) LOOP
+        v_created := v_created + create_academic_year_partitions(v_year);
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- p_expected: {table: rows archived} over all tenants; a table whose
+-- partition holds a different count (rows written after the archive was
+-- taken) aborts the whole drop. Returns the number of rows dropped.
+CREATE OR REPLACE FUNCTION drop_academic_year_partitions(p_year TEXT, p_expected JSONB) RETURNS BIGINT AS $$
+DECLARE
+    v_table TEXT;
+    v_partition TEXT;
+    v_rows BIGINT;
+    v_total BIGINT := 0;
+BEGIN
+    PERFORM create_academic_year_partitions(p_year);
+    FOREACH v_table IN ARRAY activity_tables() LOOP
+        v_partition := academic_year_partition(v_table, p_year);
+        EXECUTE format('LOCK TABLE %I IN SHARE MODE', v_partition);
+        EXECUTE format('SELECT count(*) FROM %I', v_partition) INTO v_rows;
+        IF v_rows <> COALESCE((p_expected ->> v_table)::BIGINT, 0) THEN
+            RAISE EXCEPTION '% has % rows for %, archive has %', v_table, v_rows, p_year,
+                COALESCE((p_expected ->> v_table)::BIGINT, 0);
+        END IF;
+        EXECUTE format('INSERT INTO data_versions (user_id, tenant_id, version)
+                        SELECT DISTINCT user_id, tenant_id, 1 FROM %I WHERE user_id IS NOT NULL
+                        ON CONFLICT (user_id) DO UPDATE SET
+                            version = data_versions.version + 1,
+                            updated_at = NOW()', v_partition);
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', v_table, v_partition);
+        EXECUTE format('DROP TABLE %I', v_partition);
+        v_total := v_total + v_rows;
+    END LOOP;
+    RETURN v_total;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    v_table TEXT;
+    v_old TEXT;
+    v_rls BOOLEAN;
+    v_indexes TEXT[];
+    v_triggers TEXT[];
+    v_policy RECORD;
+    v_policies TEXT[];
+    v_sql TEXT;
+BEGIN
+    FOREACH v_table IN ARRAY activity_tables() LOOP
+        v_old := v_table || '_unpartitioned';
+        SELECT relrowsecurity INTO v_rls FROM pg_class WHERE oid = v_table::regclass;
+        SELECT COALESCE(array_agg(pg_get_indexdef(i.indexrelid)), '{}') INTO v_indexes
+            FROM pg_index i WHERE i.indrelid = v_table::regclass AND NOT i.indisprimary;
+        SELECT COALESCE(array_agg(pg_get_triggerdef(t.oid)), '{}') INTO v_triggers
+            FROM pg_trigger t WHERE t.tgrelid = v_table::regclass AND NOT t.tgisinternal;
+        v_policies := '{}';
+        FOR v_policy IN SELECT * FROM pg_policies WHERE schemaname = 'public' AND tablename = v_table LOOP
+            v_policies := array_append(v_policies, format('CREATE POLICY %I ON %I AS %s FOR %s TO %s%s%s',
+                v_policy.policyname, v_table, v_policy.permissive, v_policy.cmd,
+                array_to_string(v_policy.roles, ', '),
+                COALESCE(' USING (' || v_policy.qual || ')', ''),
+                COALESCE(' WITH CHECK (' || v_policy.with_check || ')', '')));
+        END LOOP;
+
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', v_table, v_old);
+        EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+                            PRIMARY KEY (id, academic_year),
+                            FOREIGN KEY (user_id) REFERENCES faculty_users(id) ON DELETE CASCADE)
+                        PARTITION BY LIST (academic_year)', v_table, v_old);
+        EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', v_table || '_default', v_table);
+        EXECUTE format('INSERT INTO %I SELECT * FROM %I', v_table, v_old);
+        EXECUTE format('DROP TABLE %I', v_old);
+        -- Created while the old table still held the usual names
+        EXECUTE format('ALTER TABLE %I RENAME CONSTRAINT %I TO %I', v_table, v_table || '_pkey1', v_table || '_pkey');
+        EXECUTE format('ALTER TABLE %I RENAME CONSTRAINT %I TO %I',
+                       v_table, v_table || '_user_id_fkey1', v_table || '_user_id_fkey');
+
+        FOREACH v_sql IN ARRAY v_indexes || v_triggers || v_policies LOOP
+            EXECUTE v_sql;
+        END LOOP;
+        IF v_rls THEN
+            EXECUTE format('ALTER TABLE %I ENABLE ROW LEVEL SECURITY', v_table);
+        END IF;
+    END LOOP;
+END;
+$$;
+
+COMMIT;
@@ -1,17 +1,28 @@
 """
 Admin Router - Admin dashboard data management and exports
 """
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Callable, Optional, List, Dict
+from datetime import datetime, timezone
+from collections import Counter
+import asyncio
 import io
 
-from database import supabase
-from services.auth_utils import decode_access_token
+from database import for_tenant, fetch_all
+from services import archive_service, etag_service, lookup_service
+from services.auth_utils import decode_access_token, session_info
+from services.event_bus import export_progress
+from services.faculty_directory import directory
+from services.profiling_service import ProfiledRoute, profiled_stream
+from services.responses import FastJSONResponse
+from routers.faculty import FacultyDataResponse
 
-router = APIRouter(prefix="/api/admin", tags=["Admin"])
+# Sync endpoints (exports) are profiled in their worker thread
+router = APIRouter(prefix="/api/admin", tags=["Admin"], route_class=ProfiledRoute)
 security = HTTPBearer()
 
 
@@ -29,64 +40,113 @@ async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(
     return payload
 
 
+# Client-chosen id of an export whose progress it follows on /api/events
+PROGRESS_ID = Query(None, pattern=r"^[\w-]{1,64}$")
+
+
+class FacultyUserInfo(BaseModel):
+    id: str
+    name: str
+    email: str
+    employee_id: str
+    phone: Optional[str] = None
+
+
+class FacultyDetailsResponse(FacultyDataResponse):
+    user: FacultyUserInfo
+
+
+def count_rows_by_user(tenant_id: str, table_name: str, academic_year: Optional[str] = None) -> Counter:
+    """Count a tenant's rows of a table per faculty member with one set-based query (plus archived years)"""
+    scope = archive_service.ReportScope(tenant_id, table_name, academic_year)
+
+    def build_query():
+        query = for_tenant(tenant_id).table(table_name).select("user_id, academic_year")
+        if academic_year:
+            query = query.eq("academic_year", academic_year)
+        return query.order("id")
+
+    counts = archive_service.count_by_user(scope)
+    if scope.reads_database:
+        counts.update(row["user_id"] for row in scope.hot(fetch_all(build_query)))
+    return counts
+
+
 @router.get("/faculty")
-async def get_all_faculty(
+def get_all_faculty(
     search: Optional[str] = None,
     department: Optional[str] = None,
     designation: Optional[str] = None,
     current_user: dict = Depends(get_current_admin)
 ):
     """Get all faculty members with optional search/filter"""
-    query = supabase.table("faculty_users").select("id, name, email, employee_id, phone, is_active, created_at")
-    
-    if search:
-        query = query.or_(f"name.ilike.%{search}%,email.ilike.%{search}%,employee_id.ilike.%{search}%")
-    
-    result = query.order("created_at", desc=True).execute()
-    
-    # Get profiles for additional info
-    faculty_list = []
-    for faculty in result.data:
-        profile_result = supabase.table("faculty_profiles").select("designation, department").eq("user_id", faculty["id"]).execute()
-        profile = profile_result.data[0] if profile_result.data else {}
-        
-        # Filter by department if specified
-        if department and profile.get("department") != department:
-            continue
-        
-        # Filter by designation if specified
-        if designation and profile.get("designation") != designation:
-            continue
-            
-        faculty_list.append({
-            **faculty,
-            "designation": profile.get("designation"),
-            "department": profile.get("department")
-        })
-    
+    return list_faculty(current_user["tid"], search, department, designation)
+
+
+def list_faculty(
+    tenant_id: str,
+    search: Optional[str] = None,
+    department: Optional[str] = None,
+    designation: Optional[str] = None
+) -> dict:
+    """A tenant's faculty users joined with their profile's designation and department (from the in-memory directory)"""
+    faculty_list = [record.to_dict() for record in directory.list(tenant_id, search, department, designation)]
     return {"faculty": faculty_list, "total": len(faculty_list)}
 
 
-@router.get("/faculty/{faculty_id}")
-async def get_faculty_details(
-    faculty_id: str,
+def load_faculty_summary_rows(
+    tenant_id: str,
     academic_year: Optional[str] = None,
-    current_user: dict = Depends(get_current_admin)
-):
-    """Get detailed information about a specific faculty member"""
+    department: Optional[str] = None,
+    designation: Optional[str] = None,
+    progress: Optional[Callable] = None
+) -> List[dict]:
+    """Spreadsheet rows of faculty with their publication, award and patent counts"""
+    # Activity counts per faculty, one query per table
+    counts = {}
+    for done, table in enumerate(("publications", "awards", "patents"), 1):
+        counts[table] = count_rows_by_user(tenant_id, table, academic_year)
+        if progress:
+            progress("counting", done, 3, table=table)
+    pub_counts, award_counts, patent_counts = counts["publications"], counts["awards"], counts["patents"]
+    
+    # Faculty and their profile fields come from the in-memory directory
+    all_data = []
+    for faculty in directory.list(tenant_id, department=department, designation=designation):
+        all_data.append({
+            "Name": faculty.name,
+            "Email": faculty.email,
+            "Employee ID": faculty.employee_id,
+            "Designation": faculty.designation or "",
+            "Department": faculty.department or "",
+            "Publications": pub_counts[faculty.id],
+            "Awards": award_counts[faculty.id],
+            "Patents": patent_counts[faculty.id]
+        })
+    return all_data
+
+
+def load_faculty_details(tenant_id: str, faculty_id: str, academic_year: Optional[str] = None) -> dict:
+    """Load a faculty member's user record and all data tables (404 outside the tenant)"""
+    db = for_tenant(tenant_id)
+    
     # Get faculty user
-    user_result = supabase.table("faculty_users").select("*").eq("id", faculty_id).execute()
+    user_result = db.table("faculty_users").select("*").eq("id", faculty_id).execute()
     if not user_result.data:
         raise HTTPException(status_code=404, detail="Faculty not found")
     
     faculty_user = user_result.data[0]
     
-    # Helper to get table data
+    # Helper to get table data (archived academic years come from their snapshots)
     def get_table_data(table_name, has_academic_year=True):
-        query = supabase.table(table_name).select("*").eq("user_id", faculty_id)
-        if academic_year and has_academic_year:
-            query = query.eq("academic_year", academic_year)
-        return query.execute().data
+        scope = archive_service.ReportScope(tenant_id, table_name, academic_year if has_academic_year else None)
+        rows = []
+        if scope.reads_database:
+            query = db.table(table_name).select("*").eq("user_id", faculty_id)
+            if academic_year and has_academic_year:
+                query = query.eq("academic_year", academic_year)
+            rows = scope.hot(query.execute().data)
+        return rows + scope.archived_rows([faculty_id])
     
     return {
         "user": {
@@ -115,22 +175,111 @@ async def get_faculty_details(
     }
 
 
+def load_department_faculty(tenant_id: str, department: str, academic_year: Optional[str] = None,
+                            progress: Optional[Callable] = None) -> List[dict]:
+    """
+    Load every faculty member of a tenant's department with all data tables.
+    Rows are fetched per table for the whole department, not per faculty.
+    progress is called as progress("loading", tables done, total, rows=...) after each table.
+    """
+    from services.bulk_export import iter_batches
+    from services.export_service import PROFILE_SECTIONS
+    
+    db = for_tenant(tenant_id)
+    profiles = fetch_all(lambda: db.table("faculty_profiles").select("*").eq("department", department).order("id"))
+    profiles = {p["user_id"]: p for p in profiles if p.get("user_id")}
+    user_ids = list(profiles)
+    
+    faculty = {}
+    for rows in iter_batches(tenant_id, "faculty_users", user_ids=user_ids):
+        for user in rows:
+            faculty[user["id"]] = {"user": user, "profile": [profiles[user["id"]]]}
+    
+    loaded_rows = 0
+    for done, (table, _, _, _) in enumerate(PROFILE_SECTIONS, 1):
+        for data in faculty.values():
+            data[table] = []
+        for rows in iter_batches(tenant_id, table, academic_year, user_ids):
+            loaded_rows += len(rows)
+            for row in rows:
+                if row["user_id"] in faculty:
+                    faculty[row["user_id"]][table].append(row)
+        if progress:
+            progress("loading", done, len(PROFILE_SECTIONS), rows=loaded_rows)
+    
+    return sorted(faculty.values(), key=lambda data: data["user"]["name"].lower())
+
+
+@router.get("/faculty/{faculty_id}", response_model=FacultyDetailsResponse)
+def get_faculty_details(
+    request: Request,
+    faculty_id: str,
+    academic_year: Optional[str] = None,
+    current_user: dict = Depends(get_current_admin)
+):
+    """Get detailed information about a specific faculty member"""
+    tenant_id = current_user["tid"]
+    etag, not_modified = etag_service.conditional_get(request, tenant_id, faculty_id)
+    if not_modified:
+        return not_modified
+    
+    # Rows are already JSON-native; render with orjson and skip jsonable_encoder
+    return etag_service.tag(FastJSONResponse(load_faculty_details(tenant_id, faculty_id, academic_year)), etag)
+
+
 @router.get("/export/faculty/{faculty_id}/pdf")
-async def export_faculty_pdf(
+def export_faculty_pdf(
     faculty_id: str,
     academic_year: Optional[str] = None,
+    progress_id: Optional[str] = PROGRESS_ID,
     current_user: dict = Depends(get_current_admin)
 ):
-    """Export a single faculty member's data as PDF"""
+    """
+    Export a single faculty member's data as PDF
+
+    Export endpoints are plain functions so FastAPI runs them in the
+    threadpool; the blocking queries and PDF/Excel generation then do not
+    stall the event loop serving login and dashboards.
+    """
     from services.export_service import generate_faculty_pdf
     
-    # Get faculty data
-    data = await get_faculty_details(faculty_id, academic_year, current_user)
+    with export_progress(current_user["sub"], progress_id, "faculty_pdf") as progress:
+        # Get faculty data
+        data = load_faculty_details(current_user["tid"], faculty_id, academic_year)
+        progress("rendering", 0, 1)
+        
+        # Generate PDF
+        pdf_buffer = generate_faculty_pdf(data, academic_year)
+        
+        filename = f"faculty_{data['user']['employee_id']}_{academic_year or 'all'}.pdf"
+        progress.finished(filename=filename, size=len(pdf_buffer))
     
-    # Generate PDF
-    pdf_buffer = generate_faculty_pdf(data, academic_year)
+    return StreamingResponse(
+        io.BytesIO(pdf_buffer),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/export/department/pdf")
+def export_department_book_pdf(
+    department: str,
+    academic_year: Optional[str] = None,
+    progress_id: Optional[str] = PROGRESS_ID,
+    current_user: dict = Depends(get_current_admin)
+):
+    """Export every faculty profile of a department as one PDF with contents and bookmarks"""
+    from services.export_service import generate_department_book_pdf
     
-    filename = f"faculty_{data['user']['employee_id']}_{academic_year or 'all'}.pdf"
+    with export_progress(current_user["sub"], progress_id, "department_book") as progress:
+        faculty = load_department_faculty(current_user["tid"], department, academic_year, progress)
+        if not faculty:
+            raise HTTPException(status_code=404, detail="No faculty found for this department")
+        
+        pdf_buffer = generate_department_book_pdf(faculty, department, academic_year, progress)
+        
+        filename = f"faculty_book_{department.replace(' ', '_')}_{academic_year or 'all'}.pdf"
+        progress.finished(filename=filename, size=len(pdf_buffer))
     
     return StreamingResponse(
         io.BytesIO(pdf_buffer),
@@ -140,65 +289,30 @@ async def export_faculty_pdf(
 
 
 @router.get("/export/all/excel")
-async def export_all_faculty_excel(
+def export_all_faculty_excel(
     academic_year: Optional[str] = None,
     department: Optional[str] = None,
     designation: Optional[str] = None,
+    progress_id: Optional[str] = PROGRESS_ID,
     current_user: dict = Depends(get_current_admin)
 ):
     """Export all faculty data as Excel file"""
     from services.export_service import generate_all_faculty_excel
     
-    # Get all faculty
-    faculty_result = supabase.table("faculty_users").select("id, name, email, employee_id").execute()
+    from services.work_index import work_index
     
-    all_data = []
-    for faculty in faculty_result.data:
-        # Get profile
-        profile_result = supabase.table("faculty_profiles").select("*").eq("user_id", faculty["id"]).execute()
-        profile = profile_result.data[0] if profile_result.data else {}
-        
-        # Filter by department if specified
-        if department and profile.get("department") != department:
-            continue
+    tenant_id = current_user["tid"]
+    with export_progress(current_user["sub"], progress_id, "faculty_excel") as progress:
+        all_data = load_faculty_summary_rows(tenant_id, academic_year, department, designation, progress)
+        unique_counts = work_index.unique_counts(tenant_id, academic_year,
+                                                 filter_user_ids(tenant_id, department, designation))
+        progress("rendering", 0, len(all_data))
         
-        # Filter by designation if specified
-        if designation and profile.get("designation") != designation:
-            continue
+        # Generate Excel
+        excel_buffer = generate_all_faculty_excel(all_data, academic_year, unique_counts)
         
-        # Get publications count
-        pub_query = supabase.table("publications").select("id", count="exact").eq("user_id", faculty["id"])
-        if academic_year:
-            pub_query = pub_query.eq("academic_year", academic_year)
-        pub_result = pub_query.execute()
-        
-        # Get awards count
-        award_query = supabase.table("awards").select("id", count="exact").eq("user_id", faculty["id"])
-        if academic_year:
-            award_query = award_query.eq("academic_year", academic_year)
-        award_result = award_query.execute()
-        
-        # Get patents count
-        patent_query = supabase.table("patents").select("id", count="exact").eq("user_id", faculty["id"])
-        if academic_year:
-            patent_query = patent_query.eq("academic_year", academic_year)
-        patent_result = patent_query.execute()
-        
-        all_data.append({
-            "Name": faculty["name"],
-            "Email": faculty["email"],
-            "Employee ID": faculty["employee_id"],
-            "Designation": profile.get("designation", ""),
-            "Department": profile.get("department", ""),
-            "Publications": len(pub_result.data) if pub_result.data else 0,
-            "Awards": len(award_result.data) if award_result.data else 0,
-            "Patents": len(patent_result.data) if patent_result.data else 0
-        })
-    
-    # Generate Excel
-    excel_buffer = generate_all_faculty_excel(all_data, academic_year)
-    
-    filename = f"all_faculty_{academic_year or 'all_years'}.xlsx"
+        filename = f"all_faculty_{academic_year or 'all_years'}.xlsx"
+        progress.finished(filename=filename, size=len(excel_buffer))
     
     return StreamingResponse(
         io.BytesIO(excel_buffer),
@@ -208,40 +322,33 @@ async def export_all_faculty_excel(
 
 
 @router.get("/export/all/pdf")
-async def export_all_faculty_pdf(
+def export_all_faculty_pdf(
     academic_year: Optional[str] = None,
     department: Optional[str] = None,
     designation: Optional[str] = None,
+    progress_id: Optional[str] = PROGRESS_ID,
     current_user: dict = Depends(get_current_admin)
 ):
     """Export all faculty summary as PDF"""
     from services.export_service import generate_all_faculty_summary_pdf
     
-    # Get all faculty
-    faculty_result = supabase.table("faculty_users").select("id, name, email, employee_id").execute()
-    
+    # Faculty and their profile fields come from the in-memory directory
     all_data = []
-    for faculty in faculty_result.data:
-        profile_result = supabase.table("faculty_profiles").select("*").eq("user_id", faculty["id"]).execute()
-        profile = profile_result.data[0] if profile_result.data else {}
-        
-        if department and profile.get("department") != department:
-            continue
-        
-        if designation and profile.get("designation") != designation:
-            continue
-        
+    for faculty in directory.list(current_user["tid"], department=department, designation=designation):
         all_data.append({
-            "name": faculty["name"],
-            "email": faculty["email"],
-            "employee_id": faculty["employee_id"],
-            "designation": profile.get("designation", ""),
-            "department": profile.get("department", "")
+            "name": faculty.name,
+            "email": faculty.email,
+            "employee_id": faculty.employee_id,
+            "designation": faculty.designation or "",
+            "department": faculty.department or ""
         })
     
-    pdf_buffer = generate_all_faculty_summary_pdf(all_data, academic_year, department)
-    
-    filename = f"faculty_summary_{academic_year or 'all'}_{department or 'all_depts'}.pdf"
+    with export_progress(current_user["sub"], progress_id, "faculty_summary_pdf") as progress:
+        progress("rendering", 0, len(all_data))
+        pdf_buffer = generate_all_faculty_summary_pdf(all_data, academic_year, department)
+        
+        filename = f"faculty_summary_{academic_year or 'all'}_{department or 'all_depts'}.pdf"
+        progress.finished(filename=filename, size=len(pdf_buffer))
     
     return StreamingResponse(
         io.BytesIO(pdf_buffer),
@@ -250,32 +357,229 @@ async def export_all_faculty_pdf(
     )
 
 
+@router.get("/export/bulk")
+def export_bulk_data(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    academic_year: Optional[str] = None,
+    department: Optional[str] = None,
+    progress_id: Optional[str] = PROGRESS_ID,
+    current_user: dict = Depends(get_current_admin)
+):
+    """Stream raw rows of every faculty data table as a zip of CSV or Parquet files"""
+    from services import bulk_export
+
+    if format == "parquet" and bulk_export.pq is None:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow")
+
+    filename = f"faculty_data_{academic_year or 'all'}_{department or 'all_depts'}_{format}.zip"
+
+    def stream():
+        # The bundle is written while it streams, so progress ends with the last chunk
+        with export_progress(current_user["sub"], progress_id, "bulk") as progress:
+            yield from bulk_export.stream_bundle(current_user["tid"], format, academic_year, department, progress)
+            progress.finished(filename=filename)
+
+    return StreamingResponse(
+        profiled_stream(stream()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/export/bulk/{table_name}.csv")
+def export_bulk_table(
+    table_name: str,
+    academic_year: Optional[str] = None,
+    department: Optional[str] = None,
+    current_user: dict = Depends(get_current_admin)
+):
+    """Stream the raw rows of one table as CSV"""
+    from services import bulk_export
+
+    if table_name not in bulk_export.EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail="Unknown table")
+
+    filename = f"{table_name}_{academic_year or 'all'}_{department or 'all_depts'}.csv"
+
+    return StreamingResponse(
+        profiled_stream(bulk_export.stream_table_csv(current_user["tid"], table_name, academic_year, department)),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 @router.get("/academic-years")
-async def get_academic_years(current_user: dict = Depends(get_current_admin)):
+def get_academic_years(current_user: dict = Depends(get_current_admin)):
     """Get list of all academic years with data"""
-    tables = ["publications", "awards", "research_projects", "patents", "conferences"]
-    years = set()
-    
-    for table in tables:
-        result = supabase.table(table).select("academic_year").execute()
-        for row in result.data:
-            if row.get("academic_year"):
-                years.add(row["academic_year"])
-    
-    # Add some default years if empty
-    if not years:
-        years = {"2024-2025", "2025-2026", "2026-2027"}
-    
-    return {"academic_years": sorted(list(years), reverse=True)}
+    return {"academic_years": lookup_service.academic_years(current_user["tid"])}
 
 
 @router.get("/departments")
-async def get_departments(current_user: dict = Depends(get_current_admin)):
+def get_departments(current_user: dict = Depends(get_current_admin)):
     """Get list of all departments"""
-    result = supabase.table("faculty_profiles").select("department").execute()
-    departments = set()
-    for row in result.data:
-        if row.get("department"):
-            departments.add(row["department"])
-    
-    return {"departments": sorted(list(departments))}
+    return {"departments": lookup_service.profile_vocabularies(current_user["tid"])["departments"]}
+
+
+@router.get("/bootstrap")
+async def get_admin_bootstrap(current_user: dict = Depends(get_current_admin)):
+    """
+    Everything the admin dashboard needs for its first render in one response:
+    the signed-in admin, filter vocabularies and the faculty list.
+    The lookups and the faculty query run concurrently.
+    """
+    tenant_id = current_user["tid"]
+    academic_years, vocabularies, faculty = await asyncio.gather(
+        run_in_threadpool(lookup_service.academic_years, tenant_id),
+        run_in_threadpool(lookup_service.profile_vocabularies, tenant_id),
+        run_in_threadpool(list_faculty, tenant_id)
+    )
+    return FastJSONResponse({
+        "user": session_info(current_user),
+        "academic_years": academic_years,
+        **vocabularies,
+        **faculty
+    })
+
+
+@router.get("/analytics/summary")
+def get_analytics_summary(
+    academic_year: Optional[str] = None,
+    department: Optional[str] = None,
+    current_user: dict = Depends(get_current_admin)
+):
+    """Totals per metric (publications, awards, patents, conferences, research projects)"""
+    from services import analytics_service
+
+    return analytics_service.summary(current_user["tid"], academic_year, department)
+
+
+@router.get("/analytics/breakdown")
+def get_analytics_breakdown(
+    academic_year: Optional[str] = None,
+    group_by: str = Query("department", pattern="^(department|designation)$"),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Every metric per department (or designation), one series per metric"""
+    from services import analytics_service
+
+    return analytics_service.breakdown(current_user["tid"], academic_year, group_by)
+
+
+@router.get("/analytics/metrics/{metric}")
+def get_analytics_trend(
+    metric: str,
+    group_by: str = Query("department", pattern="^(department|designation)$"),
+    value: str = Query("count", pattern="^(count|amount)$"),
+    department: Optional[str] = None,
+    designation: Optional[str] = None,
+    current_user: dict = Depends(get_current_admin)
+):
+    """One metric per academic year, one series per department (or designation)"""
+    from services import analytics_service
+
+    if metric not in analytics_service.METRICS:
+        raise HTTPException(status_code=404, detail="Unknown metric")
+
+    return analytics_service.metric_trend(current_user["tid"], metric, group_by, value, department, designation)
+
+
+def filter_user_ids(tenant_id: str, department: Optional[str] = None,
+                    designation: Optional[str] = None) -> Optional[set]:
+    """A tenant's faculty ids matching department/designation filters, None when unfiltered"""
+    if not department and not designation:
+        return None
+    return {record.id for record in directory.list(tenant_id, department=department, designation=designation)}
+
+
+@router.get("/publications/unique-counts")
+def get_unique_work_counts(
+    academic_year: Optional[str] = None,
+    department: Optional[str] = None,
+    designation: Optional[str] = None,
+    current_user: dict = Depends(get_current_admin)
+):
+    """Entries and distinct works (co-authored entries counted once) per work table"""
+    from services.work_index import work_index
+
+    tenant_id = current_user["tid"]
+    return work_index.unique_counts(tenant_id, academic_year, filter_user_ids(tenant_id, department, designation))
+
+
+@router.get("/publications/duplicates")
+def get_duplicate_works(
+    table: Optional[str] = None,
+    academic_year: Optional[str] = None,
+    department: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Suspected duplicate groups for review, largest first, with each entry's faculty member"""
+    from services.work_index import WORK_TABLES, work_index
+
+    if table and table not in WORK_TABLES:
+        raise HTTPException(status_code=404, detail="Unknown table")
+
+    tenant_id = current_user["tid"]
+    groups = work_index.duplicate_groups(tenant_id, table, academic_year, filter_user_ids(tenant_id, department))
+    page = groups[offset:offset + limit]
+    for group in page:
+        for entry in group["entries"]:
+            faculty = directory.get(tenant_id, entry["user_id"]) if entry["user_id"] else None
+            entry["faculty_name"] = faculty.name if faculty else None
+            entry["department"] = faculty.department if faculty else None
+    return {"groups": page, "total": len(groups)}
+
+
+@router.get("/sync/changes")
+def get_sync_changes(
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    current_user: dict = Depends(get_current_admin)
+):
+    """
+    Incremental change feed for mirroring faculty data.
+    Pass the previous run's watermark as `since`, then follow `cursor`
+    until has_more is false; tombstones of deleted rows are in `deleted`.
+    """
+    from services.sync_service import get_changes, InvalidCursor
+
+    if since and since.tzinfo is None:
+        raise HTTPException(status_code=400, detail="since must include a timezone offset")
+
+    try:
+        page = get_changes(current_user["tid"], since.astimezone(timezone.utc).isoformat() if since else None, cursor, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return FastJSONResponse(page)
+
+
+@router.get("/profiles")
+def list_request_profiles(current_user: dict = Depends(get_current_admin)):
+    """List stored request profiles (speedscope JSON), newest first"""
+    from services.profiling_service import list_profiles
+
+    profiles = list_profiles(current_user["tid"])
+    return {"profiles": profiles, "total": len(profiles)}
+
+
+@router.get("/profiles/{profile_name}")
+def download_request_profile(profile_name: str, current_user: dict = Depends(get_current_admin)):
+    """Download a stored request profile; open it at https://www.speedscope.app"""
+    from services.profiling_service import get_profile_path
+
+    path = get_profile_path(current_user["tid"], profile_name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return FileResponse(path, media_type="application/json", filename=profile_name)
+
+
+@router.get("/admission")
+async def get_admission_stats(current_user: dict = Depends(get_current_admin)):
+    """In-flight, queued and rejected request counters per route class"""
+    from services.admission import admission_controller
+
+    return {"lanes": admission_controller.stats()}
@@ -3,21 +3,33 @@ Authentication Router - Login and faculty password generation
 """
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+import logging
 
-from database import supabase
+from database import supabase, for_tenant
 from services.auth_utils import (
     generate_password, 
     hash_password, 
-    verify_password, 
+    verify_and_update_password, 
     create_access_token,
-    decode_access_token
+    decode_access_token,
+    revoke_access_token,
+    session_info
 )
 from services.email_service import send_password_email
+from services.faculty_directory import directory
+from services.event_bus import notify_change
+from services import token_service
+from config import JWT_EXPIRE_MINUTES
+from routers.admin import get_current_admin
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["Authentication"])
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 # Pydantic models
@@ -39,6 +51,16 @@ class LoginResponse(BaseModel):
     user_type: str
     user_id: str
     name: str
+    refresh_token: str
+    expires_in: int
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 
 class MessageResponse(BaseModel):
@@ -57,20 +79,54 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return payload
 
 
+def issue_tokens(session: dict, refresh_token: Optional[str] = None) -> LoginResponse:
+    """
+    Build the token response for a session
+    
+    Args:
+        session: user_id, user_type, email, name, tenant_id and (faculty) employee_id
+        refresh_token: Already issued refresh token; a new family is started when omitted
+    
+    Returns:
+        LoginResponse with a fresh access token
+    """
+    claims = {
+        "sub": session["user_id"],
+        "email": session["email"],
+        "user_type": session["user_type"],
+        "name": session["name"],
+        # Tenant of every query made with this token
+        "tid": session["tenant_id"]
+    }
+    if session.get("employee_id"):
+        claims["employee_id"] = session["employee_id"]
+    
+    return LoginResponse(
+        access_token=create_access_token(claims),
+        token_type="bearer",
+        user_type=session["user_type"],
+        user_id=session["user_id"],
+        name=session["name"],
+        refresh_token=refresh_token or token_service.issue_refresh_token(session),
+        expires_in=JWT_EXPIRE_MINUTES * 60
+    )
+
+
 @router.post("/generate-password", response_model=MessageResponse)
-async def generate_faculty_password(faculty: FacultyCreate):
+def generate_faculty_password(faculty: FacultyCreate, current_user: dict = Depends(get_current_admin)):
     """
     Generate password for a new faculty member and send via email.
-    Called by admin to create new faculty accounts.
+    Called by admin to create new faculty accounts in the admin's institution.
     """
+    db = for_tenant(current_user["tid"])
     try:
-        # Check if email already exists in faculty_users
+        # Emails are login names, so they are unique across all institutions
         existing = supabase.table("faculty_users").select("id").eq("email", faculty.email).execute()
         if existing.data:
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        # Check if employee_id already exists
-        existing_emp = supabase.table("faculty_users").select("id").eq("employee_id", faculty.employee_id).execute()
+        # Employee IDs are unique within the institution
+        existing_emp = db.table("faculty_users").select("id").eq("employee_id", faculty.employee_id).execute()
         if existing_emp.data:
             raise HTTPException(status_code=400, detail="Employee ID already registered")
         
@@ -79,7 +135,7 @@ async def generate_faculty_password(faculty: FacultyCreate):
         hashed = hash_password(plain_password)
         
         # Insert into faculty_users table
-        result = supabase.table("faculty_users").insert({
+        result = db.table("faculty_users").insert({
             "email": faculty.email,
             "password_hash": hashed,
             "name": faculty.name,
@@ -90,6 +146,9 @@ async def generate_faculty_password(faculty: FacultyCreate):
         
         if not result.data:
             raise HTTPException(status_code=500, detail="Failed to create faculty account")
+        # Show the new account in this worker's faculty list right away
+        directory.invalidate()
+        notify_change(current_user["tid"], result.data[0]["id"], "faculty_users", "insert", result.data[0]["id"])
         
         # Send password email
         email_sent = send_password_email(faculty.email, faculty.name, plain_password)
@@ -111,6 +170,20 @@ async def generate_faculty_password(faculty: FacultyCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def check_password(table: str, user: dict, password: str) -> bool:
+    """
+    Verify a login password; a valid password whose hash predates the
+    current password policy is rehashed and stored (best effort)
+    """
+    valid, new_hash = verify_and_update_password(password, user["password_hash"])
+    if valid and new_hash:
+        try:
+            supabase.table(table).update({"password_hash": new_hash}, returning="minimal").eq("id", user["id"]).execute()
+        except Exception:
+            logger.exception("Failed to store the rehashed password of %s %s", table, user["id"])
+    return valid
+
+
 @router.post("/login", response_model=LoginResponse)
 async def login(request: LoginRequest):
     """
@@ -126,20 +199,15 @@ async def login(request: LoginRequest):
             if not admin.get("is_active", True):
                 raise HTTPException(status_code=403, detail="Account is deactivated")
             
-            if verify_password(request.password, admin["password_hash"]):
-                token = create_access_token({
-                    "sub": admin["id"],
+            # Password hashing is deliberately slow; keep it off the event loop
+            if await run_in_threadpool(check_password, "admins", admin, request.password):
+                return issue_tokens({
+                    "user_id": admin["id"],
                     "email": admin["email"],
                     "user_type": "admin",
-                    "name": admin["name"]
+                    "name": admin["name"],
+                    "tenant_id": admin["tenant_id"]
                 })
-                return LoginResponse(
-                    access_token=token,
-                    token_type="bearer",
-                    user_type="admin",
-                    user_id=admin["id"],
-                    name=admin["name"]
-                )
         
         # Check if faculty
         faculty_result = supabase.table("faculty_users").select("*").eq("email", request.email).execute()
@@ -149,21 +217,15 @@ async def login(request: LoginRequest):
             if not faculty.get("is_active", True):
                 raise HTTPException(status_code=403, detail="Account is deactivated")
             
-            if verify_password(request.password, faculty["password_hash"]):
-                token = create_access_token({
-                    "sub": faculty["id"],
+            if await run_in_threadpool(check_password, "faculty_users", faculty, request.password):
+                return issue_tokens({
+                    "user_id": faculty["id"],
                     "email": faculty["email"],
                     "user_type": "faculty",
                     "name": faculty["name"],
-                    "employee_id": faculty["employee_id"]
+                    "employee_id": faculty["employee_id"],
+                    "tenant_id": faculty["tenant_id"]
                 })
-                return LoginResponse(
-                    access_token=token,
-                    token_type="bearer",
-                    user_type="faculty",
-                    user_id=faculty["id"],
-                    name=faculty["name"]
-                )
         
         raise HTTPException(status_code=401, detail="Invalid email or password")
         
@@ -173,12 +235,44 @@ async def login(request: LoginRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/refresh", response_model=LoginResponse)
+def refresh(request: RefreshRequest):
+    """
+    Exchange a refresh token for a new access token and refresh token.
+    The presented refresh token is consumed (rotation).
+    """
+    try:
+        session = token_service.rotate_refresh_token(request.refresh_token)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    
+    return issue_tokens(session, session["refresh_token"])
+
+
+@router.post("/logout", response_model=MessageResponse)
+def logout(
+    request: LogoutRequest,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Revoke the current access token and the session's refresh tokens"""
+    if credentials:
+        payload = decode_access_token(credentials.credentials)
+        if payload:
+            revoke_access_token(payload)
+    
+    if request.refresh_token:
+        try:
+            token_service.revoke_refresh_token(request.refresh_token)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    
+    return MessageResponse(message="Logged out", success=True)
+
+
 @router.get("/me")
 async def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """Get current logged in user information"""
-    return {
-        "user_id": current_user.get("sub"),
-        "email": current_user.get("email"),
-        "user_type": current_user.get("user_type"),
-        "name": current_user.get("name")
-    }
+    return session_info(current_user)
@@ -0,0 +1,77 @@
+"""
+Events Router - Server-Sent Events stream for the dashboards
+"""
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import time
+
+import orjson
+
+from config import EVENTS_HEARTBEAT_SECONDS, EVENTS_MAX_STREAMS
+from services.auth_utils import decode_access_token
+from services.event_bus import event_bus, tenant_topic, user_topic
+
+router = APIRouter(prefix="/api", tags=["Events"])
+
+
+def _format(event: dict) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event["id"], event["event"].encode(), orjson.dumps(event["data"]))
+
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    token: str = Query(..., description="Access token (EventSource cannot send headers)"),
+    last_event_id: Optional[int] = Query(None, alias="last_event_id")
+):
+    """
+    Live updates for the signed-in user as text/event-stream
+
+    Faculty receive data.changed for their own data; admins also receive
+    data.changed for every faculty member of their tenant, and both get
+    export.progress / export.done / export.failed for exports they started
+    with a progress_id. The stream ends with a reauth event when the
+    access token expires, so the client reconnects with a fresh one.
+    """
+    payload = decode_access_token(token)
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    if event_bus.stream_count >= EVENTS_MAX_STREAMS:
+        raise HTTPException(status_code=503, detail="Too many open event streams",
+                            headers={"Retry-After": str(EVENTS_HEARTBEAT_SECONDS)})
+
+    topics = [user_topic(payload["sub"])]
+    if payload.get("user_type") == "admin":
+        topics.append(tenant_topic(payload["tid"]))
+
+    # EventSource sends the last id it saw as a header when it reconnects by itself
+    header_id = request.headers.get("last-event-id", "")
+    resume_from = int(header_id) if header_id.isdigit() else last_event_id
+    subscription = event_bus.subscribe(topics, resume_from)
+
+    async def events():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                remaining = payload["exp"] - time.time()
+                if remaining <= 0:
+                    yield b"event: reauth\ndata: {}\n\n"
+                    return
+                event = await subscription.next(min(EVENTS_HEARTBEAT_SECONDS, remaining))
+                if subscription.overflowed:
+                    # Events were dropped; the client reloads instead of applying a partial stream
+                    subscription.overflowed = False
+                    yield b"event: resync\ndata: {}\n\n"
+                if event is None:
+                    yield b": keepalive\n\n"
+                else:
+                    yield _format(event)
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Stop reverse proxies (nginx) from buffering the stream
+        "X-Accel-Buffering": "no"
+    })
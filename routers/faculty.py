@@ -1,17 +1,25 @@
 """
 Faculty Router - Faculty profile and data management
 """
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import date
+import asyncio
 import uuid
 
-from database import supabase
-from services.auth_utils import decode_access_token
+from database import for_tenant, runs_queries_concurrently
+from services import archive_service, etag_service, lookup_service
+from services.auth_utils import decode_access_token, session_info
+from services.event_bus import notify_change
+from services.faculty_directory import directory
+from services.profiling_service import ProfiledRoute
+from services.responses import FastJSONResponse
 
-router = APIRouter(prefix="/api/faculty", tags=["Faculty"])
+# Sync endpoints (exports) are profiled in their worker thread
+router = APIRouter(prefix="/api/faculty", tags=["Faculty"], route_class=ProfiledRoute)
 security = HTTPBearer()
 
 
@@ -81,46 +89,62 @@ class ConferenceCreate(BaseModel):
     level: Optional[str] = None
 
 
+class FacultyDataResponse(BaseModel):
+    """Rows of every faculty data table, keyed by table name"""
+    profile: List[Dict[str, Any]] = []
+    previous_work: List[Dict[str, Any]] = []
+    courses_taught: List[Dict[str, Any]] = []
+    publications: List[Dict[str, Any]] = []
+    book_publications: List[Dict[str, Any]] = []
+    awards: List[Dict[str, Any]] = []
+    ict_creations: List[Dict[str, Any]] = []
+    research_guidance: List[Dict[str, Any]] = []
+    pg_dissertations: List[Dict[str, Any]] = []
+    research_projects: List[Dict[str, Any]] = []
+    patents: List[Dict[str, Any]] = []
+    conferences: List[Dict[str, Any]] = []
+    seminars: List[Dict[str, Any]] = []
+    lectures: List[Dict[str, Any]] = []
+    other_details: List[Dict[str, Any]] = []
+    memberships: List[Dict[str, Any]] = []
+
+
 # Profile endpoints
 @router.get("/profile")
-async def get_profile(current_user: dict = Depends(get_current_faculty)):
+async def get_profile(request: Request, current_user: dict = Depends(get_current_faculty)):
     """Get current faculty member's profile"""
     user_id = current_user.get("sub")
+    db = for_tenant(current_user["tid"])
+    claims = {key: current_user.get(key) for key in ("name", "email", "employee_id")}
+    
+    # The no-profile fallback comes from the token, so its claims are part of the ETag
+    etag, not_modified = etag_service.conditional_get(request, current_user["tid"], user_id, claims)
+    if not_modified:
+        return not_modified
     
     # Get profile
-    result = supabase.table("faculty_profiles").select("*").eq("user_id", user_id).execute()
+    result = db.table("faculty_profiles").select("*").eq("user_id", user_id).execute()
     
     if result.data:
-        return {"profile": result.data[0], "exists": True}
+        return etag_service.tag(FastJSONResponse({"profile": result.data[0], "exists": True}), etag)
     
     # Return user basic info if no profile yet
-    return {
-        "profile": {
-            "name": current_user.get("name"),
-            "email": current_user.get("email"),
-            "employee_id": current_user.get("employee_id")
-        },
-        "exists": False
-    }
+    return etag_service.tag(FastJSONResponse({"profile": claims, "exists": False}), etag)
 
 
 @router.post("/profile")
 async def update_profile(profile: ProfileUpdate, current_user: dict = Depends(get_current_faculty)):
     """Create or update faculty profile"""
     user_id = current_user.get("sub")
-    
-    # Check if profile exists
-    existing = supabase.table("faculty_profiles").select("id").eq("user_id", user_id).execute()
+    db = for_tenant(current_user["tid"])
     
     profile_data = {k: v for k, v in profile.dict().items() if v is not None}
     profile_data["user_id"] = user_id
     
-    if existing.data:
-        # Update existing
-        result = supabase.table("faculty_profiles").update(profile_data).eq("user_id", user_id).execute()
-    else:
-        # Create new
-        result = supabase.table("faculty_profiles").insert(profile_data).execute()
+    # One statement, so two concurrent first saves cannot both insert
+    result = db.table("faculty_profiles").upsert(profile_data, on_conflict="user_id").execute()
+    directory.invalidate()
+    notify_change(current_user["tid"], user_id, "faculty_profiles", "update")
     
     return {"message": "Profile updated successfully", "profile": result.data[0] if result.data else None}
 
@@ -132,31 +156,35 @@ async def upload_profile_photo(
 ):
     """Upload faculty profile photo to Supabase storage"""
     user_id = current_user.get("sub")
+    db = for_tenant(current_user["tid"])
     
     # Validate file type
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
     
-    # Generate unique filename
+    # Generate unique filename (one folder per tenant in the shared bucket)
     ext = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-    filename = f"{user_id}.{ext}"
+    filename = f"{current_user['tid']}/{user_id}.{ext}"
     
     try:
         # Read file content
         content = await file.read()
         
         # Upload to Supabase storage
-        result = supabase.storage.from_("profile-pictures").upload(
+        result = db.storage.from_("profile-pictures").upload(
             filename,
             content,
             {"content-type": file.content_type, "upsert": "true"}
         )
         
         # Get public URL
-        public_url = supabase.storage.from_("profile-pictures").get_public_url(filename)
+        public_url = db.storage.from_("profile-pictures").get_public_url(filename)
         
         # Update profile with photo URL
-        supabase.table("faculty_profiles").update({"photo_url": public_url}).eq("user_id", user_id).execute()
+        db.table("faculty_profiles").update(
+            {"photo_url": public_url}, returning="minimal"
+        ).eq("user_id", user_id).execute()
+        notify_change(current_user["tid"], user_id, "faculty_profiles", "update")
         
         return {"message": "Photo uploaded successfully", "photo_url": public_url}
         
@@ -167,208 +195,285 @@ async def upload_profile_photo(
 # Publications endpoints
 @router.get("/publications")
 async def get_publications(
+    request: Request,
     academic_year: Optional[str] = None,
     current_user: dict = Depends(get_current_faculty)
 ):
     """Get faculty publications, optionally filtered by academic year"""
     user_id = current_user.get("sub")
+    etag, not_modified = etag_service.conditional_get(request, current_user["tid"], user_id)
+    if not_modified:
+        return not_modified
     
-    query = supabase.table("publications").select("*").eq("user_id", user_id)
-    
-    if academic_year:
-        query = query.eq("academic_year", academic_year)
-    
-    result = query.order("created_at", desc=True).execute()
-    return {"publications": result.data}
+    rows = await run_in_threadpool(get_table_data, current_user["tid"], user_id, "publications", academic_year,
+                                   newest_first=True)
+    return etag_service.tag(FastJSONResponse({"publications": rows}), etag)
 
 
 @router.post("/publications")
 async def add_publication(pub: PublicationCreate, current_user: dict = Depends(get_current_faculty)):
     """Add a new publication"""
     user_id = current_user.get("sub")
+    db = for_tenant(current_user["tid"])
     
     data = pub.dict()
     data["user_id"] = user_id
+    data["id"] = str(uuid.uuid4())
     
-    result = supabase.table("publications").insert(data).execute()
-    return {"message": "Publication added", "publication": result.data[0] if result.data else None}
+    db.table("publications").insert(data, returning="minimal").execute()
+    notify_change(current_user["tid"], user_id, "publications", "insert", data["id"])
+    return {"message": "Publication added", "id": data["id"]}
 
 
 @router.delete("/publications/{pub_id}")
 async def delete_publication(pub_id: str, current_user: dict = Depends(get_current_faculty)):
     """Delete a publication"""
     user_id = current_user.get("sub")
+    db = for_tenant(current_user["tid"])
     
-    result = supabase.table("publications").delete().eq("id", pub_id).eq("user_id", user_id).execute()
+    db.table("publications").delete(returning="minimal").eq("id", pub_id).eq("user_id", user_id).execute()
+    notify_change(current_user["tid"], user_id, "publications", "delete", pub_id)
     return {"message": "Publication deleted"}
 
 
 # Awards endpoints
 @router.get("/awards")
-async def get_awards(academic_year: Optional[str] = None, current_user: dict = Depends(get_current_faculty)):
+async def get_awards(
+    request: Request,
+    academic_year: Optional[str] = None,
+    current_user: dict = Depends(get_current_faculty)
+):
     user_id = current_user.get("sub")
-    query = supabase.table("awards").select("*").eq("user_id", user_id)
-    if academic_year:
-        query = query.eq("academic_year", academic_year)
-    result = query.order("created_at", desc=True).execute()
-    return {"awards": result.data}
+    etag, not_modified = etag_service.conditional_get(request, current_user["tid"], user_id)
+    if not_modified:
+        return not_modified
+    rows = await run_in_threadpool(get_table_data, current_user["tid"], user_id, "awards", academic_year,
+                                   newest_first=True)
+    return etag_service.tag(FastJSONResponse({"awards": rows}), etag)
 
 
 @router.post("/awards")
 async def add_award(award: AwardCreate, current_user: dict = Depends(get_current_faculty)):
     user_id = current_user.get("sub")
+    db = for_tenant(current_user["tid"])
     data = award.dict()
     data["user_id"] = user_id
-    result = supabase.table("awards").insert(data).execute()
-    return {"message": "Award added", "award": result.data[0] if result.data else None}
+    data["id"] = str(uuid.uuid4())
+    db.table("awards").insert(data, returning="minimal").execute()
+    notify_change(current_user["tid"], user_id, "awards", "insert", data["id"])
+    return {"message": "Award added", "id": data["id"]}
 
 
 # Research Projects endpoints
 @router.get("/research-projects")
-async def get_research_projects(academic_year: Optional[str] = None, current_user: dict = Depends(get_current_faculty)):
+async def get_research_projects(
+    request: Request,
+    academic_year: Optional[str] = None,
+    current_user: dict = Depends(get_current_faculty)
+):
     user_id = current_user.get("sub")
-    query = supabase.table("research_projects").select("*").eq("user_id", user_id)
-    if academic_year:
-        query = query.eq("academic_year", academic_year)
-    result = query.order("created_at", desc=True).execute()
-    return {"research_projects": result.data}
+    etag, not_modified = etag_service.conditional_get(request, current_user["tid"], user_id)
+    if not_modified:
+        return not_modified
+    rows = await run_in_threadpool(get_table_data, current_user["tid"], user_id, "research_projects", academic_year,
+                                   newest_first=True)
+    return etag_service.tag(FastJSONResponse({"research_projects": rows}), etag)
 
 
 @router.post("/research-projects")
 async def add_research_project(project: ResearchProjectCreate, current_user: dict = Depends(get_current_faculty)):
     user_id = current_user.get("sub")
+    db = for_tenant(current_user["tid"])
     data = project.dict()
     data["user_id"] = user_id
-    result = supabase.table("research_projects").insert(data).execute()
-    return {"message": "Research project added", "project": result.data[0] if result.data else None}
+    data["id"] = str(uuid.uuid4())
+    db.table("research_projects").insert(data, returning="minimal").execute()
+    notify_change(current_user["tid"], user_id, "research_projects", "insert", data["id"])
+    return {"message": "Research project added", "id": data["id"]}
 
 
 # Patents endpoints
 @router.get("/patents")
-async def get_patents(academic_year: Optional[str] = None, current_user: dict = Depends(get_current_faculty)):
+async def get_patents(
+    request: Request,
+    academic_year: Optional[str] = None,
+    current_user: dict = Depends(get_current_faculty)
+):
     user_id = current_user.get("sub")
-    query = supabase.table("patents").select("*").eq("user_id", user_id)
-    if academic_year:
-        query = query.eq("academic_year", academic_year)
-    result = query.order("created_at", desc=True).execute()
-    return {"patents": result.data}
+    etag, not_modified = etag_service.conditional_get(request, current_user["tid"], user_id)
+    if not_modified:
+        return not_modified
+    rows = await run_in_threadpool(get_table_data, current_user["tid"], user_id, "patents", academic_year,
+                                   newest_first=True)
+    return etag_service.tag(FastJSONResponse({"patents": rows}), etag)
 
 
 @router.post("/patents")
 async def add_patent(patent: PatentCreate, current_user: dict = Depends(get_current_faculty)):
     user_id = current_user.get("sub")
+    db = for_tenant(current_user["tid"])
     data = patent.dict()
     data["user_id"] = user_id
-    result = supabase.table("patents").insert(data).execute()
-    return {"message": "Patent added", "patent": result.data[0] if result.data else None}
+    data["id"] = str(uuid.uuid4())
+    db.table("patents").insert(data, returning="minimal").execute()
+    notify_change(current_user["tid"], user_id, "patents", "insert", data["id"])
+    return {"message": "Patent added", "id": data["id"]}
 
 
 # Conferences endpoints
 @router.get("/conferences")
-async def get_conferences(academic_year: Optional[str] = None, current_user: dict = Depends(get_current_faculty)):
+async def get_conferences(
+    request: Request,
+    academic_year: Optional[str] = None,
+    current_user: dict = Depends(get_current_faculty)
+):
     user_id = current_user.get("sub")
-    query = supabase.table("conferences").select("*").eq("user_id", user_id)
-    if academic_year:
-        query = query.eq("academic_year", academic_year)
-    result = query.order("created_at", desc=True).execute()
-    return {"conferences": result.data}
+    etag, not_modified = etag_service.conditional_get(request, current_user["tid"], user_id)
+    if not_modified:
+        return not_modified
+    rows = await run_in_threadpool(get_table_data, current_user["tid"], user_id, "conferences", academic_year,
+                                   newest_first=True)
+    return etag_service.tag(FastJSONResponse({"conferences": rows}), etag)
 
 
 @router.post("/conferences")
 async def add_conference(conf: ConferenceCreate, current_user: dict = Depends(get_current_faculty)):
     user_id = current_user.get("sub")
+    db = for_tenant(current_user["tid"])
     data = conf.dict()
     data["user_id"] = user_id
-    result = supabase.table("conferences").insert(data).execute()
-    return {"message": "Conference added", "conference": result.data[0] if result.data else None}
+    data["id"] = str(uuid.uuid4())
+    db.table("conferences").insert(data, returning="minimal").execute()
+    notify_change(current_user["tid"], user_id, "conferences", "insert", data["id"])
+    return {"message": "Conference added", "id": data["id"]}
+
+
+# Response key -> table of the faculty data loaded for the dashboard
+FACULTY_DATA_TABLES = {
+    "profile": "faculty_profiles",
+    "previous_work": "previous_work",
+    "courses_taught": "courses_taught",
+    "publications": "publications",
+    "book_publications": "book_publications",
+    "awards": "awards",
+    "ict_creations": "ict_creations",
+    "research_guidance": "research_guidance",
+    "pg_dissertations": "pg_dissertations",
+    "research_projects": "research_projects",
+    "patents": "patents",
+    "conferences": "conferences",
+    "seminars": "seminars",
+    "lectures": "lectures",
+    "other_details": "other_details",
+    "memberships": "memberships",
+}
+UNDATED_TABLES = {"faculty_profiles", "previous_work", "courses_taught", "pg_dissertations"}
+
+
+def get_table_data(tenant_id: str, user_id: str, table_name: str,
+                   academic_year: Optional[str] = None, newest_first: bool = False) -> List[Dict]:
+    """
+    A faculty member's rows of one table for the dashboard
+
+    Rows of archived academic years come from their snapshot and are marked
+    "archived": true; they are read-only (nothing in the database to edit).
+    """
+    scope = archive_service.ReportScope(tenant_id, table_name,
+                                        None if table_name in UNDATED_TABLES else academic_year)
+    rows = []
+    if scope.reads_database:
+        query = for_tenant(tenant_id).table(table_name).select("*").eq("user_id", user_id)
+        if academic_year and table_name not in UNDATED_TABLES:
+            query = query.eq("academic_year", academic_year)
+        if newest_first:
+            query = query.order("created_at", desc=True)
+        rows = scope.hot(query.execute().data)
+    archived = [{**row, "archived": True} for row in scope.archived_rows([user_id])]
+    if newest_first:
+        archived.sort(key=lambda row: row.get("created_at") or "", reverse=True)
+    return rows + archived
+
+
+async def load_faculty_data(tenant_id: str, user_id: str,
+                            academic_year: Optional[str] = None) -> Dict[str, List[Dict]]:
+    """Rows of every faculty data table, with the table queries run concurrently where the backend can"""
+    tables = FACULTY_DATA_TABLES.values()
+    if not runs_queries_concurrently():
+        # One thread hop instead of 16 that would only queue on the client's lock
+        results = await run_in_threadpool(
+            lambda: [get_table_data(tenant_id, user_id, table, academic_year) for table in tables])
+    else:
+        results = await asyncio.gather(*(
+            run_in_threadpool(get_table_data, tenant_id, user_id, table, academic_year) for table in tables
+        ))
+    return dict(zip(FACULTY_DATA_TABLES, results))
 
 
 # Get all data for faculty
-@router.get("/all-data")
+@router.get("/all-data", response_model=FacultyDataResponse)
 async def get_all_faculty_data(
+    request: Request,
     academic_year: Optional[str] = None,
     current_user: dict = Depends(get_current_faculty)
 ):
     """Get all data for the current faculty member"""
     user_id = current_user.get("sub")
+    etag, not_modified = etag_service.conditional_get(request, current_user["tid"], user_id)
+    if not_modified:
+        return not_modified
     
-    def get_table_data(table_name):
-        query = supabase.table(table_name).select("*").eq("user_id", user_id)
-        if academic_year and table_name not in ["faculty_profiles", "previous_work", "courses_taught", "pg_dissertations"]:
-            query = query.eq("academic_year", academic_year)
-        return query.execute().data
+    # Rows are already JSON-native; render with orjson and skip jsonable_encoder
+    data = await load_faculty_data(current_user["tid"], user_id, academic_year)
+    return etag_service.tag(FastJSONResponse(data), etag)
+
+
+@router.get("/bootstrap")
+async def get_faculty_bootstrap(
+    request: Request,
+    academic_year: Optional[str] = None,
+    current_user: dict = Depends(get_current_faculty)
+):
+    """
+    Everything the faculty dashboard needs for its first render in one response:
+    the signed-in user, the academic year filter and all of their data.
+    The table queries run concurrently, and not at all when the client's
+    copy is current.
+    """
+    user_id = current_user.get("sub")
+    user = session_info(current_user)
+    # The year list is shared across the tenant's faculty, so it is part of the ETag
+    academic_years = await run_in_threadpool(lookup_service.academic_years, current_user["tid"])
+    etag, not_modified = etag_service.conditional_get(request, current_user["tid"], user_id, user, academic_years)
+    if not_modified:
+        return not_modified
     
-    return {
-        "profile": get_table_data("faculty_profiles"),
-        "previous_work": get_table_data("previous_work"),
-        "courses_taught": get_table_data("courses_taught"),
-        "publications": get_table_data("publications"),
-        "book_publications": get_table_data("book_publications"),
-        "awards": get_table_data("awards"),
-        "ict_creations": get_table_data("ict_creations"),
-        "research_guidance": get_table_data("research_guidance"),
-        "pg_dissertations": get_table_data("pg_dissertations"),
-        "research_projects": get_table_data("research_projects"),
-        "patents": get_table_data("patents"),
-        "conferences": get_table_data("conferences"),
-        "seminars": get_table_data("seminars"),
-        "lectures": get_table_data("lectures"),
-        "other_details": get_table_data("other_details"),
-        "memberships": get_table_data("memberships")
-    }
+    data = await load_faculty_data(current_user["tid"], user_id, academic_year)
+    return etag_service.tag(FastJSONResponse({
+        "user": user,
+        "academic_years": academic_years,
+        **data
+    }), etag)
 
 
 # Faculty self PDF download
 @router.get("/export/my-pdf")
-async def export_my_pdf(
+def export_my_pdf(
     academic_year: Optional[str] = None,
     current_user: dict = Depends(get_current_faculty)
 ):
     """Export current faculty member's data as PDF"""
     from fastapi.responses import StreamingResponse
+    from routers.admin import load_faculty_details
     from services.export_service import generate_faculty_pdf
     import io
     
-    user_id = current_user.get("sub")
-    
-    # Get faculty user info
-    user_result = supabase.table("faculty_users").select("*").eq("id", user_id).execute()
-    if not user_result.data:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    faculty_user = user_result.data[0]
-    
-    # Helper to get table data
-    def get_table_data(table_name, has_academic_year=True):
-        query = supabase.table(table_name).select("*").eq("user_id", user_id)
-        if academic_year and has_academic_year:
-            query = query.eq("academic_year", academic_year)
-        return query.execute().data
-    
-    data = {
-        "user": {
-            "id": faculty_user["id"],
-            "name": faculty_user["name"],
-            "email": faculty_user["email"],
-            "employee_id": faculty_user["employee_id"],
-            "phone": faculty_user.get("phone")
-        },
-        "profile": get_table_data("faculty_profiles", False),
-        "publications": get_table_data("publications"),
-        "book_publications": get_table_data("book_publications"),
-        "awards": get_table_data("awards"),
-        "research_projects": get_table_data("research_projects"),
-        "patents": get_table_data("patents"),
-        "conferences": get_table_data("conferences"),
-        "seminars": get_table_data("seminars"),
-        "lectures": get_table_data("lectures"),
-        "memberships": get_table_data("memberships")
-    }
+    # Same loader as the admin PDF, so both carry every section
+    data = load_faculty_details(current_user["tid"], current_user.get("sub"), academic_year)
     
     # Generate PDF
     pdf_buffer = generate_faculty_pdf(data, academic_year)
     
-    filename = f"my_profile_{faculty_user['employee_id']}_{academic_year or 'all'}.pdf"
+    filename = f"my_profile_{data['user']['employee_id']}_{academic_year or 'all'}.pdf"
     
     return StreamingResponse(
         io.BytesIO(pdf_buffer),
@@ -0,0 +1,175 @@
+"""
+Admission control - per route class concurrency limits with bounded queues
+
+Every API request is assigned a route class (lane). Each lane has its
+own concurrency limit and wait queue, so a burst of report exports can
+only ever occupy the export lane while login and faculty self-service
+keep their own capacity. Inside the lanes listed in
+ADMISSION_TENANT_LIMITS (none by default) each tenant (from the bearer token) also has its
+own smaller limit and queue, so one institution's export run cannot take
+every export slot from the others. When a lane and its queue are full, or a
+queued request waits too long, the request is rejected with 503 and a
+Retry-After header instead of piling up.
+"""
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import ADMISSION_LIMITS, ADMISSION_TENANT_LIMITS, ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER
+from services.auth_utils import token_tenant
+
+# (path prefix, lane) - first match wins
+ROUTE_CLASSES = (
+    ("/api/login", "auth"),
+    ("/api/refresh", "auth"),
+    ("/api/me", "auth"),
+    ("/api/faculty/export/", "export"),
+    ("/api/faculty/", "faculty"),
+    ("/api/admin/export/", "export"),
+    ("/api/admin/academic-years", "export"),
+    ("/api/admin/sync/", "export"),
+    ("/api/admin/", "admin"),
+    ("/api/generate-password", "admin"),
+)
+
+
+def classify(path: str) -> Optional[str]:
+    """Return the lane for a request path, or None for unlimited routes"""
+    for prefix, lane in ROUTE_CLASSES:
+        if path.startswith(prefix):
+            return lane
+    return None
+
+
+class Lane:
+    """Concurrency limit plus bounded wait queue for one route class"""
+
+    __slots__ = ("name", "limit", "queue_size", "semaphore", "in_flight", "queued",
+                 "admitted", "rejected", "timed_out")
+
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting in the queue if needed; False if rejected"""
+        if self.semaphore.locked():
+            if self.queued >= self.queue_size:
+                self.rejected += 1
+                return False
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                return False
+            finally:
+                self.queued -= 1
+        else:
+            await self.semaphore.acquire()
+
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted_total": self.admitted,
+            "rejected_total": self.rejected,
+            "timed_out_total": self.timed_out
+        }
+
+
+class AdmissionController:
+    def __init__(self, limits: Dict[str, Tuple[int, int]], queue_timeout: float, retry_after: int,
+                 tenant_limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.lanes = {name: Lane(name, limit, queue) for name, (limit, queue) in limits.items()}
+        self.tenant_limits = tenant_limits or {}
+        # (lane, tenant) -> the tenant's share of that lane, created on first use
+        self.tenant_lanes: Dict[Tuple[str, str], Lane] = {}
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+    def tenant_lane(self, lane: str, tenant_id: Optional[str]) -> Optional[Lane]:
+        """The tenant's sub-lane of a lane, None if the lane has no per-tenant limit"""
+        if tenant_id is None or lane not in self.tenant_limits:
+            return None
+        sub_lane = self.tenant_lanes.get((lane, tenant_id))
+        if sub_lane is None:
+            limit, queue = self.tenant_limits[lane]
+            sub_lane = self.tenant_lanes[(lane, tenant_id)] = Lane(f"{lane}:{tenant_id}", limit, queue)
+        return sub_lane
+
+    def stats(self) -> Dict[str, Dict]:
+        stats = {name: lane.stats() for name, lane in self.lanes.items()}
+        for (name, tenant_id), sub_lane in self.tenant_lanes.items():
+            stats[name].setdefault("tenants", {})[tenant_id] = sub_lane.stats()
+        return stats
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware enforcing the AdmissionController's lanes"""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        name = classify(scope["path"]) if scope["type"] == "http" else None
+        lane = self.controller.lanes.get(name)
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        tenant_lane = None
+        if name in self.controller.tenant_limits:
+            authorization = next((value.decode("latin-1") for key, value in scope["headers"]
+                                  if key == b"authorization"), None)
+            tenant_lane = self.controller.tenant_lane(name, token_tenant(authorization))
+
+        # The tenant's share first, so a tenant over its quota never holds a shared slot
+        if tenant_lane is not None and not await tenant_lane.acquire(self.controller.queue_timeout):
+            await self._reject(scope, receive, send)
+            return
+        if not await lane.acquire(self.controller.queue_timeout):
+            if tenant_lane is not None:
+                tenant_lane.release()
+            await self._reject(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release()
+            if tenant_lane is not None:
+                tenant_lane.release()
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send):
+        response = JSONResponse(
+            {"detail": "Server is busy, please retry shortly"},
+            status_code=503,
+            headers={"Retry-After": str(self.controller.retry_after)}
+        )
+        await response(scope, receive, send)
+
+
+# Process-wide controller used by main.py and the /api/admin/admission endpoint
+admission_controller = AdmissionController(ADMISSION_LIMITS, ADMISSION_QUEUE_TIMEOUT, ADMISSION_RETRY_AFTER,
+                                           ADMISSION_TENANT_LIMITS)
@@ -0,0 +1,149 @@
+"""
+Analytics Service - chart-ready series from the activity rollups
+
+Database triggers keep activity_rollups up to date on every write (see
+supabase_schema.sql); the department_rollups view groups it by
+department, designation, academic year and metric. That view is small,
+so each tenant's rows are read once per ANALYTICS_CACHE_SECONDS (across
+all workers, via the shared cache, keyed by tenant) and every series is
+sliced from memory.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from config import ANALYTICS_CACHE_SECONDS
+from database import supabase, fetch_all
+from services import shared_cache
+
+# Rollup metric -> chart label
+METRICS = {
+    "publications": "Publications",
+    "awards": "Awards",
+    "patents": "Patents",
+    "conferences": "Conferences",
+    "research_projects": "Research Projects",
+}
+
+GROUP_BY_FIELDS = ("department", "designation")
+VALUE_FIELDS = {"count": "row_count", "amount": "amount_sum"}
+UNASSIGNED = "Unassigned"
+
+CACHE_KEY = "analytics:department_rollups:{tenant_id}"
+
+
+def _load_rollups(tenant_id: str) -> List[Dict]:
+    return fetch_all(lambda: supabase.table("department_rollups").select("*")
+                     .eq("tenant_id", tenant_id)
+                     .order("academic_year").order("metric")
+                     .order("department").order("designation"))
+
+
+def get_rollups(tenant_id: str) -> List[Dict]:
+    """A tenant's department rollup rows, refreshed at most every ANALYTICS_CACHE_SECONDS"""
+    return shared_cache.get_or_load(CACHE_KEY.format(tenant_id=tenant_id), ANALYTICS_CACHE_SECONDS,
+                                    lambda: _load_rollups(tenant_id))
+
+
+def invalidate(tenant_id: str):
+    """Drop a tenant's cached rollups so the next request (in any worker) reads fresh data"""
+    shared_cache.delete(CACHE_KEY.format(tenant_id=tenant_id))
+
+
+def _filter(rows: List[Dict], academic_year: Optional[str] = None, department: Optional[str] = None,
+            designation: Optional[str] = None) -> List[Dict]:
+    return [
+        row for row in rows
+        if (not academic_year or row["academic_year"] == academic_year)
+        and (not department or row["department"] == department)
+        and (not designation or row["designation"] == designation)
+    ]
+
+
+def summary(tenant_id: str, academic_year: Optional[str] = None, department: Optional[str] = None) -> Dict:
+    """
+    Totals per metric
+
+    Args:
+        tenant_id: Tenant whose rollups are summed
+        academic_year: Restrict to one academic year
+        department: Restrict to one department
+
+    Returns:
+        Academic years with data and {metric: {"label", "count", "amount"}}
+    """
+    rows = get_rollups(tenant_id)
+    totals = {metric: {"label": label, "count": 0, "amount": 0.0} for metric, label in METRICS.items()}
+    for row in _filter(rows, academic_year, department):
+        if row["metric"] in totals:
+            totals[row["metric"]]["count"] += int(row["row_count"])
+            totals[row["metric"]]["amount"] += float(row["amount_sum"] or 0)
+
+    return {
+        "academic_years": sorted({row["academic_year"] for row in rows}, reverse=True),
+        "totals": totals
+    }
+
+
+def metric_trend(tenant_id: str, metric: str, group_by: str = "department", value: str = "count",
+                 department: Optional[str] = None, designation: Optional[str] = None) -> Dict:
+    """
+    One metric per academic year, one series per department or designation
+
+    Args:
+        tenant_id: Tenant whose rollups are charted
+        metric: Key of METRICS
+        group_by: "department" or "designation"
+        value: "count" or "amount" (sum of research grant amounts)
+        department: Restrict to one department
+        designation: Restrict to one designation
+
+    Returns:
+        {"labels": [academic years], "series": [{"name", "data"}]}
+    """
+    field = VALUE_FIELDS[value]
+    rows = [row for row in _filter(get_rollups(tenant_id), department=department, designation=designation)
+            if row["metric"] == metric]
+    labels = sorted({row["academic_year"] for row in rows})
+    position = {year: i for i, year in enumerate(labels)}
+
+    series = defaultdict(lambda: [0] * len(labels))
+    for row in rows:
+        series[row[group_by] or UNASSIGNED][position[row["academic_year"]]] += row[field] or 0
+
+    return {
+        "metric": metric,
+        "label": METRICS[metric],
+        "value": value,
+        "group_by": group_by,
+        "labels": labels,
+        "series": [{"name": name, "data": data} for name, data in sorted(series.items())]
+    }
+
+
+def breakdown(tenant_id: str, academic_year: Optional[str] = None, group_by: str = "department") -> Dict:
+    """
+    Every metric's count per department or designation
+
+    Args:
+        tenant_id: Tenant whose rollups are charted
+        academic_year: Restrict to one academic year
+        group_by: "department" or "designation"
+
+    Returns:
+        {"labels": [groups], "series": [{"name": metric label, "data"}]}
+    """
+    rows = _filter(get_rollups(tenant_id), academic_year)
+    labels = sorted({row[group_by] or UNASSIGNED for row in rows})
+    position = {name: i for i, name in enumerate(labels)}
+
+    series = {metric: [0] * len(labels) for metric in METRICS}
+    for row in rows:
+        if row["metric"] in series:
+            series[row["metric"]][position[row[group_by] or UNASSIGNED]] += int(row["row_count"])
+
+    return {
+        "academic_year": academic_year,
+        "group_by": group_by,
+        "labels": labels,
+        "series": [{"name": METRICS[metric], "metric": metric, "data": data} for metric, data in series.items()]
+    }
@@ -0,0 +1,246 @@
+"""
+Archive Service - Parquet snapshots of closed academic years
+
+The activity tables are partitioned by academic_year (supabase_schema.sql).
+`python -m manage archive --year 2019-2020` copies a closed year of every
+tenant into ARCHIVE_DIR/<tenant>/<year>/<table>.parquet (zstd, typed from
+the schema like the bulk Parquet export), verifies the files, and then
+drops the year's partitions, so hot queries only touch current years.
+
+Reports (exports, batch reports, the admin faculty details, the
+publication de-duplication index) and the faculty dashboard read archived
+years from here. A row of an archived year always comes from its snapshot
+and never from the database, so a report reads the same rows before and
+after the drop. The dashboard marks archived rows read-only.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+from collections import Counter
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Set
+
+from config import ARCHIVE_DIR, BULK_EXPORT_BATCH_SIZE
+from services.local_backend import SCHEMA_PATH, parse_partitions
+
+MANIFEST_NAME = "manifest.json"
+
+# Tenant ids and academic years become folder names
+_NAME_PATTERN = re.compile(r"^[\w][\w.-]{0,63}$")
+
+
+@lru_cache(maxsize=1)
+def archive_tables() -> List[str]:
+    """The activity tables: partitioned by academic_year, so archived by year"""
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        return [table for table, column in parse_partitions(f.read()).items() if column == "academic_year"]
+
+
+def _folder(*names: str) -> str:
+    for name in names:
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid archive folder name: {name!r}")
+    return os.path.join(ARCHIVE_DIR, *names)
+
+
+def archived_years(tenant_id: str) -> List[str]:
+    """A tenant's archived academic years, newest first"""
+    try:
+        folder = _folder(tenant_id)
+        years = os.listdir(folder)
+    except (OSError, ValueError):
+        return []
+    return sorted((year for year in years if os.path.exists(os.path.join(folder, year, MANIFEST_NAME))),
+                  reverse=True)
+
+
+def archived_tenants() -> List[str]:
+    try:
+        return sorted(name for name in os.listdir(ARCHIVE_DIR) if _NAME_PATTERN.match(name))
+    except OSError:
+        return []
+
+
+class ReportScope:
+    """
+    Where a report reads one table's rows for an academic year (None: all years)
+
+    reads_database is False when the year is archived. hot() drops database
+    rows of archived years. archived_years lists the snapshots to read.
+    """
+
+    def __init__(self, tenant_id: str, table: str, academic_year: Optional[str] = None):
+        archived = set(archived_years(tenant_id)) if table in archive_tables() else set()
+        self.tenant_id = tenant_id
+        self.table = table
+        self.reads_database = not academic_year or academic_year not in archived
+        self.archived_years = sorted(archived & {academic_year} if academic_year else archived)
+        self._skip: Set[str] = set() if academic_year else archived
+
+    def hot(self, rows: List[Dict]) -> List[Dict]:
+        if not self._skip:
+            return rows
+        return [row for row in rows if row.get("academic_year") not in self._skip]
+
+    def archived_batches(self, user_ids: Optional[List[str]] = None, columns: Optional[List[str]] = None,
+                         batch_size: int = BULK_EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+        if not self.archived_years:
+            # Nothing archived: do not import pyarrow
+            return iter(())
+        return iter_archived(self.tenant_id, self.table, self.archived_years, user_ids, columns, batch_size)
+
+    def archived_rows(self, user_ids: Optional[List[str]] = None,
+                      columns: Optional[List[str]] = None) -> List[Dict]:
+        return [row for rows in self.archived_batches(user_ids, columns) for row in rows]
+
+
+def _json_value(value):
+    """Back to the JSON types the database clients return (ISO strings for dates)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_archived(tenant_id: str, table: str, years: List[str], user_ids: Optional[List[str]] = None,
+                  columns: Optional[List[str]] = None,
+                  batch_size: int = BULK_EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    Yield a tenant's archived rows of a table in batches
+
+    Args:
+        tenant_id: Tenant whose snapshots are read
+        table: One of archive_tables()
+        years: Archived academic years to read
+        user_ids: Restrict to these faculty members (None for everyone)
+        columns: Columns to read (None for all)
+        batch_size: Rows per Parquet batch
+    """
+    import pyarrow.parquet as pq
+
+    wanted = set(user_ids) if user_ids is not None else None
+    if wanted is not None and columns is not None and "user_id" not in columns:
+        columns = [*columns, "user_id"]
+    for year in years:
+        path = os.path.join(_folder(tenant_id, year), f"{table}.parquet")
+        if not os.path.exists(path):
+            continue
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=columns):
+            rows = [{key: _json_value(value) for key, value in row.items()} for row in batch.to_pylist()]
+            if wanted is not None:
+                rows = [row for row in rows if row.get("user_id") in wanted]
+            if rows:
+                yield rows
+
+
+def merge_archived(table: str, rows: List[Dict]) -> List[Dict]:
+    """
+    Every tenant's full set of a table's rows from its database rows plus the snapshots
+
+    For replicas that load a whole table at once (the work index): database
+    rows of a tenant's archived years are replaced by the archived rows.
+    """
+    if table not in archive_tables():
+        return rows
+    archived = {tenant_id: archived_years(tenant_id) for tenant_id in archived_tenants()}
+    merged = [row for row in rows if row.get("academic_year") not in archived.get(row.get("tenant_id"), ())]
+    for tenant_id, years in archived.items():
+        for batch in iter_archived(tenant_id, table, years):
+            merged.extend(batch)
+    return merged
+
+
+def count_by_user(scope: ReportScope) -> Counter:
+    """Archived rows of a report scope counted per faculty member"""
+    return Counter(row["user_id"] for rows in scope.archived_batches(columns=["user_id"]) for row in rows)
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_snapshot(tenant_id: str, academic_year: str) -> Dict[str, int]:
+    """
+    Write (or refresh) a tenant's snapshot of one academic year
+
+    The year's database rows are written together with rows already in an
+    earlier snapshot of the year (archiving again after new rows arrived).
+    The folder is written next to the old one and swapped in complete.
+
+    Returns:
+        Database rows written per table
+    """
+    import pyarrow.parquet as pq
+    from services.bulk_export import arrow_schema, arrow_table, iter_database_batches
+
+    folder = _folder(tenant_id, academic_year)
+    temp_folder = f"{folder}.tmp"
+    shutil.rmtree(temp_folder, ignore_errors=True)
+    os.makedirs(temp_folder)
+    previous = academic_year in archived_years(tenant_id)
+
+    manifest = {"tenant_id": tenant_id, "academic_year": academic_year,
+                "archived_at": datetime.now(timezone.utc).isoformat(), "tables": {}}
+    database_rows = {}
+    for table in archive_tables():
+        schema = arrow_schema(table)
+        path = os.path.join(temp_folder, f"{table}.parquet")
+        ids = set()
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            for rows in iter_database_batches(tenant_id, table, academic_year):
+                ids.update(row["id"] for row in rows)
+                writer.write_table(arrow_table(schema, rows))
+            database_rows[table] = len(ids)
+            written = len(ids)
+            if previous:
+                for rows in iter_archived(tenant_id, table, [academic_year]):
+                    rows = [row for row in rows if row["id"] not in ids]
+                    if rows:
+                        writer.write_table(arrow_table(schema, rows))
+                        written += len(rows)
+        stored = pq.ParquetFile(path).metadata.num_rows
+        if stored != written:
+            raise RuntimeError(f"{path} holds {stored} rows, expected {written}")
+        manifest["tables"][table] = {"rows": written, "bytes": os.path.getsize(path), "sha256": _sha256(path)}
+
+    with open(os.path.join(temp_folder, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    if os.path.exists(folder):
+        shutil.rmtree(folder)
+    os.replace(temp_folder, folder)
+    return database_rows
+
+
+def archive_year(academic_year: str, tenants: List[str]) -> Dict[str, Dict[str, int]]:
+    """
+    Snapshot a closed academic year for every tenant, then drop it from the database
+
+    The partitions hold every tenant's rows, so all tenants are archived
+    together. The drop checks that each partition still holds exactly the
+    rows written to the snapshots; if a row arrived in between, nothing is
+    dropped and archiving again picks it up.
+
+    Args:
+        academic_year: Closed academic year, e.g. "2019-2020"
+        tenants: Every tenant id
+
+    Returns:
+        Database rows archived per tenant and table
+    """
+    from database import supabase
+
+    _folder(academic_year)
+    archived = {tenant_id: write_snapshot(tenant_id, academic_year) for tenant_id in tenants}
+    expected = Counter()
+    for rows in archived.values():
+        expected.update(rows)
+    supabase.rpc("drop_academic_year_partitions",
+                 {"p_year": academic_year, "p_expected": {table: expected[table] for table in archive_tables()}}
+                 ).execute()
+    return archived
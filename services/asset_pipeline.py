@@ -0,0 +1,174 @@
+"""
+Asset pipeline - content-hashed, precompressed static assets
+Run: python -m services.asset_pipeline
+
+The build step copies every file under static/ to static/dist/ with a
+content hash in its name (css/admin.css -> css/admin.1a2b3c4d5e.css),
+writes .gz/.br siblings for text assets and records the mapping in
+static/dist/manifest.json. Templates link assets through asset_url(),
+and AssetStaticFiles serves the build output with far-future immutable
+caching, picking the precompressed variant from Accept-Encoding.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from typing import Dict, Optional
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+STATIC_DIR = "static"
+BUILD_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(BUILD_DIR, "manifest.json")
+STATIC_URL = "/static"
+
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".html", ".json", ".txt", ".map"}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+_manifest: Dict[str, str] = {}
+_manifest_mtime: Optional[float] = None
+
+
+def _hashed_name(relative_path: str, digest: str) -> str:
+    root, ext = os.path.splitext(relative_path)
+    return f"{root}.{digest[:10]}{ext}"
+
+
+def _compress(path: str):
+    """Write .gz (and .br when brotli is installed) next to a built asset"""
+    with open(path, "rb") as f:
+        content = f.read()
+
+    with gzip.open(f"{path}.gz", "wb", compresslevel=9) as f:
+        f.write(content)
+
+    try:
+        import brotli
+    except ImportError:
+        return
+    with open(f"{path}.br", "wb") as f:
+        f.write(brotli.compress(content, quality=11))
+
+
+def build_assets(static_dir: str = STATIC_DIR, build_dir: str = BUILD_DIR) -> Dict[str, str]:
+    """
+    Fingerprint and precompress every static asset
+
+    Args:
+        static_dir: Source directory of static assets
+        build_dir: Output directory (replaced on every build)
+
+    Returns:
+        Manifest mapping source paths to hashed paths, relative to build_dir
+    """
+    if os.path.isdir(build_dir):
+        shutil.rmtree(build_dir)
+    os.makedirs(build_dir)
+
+    manifest = {}
+    build_dir_abs = os.path.abspath(build_dir)
+    for root, dirs, files in os.walk(static_dir):
+        if os.path.abspath(root).startswith(build_dir_abs):
+            continue
+        for name in files:
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+
+            hashed = _hashed_name(relative, digest)
+            target = os.path.join(build_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                _compress(target)
+            manifest[relative] = hashed
+
+    with open(os.path.join(build_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def _load_manifest() -> Dict[str, str]:
+    """Load the build manifest, re-reading it when a new build replaces it"""
+    global _manifest, _manifest_mtime
+    try:
+        mtime = os.stat(MANIFEST_PATH).st_mtime
+    except FileNotFoundError:
+        _manifest, _manifest_mtime = {}, None
+        return _manifest
+
+    if mtime != _manifest_mtime:
+        with open(MANIFEST_PATH) as f:
+            _manifest = json.load(f)
+        _manifest_mtime = mtime
+    return _manifest
+
+
+def asset_url(path: str) -> str:
+    """
+    Jinja helper resolving a static asset to its fingerprinted URL
+
+    Falls back to the plain /static URL when assets have not been built.
+    """
+    hashed = _load_manifest().get(path)
+    if hashed:
+        return f"{STATIC_URL}/dist/{hashed}"
+    return f"{STATIC_URL}/{path}"
+
+
+def accepted_encodings(headers: Headers) -> set:
+    """Content codings the client accepts (ignoring those with q=0)"""
+    accepted = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        token, _, params = item.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(token.lower())
+    return accepted
+
+
+class AssetStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves build output immutably and precompressed.
+    Files outside static/dist keep the default revalidation behaviour.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        if not os.path.abspath(full_path).startswith(os.path.abspath(BUILD_DIR) + os.sep):
+            return super().file_response(full_path, stat_result, scope, status_code)
+
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers)
+        response = None
+        for encoding, suffix in ENCODINGS:
+            compressed = f"{full_path}{suffix}"
+            if encoding in accepted and os.path.isfile(compressed):
+                response = FileResponse(
+                    compressed,
+                    status_code=status_code,
+                    stat_result=os.stat(compressed),
+                    media_type=mimetypes.guess_type(str(full_path))[0],
+                    headers={"Content-Encoding": encoding}
+                )
+                break
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+if __name__ == "__main__":
+    built = build_assets()
+    print(f"Built {len(built)} assets into {BUILD_DIR}")
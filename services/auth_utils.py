@@ -3,14 +3,18 @@ Authentication utilities - password hashing, JWT tokens, password generation
 """
 import secrets
 import string
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
-from passlib.context import CryptContext
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRE_MINUTES
+from config import JWT_SECRET_KEY, JWT_ALGORITHM, JWT_EXPIRE_MINUTES, DEFAULT_TENANT
+from services import password_policy, shared_cache
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Access tokens revoked before they expire are kept in the shared cache
+# under "revoked:<jti>" until their exp, so every worker rejects them.
+# Checked on every authenticated request, so it never touches the database.
+REVOKED_PREFIX = "revoked:"
 
 
 def generate_password(length: int = 12) -> str:
@@ -29,13 +33,23 @@ def generate_password(length: int = 12) -> str:
 
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+    """Hash a password with the calibrated policy (services/password_policy.py)"""
+    return password_policy.hash_password(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_policy.verify_password(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if its hash predates the current policy
+    
+    Returns:
+        (valid, new_hash): store new_hash when it is not None
+    """
+    return password_policy.verify_and_update(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -56,7 +70,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=JWT_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
@@ -73,6 +87,57 @@ def decode_access_token(token: str) -> Optional[dict]:
     """
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+    if is_token_revoked(payload.get("jti")):
+        return None
+    # Tokens issued before multi-institution mode belong to the default tenant
+    payload.setdefault("tid", DEFAULT_TENANT)
+    return payload
+
+
+def token_tenant(authorization: Optional[str]) -> Optional[str]:
+    """
+    Tenant of a signed, unexpired bearer token (revocation is not checked)
+
+    Only for attributing a request (admission quotas, stored profiles)
+    before the endpoint authenticates it; None when there is no valid token.
+    """
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(authorization[7:].strip(), JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("tid", DEFAULT_TENANT)
+
+
+def session_info(payload: dict) -> dict:
+    """Public view of a decoded access token (the signed-in user)"""
+    return {
+        "user_id": payload.get("sub"),
+        "email": payload.get("email"),
+        "user_type": payload.get("user_type"),
+        "name": payload.get("name"),
+        "tenant_id": payload.get("tid")
+    }
+
+
+def revoke_access_token(payload: dict):
+    """
+    Revoke a decoded access token until it expires
+    
+    Args:
+        payload: Decoded token data (needs jti and exp)
+    """
+    jti = payload.get("jti")
+    if not jti:
+        return
+    ttl = float(payload.get("exp", 0)) - time.time()
+    if ttl > 0:
+        shared_cache.set(REVOKED_PREFIX + jti, True, ttl)
+
+
+def is_token_revoked(jti: Optional[str]) -> bool:
+    """Check the shared revocation cache for an access token id"""
+    return jti is not None and shared_cache.contains(REVOKED_PREFIX + jti)
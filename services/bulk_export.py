@@ -0,0 +1,249 @@
+"""
+Bulk Export Service - streaming CSV and Parquet dumps of the faculty tables
+
+Rows are read in keyset batches (ordered by id) and written out as each
+batch arrives, so memory stays flat and the client starts receiving
+data while later batches are still being fetched. Every export covers
+one tenant's rows. Column names and
+types come from supabase_schema.sql, so empty tables still produce a
+header and Parquet files get a typed schema. Academic years moved to the
+cold archive (services/archive_service.py) are read from their snapshots.
+"""
+import csv
+import io
+import zipfile
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config import BULK_EXPORT_BATCH_SIZE
+from database import for_tenant
+from services.faculty_directory import directory
+from services.local_backend import SCHEMA_PATH, parse_schema
+from services.sync_service import SYNC_TABLES
+
+# Same tables as the sync feed: faculty_users plus the 16 faculty data tables
+EXPORT_TABLES = list(SYNC_TABLES)
+EXCLUDED_COLUMNS = {"password_hash"}
+
+# user_id values per IN () filter, keeps PostgREST URLs short
+USER_ID_CHUNK = 100
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object collecting bytes until the generator drains them"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> Iterator[bytes]:
+        """Yield everything written since the last drain, if anything"""
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            yield data
+
+
+@lru_cache(maxsize=1)
+def table_columns() -> Dict[str, List[tuple]]:
+    """(column, postgres type) of every exported table, from the schema file"""
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        schema = parse_schema(f.read())
+    return {
+        table: [(column, pg_type.upper()) for column, pg_type, _ in schema[table] if column not in EXCLUDED_COLUMNS]
+        for table in EXPORT_TABLES
+    }
+
+
+def department_user_ids(tenant_id: str, department: str) -> List[str]:
+    """Faculty user ids of one tenant's department (from the in-memory directory)"""
+    return [record.id for record in directory.list(tenant_id, department=department)]
+
+
+def iter_batches(tenant_id: str, table: str, academic_year: Optional[str] = None,
+                 user_ids: Optional[List[str]] = None,
+                 batch_size: int = BULK_EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    Yield a tenant's rows of a table in batches, archived academic years included
+
+    Args:
+        tenant_id: Tenant whose rows are read
+        table: Table name from EXPORT_TABLES
+        academic_year: Filter tables that have an academic_year column
+        user_ids: Restrict to these faculty members (None for everyone)
+        batch_size: Rows per query
+    """
+    from services.archive_service import ReportScope
+
+    scope = ReportScope(tenant_id, table, academic_year)
+    if scope.reads_database:
+        for rows in iter_database_batches(tenant_id, table, academic_year, user_ids, batch_size):
+            rows = scope.hot(rows)
+            if rows:
+                yield rows
+    yield from scope.archived_batches(user_ids, batch_size=batch_size)
+
+
+def iter_database_batches(tenant_id: str, table: str, academic_year: Optional[str] = None,
+                          user_ids: Optional[List[str]] = None,
+                          batch_size: int = BULK_EXPORT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """
+    Yield a tenant's database rows of a table in batches using keyset pagination on id
+
+    Args:
+        tenant_id: Tenant whose rows are read
+        table: Table name from EXPORT_TABLES
+        academic_year: Filter tables that have an academic_year column
+        user_ids: Restrict to these faculty members (None for everyone)
+        batch_size: Rows per query
+    """
+    db = for_tenant(tenant_id)
+    columns = [column for column, _ in table_columns()[table]]
+    owner_column = "id" if table == "faculty_users" else "user_id"
+    chunks = [None] if user_ids is None else [
+        user_ids[i:i + USER_ID_CHUNK] for i in range(0, len(user_ids), USER_ID_CHUNK)
+    ]
+
+    for chunk in chunks:
+        last_id = None
+        while True:
+            query = db.table(table).select(", ".join(columns))
+            if chunk is not None:
+                query = query.in_(owner_column, chunk)
+            if academic_year and "academic_year" in columns:
+                query = query.eq("academic_year", academic_year)
+            if last_id:
+                query = query.gt("id", last_id)
+            rows = query.order("id").limit(batch_size).execute().data
+            if rows:
+                yield rows
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1]["id"]
+
+
+def _csv_chunks(table: str, batches: Iterator[List[Dict]]) -> Iterator[str]:
+    columns = [column for column, _ in table_columns()[table]]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_table_csv(tenant_id: str, table: str, academic_year: Optional[str] = None,
+                     department: Optional[str] = None) -> Iterator[bytes]:
+    """Stream one tenant's rows of a table as CSV, one chunk per database batch"""
+    user_ids = department_user_ids(tenant_id, department) if department else None
+    for text in _csv_chunks(table, iter_batches(tenant_id, table, academic_year, user_ids)):
+        yield text.encode("utf-8")
+
+
+def _arrow_type(pg_type: str):
+    if pg_type.startswith(("INT", "BIGINT", "SMALLINT")):
+        return pa.int64()
+    if pg_type.startswith(("DECIMAL", "NUMERIC", "REAL", "DOUBLE")):
+        return pa.float64()
+    if pg_type == "BOOLEAN":
+        return pa.bool_()
+    if pg_type == "DATE":
+        return pa.date32()
+    if pg_type.startswith("TIMESTAMP"):
+        return pa.timestamp("us", tz="UTC")
+    return pa.string()
+
+
+def _arrow_value(value, arrow_type):
+    """Convert JSON values (ISO strings for dates) to what pyarrow expects"""
+    if value is None or not isinstance(value, str):
+        return value
+    if arrow_type == pa.date32():
+        return date.fromisoformat(value[:10])
+    if pa.types.is_timestamp(arrow_type):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def arrow_schema(table: str):
+    return pa.schema([(column, _arrow_type(pg_type)) for column, pg_type in table_columns()[table]])
+
+
+def arrow_table(schema, rows: List[Dict]):
+    """One batch of JSON rows as a pyarrow table with the given schema"""
+    columns = {field.name: [_arrow_value(row.get(field.name), field.type) for row in rows] for field in schema}
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def stream_bundle(tenant_id: str, fmt: str = "csv", academic_year: Optional[str] = None,
+                  department: Optional[str] = None, progress: Optional[Callable] = None) -> Iterator[bytes]:
+    """
+    Stream a zip with one file per table
+
+    Args:
+        tenant_id: Tenant whose rows are exported
+        fmt: "csv" (deflated CSV files) or "parquet" (one row group per batch)
+        academic_year: Filter tables that have an academic_year column
+        department: Restrict to faculty of one department
+        progress: Called as progress("exporting", tables done, total tables, rows=..., table=...)
+            after each database batch
+
+    Yields:
+        Zip bytes as each database batch is written
+    """
+    if fmt == "parquet" and pq is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+
+    user_ids = department_user_ids(tenant_id, department) if department else None
+    exported_rows = 0
+
+    def tracked(tables_done: int, table: str) -> Iterator[List[Dict]]:
+        nonlocal exported_rows
+        for rows in iter_batches(tenant_id, table, academic_year, user_ids):
+            yield rows
+            exported_rows += len(rows)
+            if progress:
+                progress("exporting", tables_done, len(EXPORT_TABLES), rows=exported_rows, table=table)
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w") as bundle:
+        for tables_done, table in enumerate(EXPORT_TABLES):
+            batches = tracked(tables_done, table)
+            if fmt == "parquet":
+                # Parquet pages are already compressed
+                schema = arrow_schema(table)
+                with bundle.open(f"{table}.parquet", "w", force_zip64=True) as entry:
+                    writer = pq.ParquetWriter(entry, schema, compression="zstd")
+                    for rows in batches:
+                        writer.write_table(arrow_table(schema, rows))
+                        yield from sink.drain()
+                    writer.close()
+            else:
+                info = zipfile.ZipInfo(f"{table}.csv", date_time=datetime.now().timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                with bundle.open(info, "w", force_zip64=True) as entry:
+                    for text in _csv_chunks(table, batches):
+                        entry.write(text.encode("utf-8"))
+                        yield from sink.drain()
+            yield from sink.drain()
+            if progress:
+                progress("exporting", tables_done + 1, len(EXPORT_TABLES), rows=exported_rows, table=table)
+    yield from sink.drain()
@@ -0,0 +1,159 @@
+"""
+Compression middleware - gzip/brotli for dynamic responses above a size threshold
+"""
+import zlib
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.asset_pipeline import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "text/javascript",
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+# Compress bodies larger than this in a worker thread
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+# Strong ETags name one representation; encoded bodies get their own tag
+ETAG_SUFFIXES = {"gzip": "-gz", "br": "-br"}
+
+
+class _Compressor:
+    """Incremental gzip or brotli encoder for one response"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(body)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gz.compress(body)
+        return out + self._gz.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """
+    Compress text-like responses with brotli (preferred) or gzip.
+
+    Responses that are already encoded (precompressed static files and
+    page shells), small, binary (PDF, Excel, images) or event streams
+    pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accepted = accepted_encodings(Headers(scope=scope))
+        encoding = None
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSender(send, encoding, self))
+
+
+class _CompressingSender:
+    def __init__(self, send: Send, encoding: str, middleware: CompressionMiddleware):
+        self.send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _should_skip(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        return (
+            "content-encoding" in headers
+            or message["status"] in (204, 206, 304)
+            or media_type not in COMPRESSIBLE_TYPES
+        )
+
+    async def __call__(self, message: Message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.passthrough = self._should_skip(message)
+            if self.passthrough:
+                await self.send(message)
+                self.start_message = None
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            # e.g. pathsend: forward untouched if the body was not started yet
+            if self.start_message is not None and not self.passthrough:
+                await self.send(self.start_message)
+                self.passthrough = True
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(self.start_message)
+                self.start_message = None
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag and etag.endswith('"') and not etag.startswith("W/"):
+                headers["ETag"] = f'{etag[:-1]}{ETAG_SUFFIXES[self.encoding]}"'
+            if "content-length" in headers:
+                del headers["Content-Length"]
+
+            compressed = await self._compress(body, final=not more_body)
+            if not more_body:
+                headers["Content-Length"] = str(len(compressed))
+            await self.send(self.start_message)
+            self.start_message = None
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+
+        compressed = await self._compress(body, final=not more_body)
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    async def _compress(self, body: bytes, final: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await run_in_threadpool(self.compressor.compress, body, final)
+        return self.compressor.compress(body, final)
@@ -0,0 +1,90 @@
+"""
+ETag Service - conditional GETs for per-faculty data
+
+Every write to a faculty member's rows bumps their counter in
+data_versions (a database trigger, so writes from any endpoint, import
+or script count). A read endpoint looks the version up with one
+primary-key query, derives a strong ETag from it and the request, and
+answers If-None-Match with 304 Not Modified before running any of its
+table queries.
+
+The version is read before the data: a write landing in between makes
+the response newer than its ETag, which only costs the client one extra
+full response later, never a stale 304.
+"""
+import hashlib
+from typing import Any, Optional, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from database import supabase
+
+# Dashboards must revalidate, and per-user data never goes in shared caches
+DATA_CACHE_CONTROL = "private, no-cache"
+
+# Suffixes CompressionMiddleware adds to the ETag of an encoded response
+ENCODING_SUFFIXES = ('-gz"', '-br"')
+
+
+def current_version(tenant_id: str, user_id: str) -> int:
+    """Data version of a faculty member of a tenant; 0 until their first write (or in another tenant)"""
+    result = supabase.table("data_versions").select("version").eq("user_id", user_id).eq(
+        "tenant_id", tenant_id).execute()
+    return int(result.data[0]["version"]) if result.data else 0
+
+
+def make_etag(request: Request, user_id: str, version: int, *parts: Any) -> str:
+    """
+    Strong ETag for one representation of a faculty member's data
+
+    Args:
+        request: The GET request; path and query string select the representation
+        user_id: Faculty member whose data the response holds
+        version: Their current data version
+        parts: Anything else in the body that is not versioned (token claims, lookups)
+
+    Returns:
+        Quoted ETag, e.g. "12-3f5a..."
+    """
+    variant = orjson.dumps([request.url.path, request.url.query, user_id, parts], default=str)
+    return f'"{version}-{hashlib.sha256(variant).hexdigest()[:20]}"'
+
+
+def _base_tag(tag: str) -> str:
+    """ETag as sent by the endpoint, without the compression suffix"""
+    if tag.endswith(ENCODING_SUFFIXES):
+        return tag[:-4] + '"'
+    return tag
+
+
+def conditional_get(request: Request, tenant_id: str, user_id: str, *parts: Any) -> Tuple[str, Optional[Response]]:
+    """
+    Check If-None-Match against the faculty member's current data version
+
+    The version is looked up within the caller's tenant, so an ETag never
+    tells whether a faculty id exists in another tenant, or its version.
+
+    Returns:
+        (etag, response): response is a ready 304 when the client's copy is
+        current, otherwise None and the endpoint builds the body and tags it
+    """
+    etag = make_etag(request, user_id, current_version(tenant_id, user_id), tenant_id, *parts)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if _base_tag(tag) == etag:
+                return etag, Response(status_code=304, headers={
+                    "ETag": tag,
+                    "Cache-Control": DATA_CACHE_CONTROL
+                })
+    return etag, None
+
+
+def tag(response: Response, etag: str) -> Response:
+    """Attach the ETag and revalidation headers to a full response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = DATA_CACHE_CONTROL
+    return response
@@ -0,0 +1,244 @@
+"""
+Event Bus Service - pub/sub behind the Server-Sent Events stream
+
+Publishers (write endpoints, export progress in threadpool workers) call
+publish() from any thread. Subscribers are open SSE streams, each with a
+bounded asyncio queue on the event loop that serves it. Delivery inside
+a worker is immediate. Every event is also appended to the shared log in
+services/shared_cache.py, and a relay thread (running only while this
+worker has open streams) tails that log every EVENTS_RELAY_POLL_SECONDS
+for events other workers published. The log also lets a reconnecting
+stream resume after its Last-Event-ID.
+
+Topics:
+- user:<id>    one signed-in user (their own changes, their export progress)
+- tenant:<id>  a tenant's admins (changes made by any of its faculty)
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from config import EVENTS_QUEUE_SIZE, EVENTS_RELAY_POLL_SECONDS, EXPORT_PROGRESS_INTERVAL_SECONDS
+from services import shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+def user_topic(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def tenant_topic(tenant_id: str) -> str:
+    return f"tenant:{tenant_id}"
+
+
+class Subscription:
+    """One stream's topics and event queue (owned by one event loop)"""
+
+    def __init__(self, topics: List[str], loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.topics = frozenset(topics)
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        # Events up to this id were sent as the stream's backlog
+        self.backlog_id = 0
+        # Set when the client fell behind and events were dropped
+        self.overflowed = False
+
+    def _put(self, event: Dict):
+        if event["id"] <= self.backlog_id:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def deliver(self, event: Dict):
+        """Queue an event from any thread"""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    async def next(self, timeout: float) -> Optional[Dict]:
+        """The next event, None if none arrived within timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """Per-process topic registry plus the relay from the shared log"""
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE, relay_poll_seconds: float = EVENTS_RELAY_POLL_SECONDS):
+        self.queue_size = queue_size
+        self.relay_poll_seconds = relay_poll_seconds
+        self._reset()
+
+    def _reset(self):
+        """Drop every subscription; also run in forked children"""
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._relay: Optional[threading.Thread] = None
+        self._relayed_id = 0
+
+    @property
+    def stream_count(self) -> int:
+        with self._lock:
+            return len({subscription for subscribers in self._subscribers.values() for subscription in subscribers})
+
+    def subscribe(self, topics: List[str], last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Open a subscription (call from the event loop that will read it)
+
+        Args:
+            topics: Topics to receive
+            last_event_id: Resume after this event; logged events since then
+                are queued first
+
+        Returns:
+            The subscription; pass it to unsubscribe() when the stream ends
+        """
+        subscription = Subscription(topics, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscribers.setdefault(topic, set()).add(subscription)
+            if self._relay is None or not self._relay.is_alive():
+                self._relayed_id = shared_cache.last_event_id()
+                self._relay = threading.Thread(target=self._run_relay, name="EventBusRelay", daemon=True)
+                self._relay.start()
+        if last_event_id is not None:
+            # Live events from now on are queued too; the backlog covers everything before
+            backlog = [(event_id, topic, payload) for event_id, _, topic, payload
+                       in shared_cache.events_after(last_event_id) if topic in subscription.topics]
+            for event_id, topic, payload in backlog:
+                subscription._put({"id": event_id, "topic": topic, **payload})
+            subscription.backlog_id = backlog[-1][0] if backlog else 0
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def publish(self, topic: str, event: str, data: Dict[str, Any]):
+        """
+        Publish an event to a topic (from any thread)
+
+        Args:
+            topic: user_topic(...) or tenant_topic(...)
+            event: SSE event name, e.g. "data.changed"
+            data: JSON-serializable event data
+        """
+        payload = {"event": event, "data": data}
+        try:
+            event_id = shared_cache.append_event(os.getpid(), topic, payload)
+        except Exception:
+            # Live updates are best effort; never fail the write that published them
+            logger.exception("Failed to log %s event", event)
+            return
+        self._deliver(topic, {"id": event_id, "topic": topic, **payload})
+
+    def _deliver(self, topic: str, event: Dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:
+                # The subscription's loop has closed; its stream is gone
+                self.unsubscribe(subscription)
+
+    def _run_relay(self):
+        """Deliver other workers' events; stops once this worker has no streams"""
+        pid = os.getpid()
+        while True:
+            time.sleep(self.relay_poll_seconds)
+            with self._lock:
+                if not self._subscribers:
+                    self._relay = None
+                    return
+            try:
+                events = shared_cache.events_after(self._relayed_id)
+            except Exception:
+                logger.exception("Event relay poll failed")
+                continue
+            for event_id, origin, topic, payload in events:
+                self._relayed_id = event_id
+                if origin != pid:
+                    self._deliver(topic, {"id": event_id, "topic": topic, **payload})
+
+
+class ExportProgress:
+    """
+    Progress events of one export, throttled to one per EXPORT_PROGRESS_INTERVAL_SECONDS
+
+    The export code calls `progress(stage, done, total, **details)`; the
+    first event of a stage and its last (done == total) are always sent.
+    Used as a context manager, an export that raises reports export.failed.
+    Without an export id (the client is not following) every call is a no-op.
+    """
+
+    def __init__(self, bus: EventBus, user_id: str, export_id: Optional[str], kind: str,
+                 interval: float = EXPORT_PROGRESS_INTERVAL_SECONDS):
+        self.bus = bus
+        self.topic = user_topic(user_id)
+        self.export_id = export_id
+        self.kind = kind
+        self.interval = interval
+        self._stage = None
+        self._sent_at = 0.0
+
+    def __call__(self, stage: str, done: int, total: Optional[int] = None, **details):
+        now = time.monotonic()
+        if stage == self._stage and now - self._sent_at < self.interval and done != total:
+            return
+        self._stage = stage
+        self._sent_at = now
+        self._publish("export.progress", {"stage": stage, "done": done, "total": total, **details})
+
+    def finished(self, **details):
+        self._publish("export.done", details)
+
+    def __enter__(self) -> "ExportProgress":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc is not None:
+            detail = getattr(exc, "detail", None) or ("Export cancelled" if isinstance(exc, GeneratorExit)
+                                                      else "Export failed")
+            self._publish("export.failed", {"detail": detail})
+
+    def _publish(self, event: str, data: Dict):
+        if self.export_id:
+            self.bus.publish(self.topic, event, {"export_id": self.export_id, "kind": self.kind, **data})
+
+
+def export_progress(user_id: str, export_id: Optional[str], kind: str) -> ExportProgress:
+    """Progress reporter for an export; silent unless the client passed an export id"""
+    return ExportProgress(event_bus, user_id, export_id, kind)
+
+
+def notify_change(tenant_id: str, user_id: str, table: str, action: str, row_id: Optional[str] = None):
+    """
+    Tell the user's other sessions and their tenant's admins that data changed
+
+    Args:
+        tenant_id: Tenant of the changed rows
+        user_id: Faculty member whose data changed
+        table: Changed table
+        action: "insert", "update" or "delete"
+        row_id: Changed row, when known
+    """
+    data = {"user_id": user_id, "table": table, "action": action, "id": row_id}
+    event_bus.publish(user_topic(user_id), "data.changed", data)
+    event_bus.publish(tenant_topic(tenant_id), "data.changed", data)
+
+
+# Process-wide bus (streams and relay are per worker)
+event_bus = EventBus()
+os.register_at_fork(after_in_child=event_bus._reset)
@@ -4,25 +4,81 @@ Export Service - PDF and Excel generation
 from fpdf import FPDF
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import io
 
+from services.pdf_fonts import CORE_FAMILY, prepare_output, register_fonts, to_latin1
 
-class FacultyPDF(FPDF):
+
+# Sections of a faculty profile, in report order:
+# (data key, title, primary field, [(field, label), ...])
+PROFILE_SECTIONS = [
+    ("previous_work", "Previous Work Experience", "institution",
+     [("position_held", "Position"), ("from_year", "From"), ("to_year", "To")]),
+    ("courses_taught", "Courses Taught", "course_name", []),
+    ("publications", "Journal Publications", "title",
+     [("authors", "Authors"), ("journal_name", "Journal"), ("issn_isbn", "ISSN/ISBN"), ("url", "URL")]),
+    ("book_publications", "Books and Chapters", "chapter_book_name",
+     [("editor_author", "Editor/Author"), ("level", "Level"), ("issn_isbn", "ISSN/ISBN"), ("url", "URL")]),
+    ("awards", "Awards", "title",
+     [("awarding_agency", "Agency"), ("level", "Level"), ("award_date", "Date")]),
+    ("ict_creations", "ICT Creations", "title", [("content", "Content"), ("url", "URL")]),
+    ("research_guidance", "Research Guidance", None,
+     [("number_enrolled", "Enrolled"), ("thesis_submitted", "Thesis submitted"), ("degree_awarded", "Degree awarded")]),
+    ("pg_dissertations", "PG Dissertations Guided", "student_name", [("usn", "USN")]),
+    ("research_projects", "Research Projects", "title",
+     [("agency", "Agency"), ("period", "Period"), ("investigator_type", "Role"), ("grant_amount", "Grant")]),
+    ("patents", "Patents", "title", [("patent_number", "Patent No")]),
+    ("conferences", "Conference Papers", "paper_title",
+     [("conference_details", "Conference"), ("level", "Level"), ("issn_isbn", "ISSN/ISBN")]),
+    ("seminars", "Seminars and Workshops", "title", [("details", "Details"), ("degree_awarded", "Degree")]),
+    ("lectures", "Invited Lectures", "lecture_name", [("lecture_date", "Date"), ("location", "Location")]),
+    ("other_details", "Other Details", "details", [("detail_date", "Date"), ("location", "Location")]),
+    ("memberships", "Professional Memberships", "details",
+     [("institute", "Institute"), ("date_period", "Period"), ("location", "Location")]),
+]
+
+
+class UnicodePDF(FPDF):
+    """PDF with the shared Unicode body font (core Helvetica when none is configured)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.base_font = register_fonts(self)
+    
+    def set_font(self, family=None, style='', size=0):
+        # Styles the body font has no file for render in its regular face
+        if family == self.base_font != CORE_FAMILY and f'{family}{style}' not in self.fonts:
+            style = ''.join(s for s in style if f'{family}{s}' in self.fonts)
+        super().set_font(family, style, size)
+    
+    def normalize_text(self, text):
+        if self.base_font == CORE_FAMILY:
+            text = to_latin1(text)
+        return super().normalize_text(text)
+    
+    def output(self, *args, **kwargs):
+        prepare_output(self)
+        return super().output(*args, **kwargs)
+
+
+class FacultyPDF(UnicodePDF):
     """Custom PDF class for faculty reports"""
     
+    report_title = 'Faculty Profile Report'
+    
     def header(self):
-        self.set_font('Arial', 'B', 14)
-        self.cell(0, 10, 'Faculty Profile Report', 0, 1, 'C')
+        self.set_font(self.base_font, 'B', 14)
+        self.cell(0, 10, self.report_title, 0, 1, 'C')
         self.ln(5)
     
     def footer(self):
         self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
+        self.set_font(self.base_font, 'I', 8)
         self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
     
     def section_title(self, title):
-        self.set_font('Arial', 'B', 12)
+        self.set_font(self.base_font, 'B', 12)
         self.set_fill_color(66, 133, 244)
         self.set_text_color(255, 255, 255)
         self.cell(0, 8, title, 0, 1, 'L', True)
@@ -30,23 +86,46 @@ class FacultyPDF(FPDF):
         self.ln(2)
     
     def add_field(self, label, value):
-        self.set_font('Arial', 'B', 10)
+        self.set_font(self.base_font, 'B', 10)
         self.cell(50, 6, f'{label}:', 0, 0)
-        self.set_font('Arial', '', 10)
+        self.set_font(self.base_font, '', 10)
         self.cell(0, 6, str(value) if value else 'N/A', 0, 1)
 
 
-def generate_faculty_pdf(data: Dict, academic_year: Optional[str] = None) -> bytes:
-    """Generate PDF for a single faculty member"""
-    pdf = FacultyPDF()
-    pdf.add_page()
+def _record_text(index: int, row: Dict, primary: Optional[str], fields: List[tuple]) -> str:
+    """One numbered line per record: primary value, then labelled details"""
+    parts = [f"{label}: {row[field]}" for field, label in fields if row.get(field) not in (None, "")]
+    if row.get('academic_year'):
+        parts.append(row['academic_year'])
+    head = str(row.get(primary) or 'N/A') if primary else ''
+    detail = '; '.join(parts)
+    return f"{index}. {head}{' - ' if head and detail else ''}{detail}"
+
+
+def _sort_key(row: Dict):
+    return (row.get('academic_year') or '', row.get('si_no') or 0, row.get('created_at') or '')
+
+
+def render_faculty_profile(pdf: FacultyPDF, data: Dict, academic_year: Optional[str] = None,
+                           bookmark_level: Optional[int] = None):
+    """
+    Render one faculty member's basic information and all profile sections
     
-    # Basic Info
+    Args:
+        pdf: Document to render into (fonts and styles carry over between profiles)
+        data: User record, profile and section rows as returned by load_faculty_details
+        academic_year: Academic year the data was filtered by, shown in the header
+        bookmark_level: Add outline bookmarks at this level (None for no outline)
+    """
     user = data.get('user', {})
     profile = data.get('profile', [{}])[0] if data.get('profile') else {}
+    name = f"{profile.get('name_prefix') or ''} {user.get('name', '')}".strip()
+    
+    if bookmark_level is not None:
+        pdf.start_section(name or user.get('employee_id', 'Faculty'), level=bookmark_level)
     
     pdf.section_title('Basic Information')
-    pdf.add_field('Name', f"{profile.get('name_prefix', '')} {user.get('name', '')}")
+    pdf.add_field('Name', name)
     pdf.add_field('Employee ID', user.get('employee_id'))
     pdf.add_field('Email', user.get('email'))
     pdf.add_field('Phone', user.get('phone'))
@@ -58,55 +137,97 @@ def generate_faculty_pdf(data: Dict, academic_year: Optional[str] = None) -> byt
     
     pdf.ln(5)
     
-    # Publications
-    publications = data.get('publications', [])
-    if publications:
-        pdf.section_title(f'Publications ({len(publications)})')
-        for i, pub in enumerate(publications, 1):
-            pdf.set_font('Arial', '', 9)
-            pdf.multi_cell(0, 5, f"{i}. {pub.get('title', 'N/A')} - {pub.get('journal_name', '')} ({pub.get('academic_year', '')})")
+    for key, title, primary, fields in PROFILE_SECTIONS:
+        rows = data.get(key) or []
+        if not rows:
+            continue
+        if bookmark_level is not None:
+            pdf.start_section(title, level=bookmark_level + 1)
+        pdf.section_title(f'{title} ({len(rows)})')
+        # One font change per section, not per line
+        pdf.set_font(pdf.base_font, '', 9)
+        for i, row in enumerate(sorted(rows, key=_sort_key), 1):
+            pdf.multi_cell(0, 5, _record_text(i, row, primary, fields), new_x='LMARGIN', new_y='NEXT')
         pdf.ln(3)
+
+
+def generate_faculty_pdf(data: Dict, academic_year: Optional[str] = None) -> bytes:
+    """Generate PDF for a single faculty member"""
+    pdf = FacultyPDF()
+    pdf.add_page()
+    render_faculty_profile(pdf, data, academic_year)
+    return bytes(pdf.output())
+
+
+def _render_toc(pdf: FacultyPDF, outline: list):
+    """Table of contents listing each faculty member (level 0 outline entries)"""
+    pdf.section_title('Contents')
+    pdf.set_font(pdf.base_font, '', 10)
+    for entry in outline:
+        if entry.level != 0:
+            continue
+        link = pdf.add_link(page=entry.page_number)
+        pdf.cell(pdf.epw - 20, 6, entry.name, link=link)
+        pdf.cell(20, 6, str(entry.page_number), align='R', link=link, new_x='LMARGIN', new_y='NEXT')
+
+
+def generate_department_book_pdf(
+    faculty: List[Dict],
+    department: str,
+    academic_year: Optional[str] = None,
+    progress: Optional[Callable] = None
+) -> bytes:
+    """
+    Generate one PDF with every faculty profile of a department
     
-    # Awards
-    awards = data.get('awards', [])
-    if awards:
-        pdf.section_title(f'Awards ({len(awards)})')
-        for i, award in enumerate(awards, 1):
-            pdf.set_font('Arial', '', 9)
-            pdf.multi_cell(0, 5, f"{i}. {award.get('title', 'N/A')} - {award.get('awarding_agency', '')} ({award.get('academic_year', '')})")
-        pdf.ln(3)
+    Args:
+        faculty: Faculty data dicts (same shape as load_faculty_details), in report order
+        department: Department name for the cover and page headers
+        academic_year: Academic year the data was filtered by
+        progress: Called as progress("rendering", done, total, pages=...) after each profile
     
-    # Patents
-    patents = data.get('patents', [])
-    if patents:
-        pdf.section_title(f'Patents ({len(patents)})')
-        for i, patent in enumerate(patents, 1):
-            pdf.set_font('Arial', '', 9)
-            pdf.multi_cell(0, 5, f"{i}. {patent.get('title', 'N/A')} - Patent No: {patent.get('patent_number', '')} ({patent.get('academic_year', '')})")
-        pdf.ln(3)
+    Returns:
+        PDF bytes with a table of contents and outline bookmarks per faculty and section
+    """
+    pdf = FacultyPDF()
+    pdf.report_title = f'{department} - Faculty Book'
+    pdf.set_auto_page_break(True, margin=15)
     
-    # Research Projects
-    projects = data.get('research_projects', [])
-    if projects:
-        pdf.section_title(f'Research Projects ({len(projects)})')
-        for i, proj in enumerate(projects, 1):
-            pdf.set_font('Arial', '', 9)
-            pdf.multi_cell(0, 5, f"{i}. {proj.get('title', 'N/A')} - {proj.get('agency', '')} ({proj.get('academic_year', '')})")
-        pdf.ln(3)
+    pdf.add_page()
+    pdf.set_font(pdf.base_font, 'B', 20)
+    pdf.ln(40)
+    pdf.cell(0, 12, department, 0, 1, 'C')
+    pdf.set_font(pdf.base_font, '', 14)
+    pdf.cell(0, 10, 'Faculty Book', 0, 1, 'C')
+    pdf.cell(0, 10, f'Academic Year: {academic_year or "All Years"}', 0, 1, 'C')
+    pdf.cell(0, 10, f'Faculty Members: {len(faculty)}', 0, 1, 'C')
+    
+    pdf.add_page()
+    pdf.insert_toc_placeholder(_render_toc, allow_extra_pages=True)
     
-    # Conferences
-    conferences = data.get('conferences', [])
-    if conferences:
-        pdf.section_title(f'Conferences ({len(conferences)})')
-        for i, conf in enumerate(conferences, 1):
-            pdf.set_font('Arial', '', 9)
-            pdf.multi_cell(0, 5, f"{i}. {conf.get('paper_title', 'N/A')} ({conf.get('academic_year', '')})")
+    for i, data in enumerate(faculty, 1):
+        pdf.add_page()
+        render_faculty_profile(pdf, data, academic_year, bookmark_level=0)
+        if progress:
+            progress("rendering", i, len(faculty), pages=pdf.page)
     
-    return pdf.output(dest='S').encode('latin-1')
+    return bytes(pdf.output())
 
 
-def generate_all_faculty_excel(data: List[Dict], academic_year: Optional[str] = None) -> bytes:
-    """Generate Excel file with all faculty summary"""
+def generate_all_faculty_excel(
+    data: List[Dict],
+    academic_year: Optional[str] = None,
+    unique_counts: Optional[Dict[str, Dict[str, int]]] = None
+) -> bytes:
+    """
+    Generate Excel file with all faculty summary
+    
+    Args:
+        data: One row per faculty member, keyed by column header
+        academic_year: Academic year the counts are for
+        unique_counts: work_index.unique_counts() for the same filters; adds
+            a totals row and the distinct-work counts below the table
+    """
     wb = Workbook()
     ws = wb.active
     ws.title = "Faculty Summary"
@@ -142,6 +263,22 @@ def generate_all_faculty_excel(data: List[Dict], academic_year: Optional[str] =
             cell = ws.cell(row=row_num, column=col, value=faculty.get(key, ""))
             cell.border = thin_border
     
+    if unique_counts is not None:
+        total_row = len(data) + 4
+        ws.cell(row=total_row, column=1, value="Total entries").font = Font(bold=True)
+        for col, key in enumerate(headers[5:], 6):
+            cell = ws.cell(row=total_row, column=col, value=sum(faculty.get(key) or 0 for faculty in data))
+            cell.font = Font(bold=True)
+            cell.border = thin_border
+        
+        # Co-authors each enter a shared work, so entries overstate distinct works
+        ws.cell(row=total_row + 2, column=1, value="Distinct works (co-authored entries counted once)").font = Font(bold=True)
+        for offset, (table, label) in enumerate((("publications", "Publications"), ("conferences", "Conference papers"),
+                                                  ("book_publications", "Books / chapters")), 3):
+            counts = unique_counts.get(table, {})
+            ws.cell(row=total_row + offset, column=1, value=label)
+            ws.cell(row=total_row + offset, column=2, value=f"{counts.get('unique_works', 0)} of {counts.get('entries', 0)} entries")
+    
     # Adjust column widths
     column_widths = [25, 30, 15, 20, 25, 12, 10, 10]
     for i, width in enumerate(column_widths, 1):
@@ -160,14 +297,14 @@ def generate_all_faculty_summary_pdf(
     department: Optional[str] = None
 ) -> bytes:
     """Generate PDF summary of all faculty"""
-    pdf = FPDF()
+    pdf = UnicodePDF()
     pdf.add_page()
     
     # Title
-    pdf.set_font('Arial', 'B', 16)
+    pdf.set_font(pdf.base_font, 'B', 16)
     pdf.cell(0, 10, 'Faculty Directory Summary', 0, 1, 'C')
     
-    pdf.set_font('Arial', '', 10)
+    pdf.set_font(pdf.base_font, '', 10)
     if academic_year:
         pdf.cell(0, 6, f'Academic Year: {academic_year}', 0, 1, 'C')
     if department:
@@ -176,7 +313,7 @@ def generate_all_faculty_summary_pdf(
     pdf.ln(10)
     
     # Table header
-    pdf.set_font('Arial', 'B', 10)
+    pdf.set_font(pdf.base_font, 'B', 10)
     pdf.set_fill_color(66, 133, 244)
     pdf.set_text_color(255, 255, 255)
     pdf.cell(10, 8, '#', 1, 0, 'C', True)
@@ -186,7 +323,7 @@ def generate_all_faculty_summary_pdf(
     pdf.cell(40, 8, 'Department', 1, 1, 'C', True)
     
     pdf.set_text_color(0, 0, 0)
-    pdf.set_font('Arial', '', 9)
+    pdf.set_font(pdf.base_font, '', 9)
     
     for i, faculty in enumerate(data, 1):
         pdf.cell(10, 7, str(i), 1, 0, 'C')
@@ -196,7 +333,7 @@ def generate_all_faculty_summary_pdf(
         pdf.cell(40, 7, (faculty.get('department', '') or '')[:20], 1, 1, 'L')
     
     pdf.ln(10)
-    pdf.set_font('Arial', 'I', 10)
+    pdf.set_font(pdf.base_font, 'I', 10)
     pdf.cell(0, 10, f'Total Faculty: {len(data)}', 0, 1, 'R')
     
-    return pdf.output(dest='S').encode('latin-1')
+    return bytes(pdf.output())
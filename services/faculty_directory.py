@@ -0,0 +1,218 @@
+"""
+Faculty Directory Service - in-memory replica of faculty users and profiles
+
+The admin list, its search and filters, the department/designation
+vocabularies and the summary exports all read the same small join of
+faculty_users and faculty_profiles. Each worker keeps that join in
+memory as __slots__ records with secondary indexes on tenant, department,
+designation, email and employee_id, and answers those reads without a
+database round trip. One replica holds every tenant; each read names the
+tenant it is for, and the per-value indexes are keyed by (tenant, value). Freshness (incremental updated_at polling and the
+DIRECTORY_MAX_STALENESS_SECONDS bound) comes from services/replica.py.
+"""
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import DIRECTORY_POLL_SECONDS, DIRECTORY_MAX_STALENESS_SECONDS
+from services.replica import PolledReplica
+
+# Record fields returned by the admin faculty list, in response order
+LIST_FIELDS = ("id", "name", "email", "employee_id", "phone", "is_active", "created_at",
+               "designation", "department")
+
+
+class FacultyRecord:
+    """One faculty user joined with their profile's department and designation"""
+
+    __slots__ = ("id", "tenant_id", "name", "email", "employee_id", "phone", "is_active", "created_at",
+                 "profile_id", "designation", "department", "haystack")
+
+    def __init__(self, user: Dict):
+        self.profile_id = None
+        self.designation = None
+        self.department = None
+        self.update_user(user)
+
+    def update_user(self, user: Dict):
+        self.id = user["id"]
+        self.tenant_id = user["tenant_id"]
+        self.name = user["name"]
+        self.email = user["email"]
+        self.employee_id = user["employee_id"]
+        self.phone = user.get("phone")
+        self.is_active = user.get("is_active")
+        self.created_at = user.get("created_at")
+        # Lowercased text matched by search (name, email, employee ID)
+        self.haystack = "\n".join(str(value or "") for value in (self.name, self.email, self.employee_id)).lower()
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in LIST_FIELDS}
+
+
+class FacultyDirectory(PolledReplica):
+    """Per-process replica of the faculty list with secondary indexes"""
+
+    # Users first, so a new user's profile finds its record in the same poll
+    TABLES = {
+        "faculty_users": "id, tenant_id, name, email, employee_id, phone, is_active, created_at, updated_at",
+        "faculty_profiles": "id, user_id, designation, department, updated_at",
+    }
+
+    def __init__(self, poll_seconds: float = DIRECTORY_POLL_SECONDS,
+                 max_staleness: float = DIRECTORY_MAX_STALENESS_SECONDS):
+        super().__init__(poll_seconds, max_staleness)
+
+    def _clear(self):
+        self._records: Dict[str, FacultyRecord] = {}
+        self._by_tenant: Dict[str, Set[str]] = defaultdict(set)
+        self._by_department: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._by_designation: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._by_email: Dict[str, str] = {}
+        self._by_employee_id: Dict[Tuple[str, str], str] = {}
+        # ids in list order (newest first), rebuilt after inserts and deletes
+        self._order: Optional[List[str]] = None
+        self._rank: Dict[str, int] = {}
+
+    def _apply(self, table: str, rows: List[Dict]):
+        apply_row = self._apply_user if table == "faculty_users" else self._apply_profile
+        for row in rows:
+            apply_row(row)
+
+    def _apply_user(self, user: Dict):
+        record = self._records.get(user["id"])
+        if record is None:
+            record = self._records[user["id"]] = FacultyRecord(user)
+            self._order = None
+        else:
+            self._unindex_user(record)
+            if record.created_at != user.get("created_at"):
+                self._order = None
+            record.update_user(user)
+        self._by_tenant[record.tenant_id].add(record.id)
+        if record.email:
+            self._by_email[record.email.lower()] = record.id
+        if record.employee_id:
+            self._by_employee_id[(record.tenant_id, record.employee_id)] = record.id
+
+    def _apply_profile(self, profile: Dict):
+        record = self._records.get(profile["user_id"])
+        if record is None:
+            # The user was deleted; its tombstone is applied in the same poll
+            return
+        self._unindex_profile(record)
+        record.profile_id = profile["id"]
+        record.designation = profile.get("designation")
+        record.department = profile.get("department")
+        self._index_profile(record)
+
+    def _apply_tombstone(self, tombstone: Dict):
+        if tombstone["table_name"] == "faculty_users":
+            record = self._records.pop(tombstone["row_id"], None)
+            if record is not None:
+                self._unindex_user(record)
+                self._unindex_profile(record)
+                self._order = None
+            return
+        record = self._records.get(tombstone["user_id"])
+        # A newer profile of the same user keeps its fields
+        if record is not None and record.profile_id == tombstone["row_id"]:
+            self._unindex_profile(record)
+            record.profile_id = record.designation = record.department = None
+
+    def _unindex_user(self, record: FacultyRecord):
+        members = self._by_tenant.get(record.tenant_id)
+        if members is not None:
+            members.discard(record.id)
+            if not members:
+                del self._by_tenant[record.tenant_id]
+        if record.email and self._by_email.get(record.email.lower()) == record.id:
+            del self._by_email[record.email.lower()]
+        employee_key = (record.tenant_id, record.employee_id)
+        if record.employee_id and self._by_employee_id.get(employee_key) == record.id:
+            del self._by_employee_id[employee_key]
+
+    def _index_profile(self, record: FacultyRecord):
+        if record.department:
+            self._by_department[(record.tenant_id, record.department)].add(record.id)
+        if record.designation:
+            self._by_designation[(record.tenant_id, record.designation)].add(record.id)
+
+    def _unindex_profile(self, record: FacultyRecord):
+        for index, value in ((self._by_department, record.department),
+                             (self._by_designation, record.designation)):
+            key = (record.tenant_id, value)
+            if value and key in index:
+                index[key].discard(record.id)
+                if not index[key]:
+                    del index[key]
+
+    def _ordered_ids(self) -> List[str]:
+        """ids by created_at descending, then id (the database list order)"""
+        if self._order is None:
+            order = sorted(self._records)
+            order.sort(key=lambda faculty_id: self._records[faculty_id].created_at or "", reverse=True)
+            self._order = order
+            self._rank = {faculty_id: i for i, faculty_id in enumerate(order)}
+        return self._order
+
+    # ---- reads ----
+
+    def list(self, tenant_id: str, search: Optional[str] = None, department: Optional[str] = None,
+             designation: Optional[str] = None) -> List[FacultyRecord]:
+        """
+        Faculty of one tenant matching the filters, newest first
+
+        Args:
+            tenant_id: Tenant whose faculty are listed
+            search: Case-insensitive substring of name, email or employee ID
+            department: Exact department
+            designation: Exact designation
+
+        Returns:
+            Matching records (shared; do not modify)
+        """
+        self._ensure_fresh()
+        with self._lock:
+            self._ordered_ids()
+            candidates = self._by_tenant.get(tenant_id, set())
+            for index, value in ((self._by_department, department), (self._by_designation, designation)):
+                if value:
+                    candidates = candidates & index.get((tenant_id, value), set())
+            ids = sorted(candidates, key=self._rank.__getitem__)
+            records = [self._records[faculty_id] for faculty_id in ids]
+        if search:
+            needle = search.lower()
+            records = [record for record in records if needle in record.haystack]
+        return records
+
+    def get(self, tenant_id: str, faculty_id: str) -> Optional[FacultyRecord]:
+        self._ensure_fresh()
+        record = self._records.get(faculty_id)
+        return record if record is not None and record.tenant_id == tenant_id else None
+
+    def find_by_email(self, email: str) -> Optional[FacultyRecord]:
+        self._ensure_fresh()
+        faculty_id = self._by_email.get(email.lower())
+        return self._records.get(faculty_id) if faculty_id else None
+
+    def find_by_employee_id(self, tenant_id: str, employee_id: str) -> Optional[FacultyRecord]:
+        self._ensure_fresh()
+        faculty_id = self._by_employee_id.get((tenant_id, employee_id))
+        return self._records.get(faculty_id) if faculty_id else None
+
+    def departments(self, tenant_id: str) -> List[str]:
+        self._ensure_fresh()
+        with self._lock:
+            return sorted(value for tenant, value in self._by_department if tenant == tenant_id)
+
+    def designations(self, tenant_id: str) -> List[str]:
+        self._ensure_fresh()
+        with self._lock:
+            return sorted(value for tenant, value in self._by_designation if tenant == tenant_id)
+
+
+# Global replica (one per worker process)
+directory = FacultyDirectory()
+# A forked worker starts empty with its own lock and poller
+os.register_at_fork(after_in_child=directory._reset)
@@ -0,0 +1,144 @@
+"""
+Idempotency Service - collapse retried writes that carry an Idempotency-Key
+
+A client that times out on a flaky network cannot tell whether its POST
+reached the server, so it retries, and every retry used to add another
+copy of the publication or award. A write request may now carry an
+Idempotency-Key header (the dashboard sends one per submitted form). The
+first request with a key claims it in the shared cache, runs, and stores
+its response; a retry with the same key gets that stored response back
+(marked Idempotent-Replayed) instead of running the write again.
+
+Keys are scoped to the authenticated user, method and path. Reusing a
+key for a different body is rejected with 422, and a retry that arrives
+while the original is still running gets 409. Server errors (5xx) are
+not stored, so they can be retried.
+"""
+import base64
+import hashlib
+import re
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_LOCK_SECONDS
+from services import shared_cache
+from services.auth_utils import decode_access_token
+
+HEADER = b"idempotency-key"
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Printable ASCII, e.g. a UUID generated by the client
+_KEY_PATTERN = re.compile(r"^[\x21-\x7e]{1,255}$")
+
+
+def _caller(scope: Scope) -> Optional[str]:
+    """Subject of the request's bearer token, None if unauthenticated"""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer":
+                payload = decode_access_token(token.strip())
+                return payload.get("sub") if payload else None
+    return None
+
+
+def _cache_key(caller: str, scope: Scope, key: str) -> str:
+    scoped = "\n".join((caller, scope["method"], scope["path"], key))
+    return "idempotency:" + hashlib.sha256(scoped.encode()).hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response of a write whose Idempotency-Key was already used"""
+
+    def __init__(self, app: ASGIApp, ttl: float = IDEMPOTENCY_TTL_SECONDS,
+                 lock_seconds: float = IDEMPOTENCY_LOCK_SECONDS):
+        self.app = app
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        key = next((value.decode("latin-1") for name, value in scope["headers"] if name == HEADER), None)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not _KEY_PATTERN.match(key):
+            await JSONResponse({"detail": "Invalid Idempotency-Key"}, status_code=400)(scope, receive, send)
+            return
+        caller = _caller(scope)
+        if caller is None:
+            # The endpoint rejects it (401) or it is a public route; nothing to scope the key to
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            body.extend(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        fingerprint = hashlib.sha256(body).hexdigest()
+        cache_key = _cache_key(caller, scope, key)
+
+        while not shared_cache.add(cache_key, {"fingerprint": fingerprint}, self.lock_seconds):
+            entry = shared_cache.get(cache_key)
+            # None: the other claim expired between the two calls, so claim again
+            if entry is not None:
+                await self._answer_retry(entry, fingerprint, scope, receive, send)
+                return
+
+        replayed = False
+
+        async def replay_body() -> Message:
+            nonlocal replayed
+            if replayed:
+                return await receive()
+            replayed = True
+            return {"type": "http.request", "body": bytes(body), "more_body": False}
+
+        response = {"status": 500, "headers": [], "body": bytearray()}
+
+        async def capture(message: Message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"].extend(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            shared_cache.delete(cache_key)
+            raise
+        if response["status"] >= 500:
+            shared_cache.delete(cache_key)
+            return
+        shared_cache.set(cache_key, {
+            "fingerprint": fingerprint,
+            "status": response["status"],
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response["headers"]],
+            "body": base64.b64encode(response["body"]).decode()
+        }, self.ttl)
+
+    async def _answer_retry(self, entry: dict, fingerprint: str, scope: Scope, receive: Receive, send: Send):
+        if entry["fingerprint"] != fingerprint:
+            response = JSONResponse({"detail": "Idempotency-Key was already used for a different request"},
+                                    status_code=422)
+        elif "status" not in entry:
+            response = JSONResponse({"detail": "A request with this Idempotency-Key is still in progress"},
+                                    status_code=409, headers={"Retry-After": "1"})
+        else:
+            await send({
+                "type": "http.response.start",
+                "status": entry["status"],
+                "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in entry["headers"]]
+                + [(b"idempotent-replayed", b"true")]
+            })
+            await send({"type": "http.response.body", "body": base64.b64decode(entry["body"])})
+            return
+        await response(scope, receive, send)
@@ -0,0 +1,225 @@
+"""
+Lifecycle Service - per-worker warm-up and the health probes
+
+Importing the app only defines routes: data clients are created on first
+use (database.py) and heavy libraries are imported where they are used.
+When a worker starts, the lifespan hook runs warm_up() in the background.
+It creates this process's data client (and with it the Postgres pool),
+loads the in-memory replicas and each tenant's lookup lists, renders the
+static pages, parses the PDF fonts and loads (or on a new host,
+calibrates) the password hashing policy. The server accepts connections
+meanwhile: /api/health/live answers at once, and /api/health/ready
+returns 503 until warm-up has finished and the READINESS_REQUIRED_CHECKS
+pass.
+
+Readiness measures its dependencies rather than assuming them: a one-row
+database query, the profile photo bucket and an SMTP handshake, each
+with HEALTH_CHECK_TIMEOUT_SECONDS. A worker reuses its results for
+HEALTH_CHECK_CACHE_SECONDS so frequent probes stay cheap.
+"""
+import asyncio
+import logging
+import os
+import smtplib
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from config import (
+    HEALTH_CHECK_CACHE_SECONDS,
+    HEALTH_CHECK_TIMEOUT_SECONDS,
+    READINESS_REQUIRED_CHECKS,
+    SMTP_EMAIL,
+    SMTP_PASSWORD,
+    SMTP_PORT,
+    SMTP_SERVER
+)
+from database import supabase, fetch_all
+from services import password_policy
+from services.faculty_directory import directory
+from services.work_index import work_index
+
+logger = logging.getLogger(__name__)
+
+PHOTO_BUCKET = "profile-pictures"
+
+
+# ---- warm-up steps ----
+
+def _warm_data_client():
+    # Creates the client (Postgres opens its pool's min_size connections here)
+    # and makes the first round trip
+    supabase.table("tenants").select("id").limit(1).execute()
+
+
+def _warm_lookups():
+    from services import lookup_service
+
+    tenants = fetch_all(lambda: supabase.table("tenants").select("id").order("id"))
+    for tenant in tenants:
+        lookup_service.academic_years(tenant["id"])
+
+
+def _warm_exports():
+    # openpyxl, fpdf2 and fontTools, plus the once-per-process font parse
+    from fpdf import FPDF
+    from services import export_service  # noqa: F401
+    from services.pdf_fonts import register_fonts
+
+    register_fonts(FPDF())
+
+
+def _preload_steps(page_cache) -> List[Tuple[str, Callable]]:
+    """Steps that open no connections or threads, so they may run before a fork"""
+    return [("templates", page_cache.warm), ("exports", _warm_exports), ("password_policy", password_policy.warm_up)]
+
+
+def _worker_steps(page_cache) -> List[Tuple[str, Callable]]:
+    return [
+        ("data_client", _warm_data_client),
+        ("faculty_directory", directory.start),
+        ("work_index", work_index.start),
+        ("lookups", _warm_lookups),
+        *_preload_steps(page_cache),
+    ]
+
+
+# ---- readiness checks (return a detail string when the check does not apply) ----
+
+def _check_database() -> Optional[str]:
+    supabase.table("tenants").select("id").limit(1).execute()
+    return None
+
+
+def _check_storage() -> Optional[str]:
+    storage = supabase.storage
+    if storage is None:
+        return "not configured"
+    storage.get_bucket(PHOTO_BUCKET)
+    return None
+
+
+def _check_smtp() -> Optional[str]:
+    if not SMTP_EMAIL or not SMTP_PASSWORD:
+        return "not configured"
+    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=HEALTH_CHECK_TIMEOUT_SECONDS) as server:
+        server.noop()
+    return None
+
+
+CHECKS: Dict[str, Callable[[], Optional[str]]] = {
+    "database": _check_database,
+    "storage": _check_storage,
+    "smtp": _check_smtp,
+}
+
+
+class Lifecycle:
+    """Warm-up progress and cached readiness results of one worker"""
+
+    def __init__(self, checks: Dict[str, Callable] = CHECKS, required: List[str] = READINESS_REQUIRED_CHECKS,
+                 check_timeout: float = HEALTH_CHECK_TIMEOUT_SECONDS,
+                 check_cache_seconds: float = HEALTH_CHECK_CACHE_SECONDS):
+        self.checks = checks
+        self.required = required
+        self.check_timeout = check_timeout
+        self.check_cache_seconds = check_cache_seconds
+        self._reset()
+
+    def _reset(self):
+        self.started_at = time.time()
+        self.warmed = False
+        self.warmup_seconds: Optional[float] = None
+        # Step name -> {"ms": ..., "error": ...}
+        self.steps: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._results: Optional[Dict[str, Dict]] = None
+        self._checked_at = 0.0
+        self._check_lock = asyncio.Lock()
+
+    def _run_steps(self, steps: List[Tuple[str, Callable]]):
+        for name, step in steps:
+            started = time.perf_counter()
+            try:
+                step()
+                self.steps[name] = {"ms": round((time.perf_counter() - started) * 1000, 1)}
+            except Exception as exc:
+                # Keep warming the rest; readiness checks decide whether the worker can serve
+                logger.exception("Warm-up step %s failed", name)
+                self.steps[name] = {"ms": round((time.perf_counter() - started) * 1000, 1),
+                                    "error": type(exc).__name__}
+
+    def preload(self, page_cache):
+        """Fork-safe part of the warm-up, for the gunicorn master (workers inherit it)"""
+        self._run_steps(_preload_steps(page_cache))
+
+    def warm_up(self, page_cache):
+        """Run every warm-up step in this worker (blocking)"""
+        started = time.perf_counter()
+        self._run_steps(_worker_steps(page_cache))
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+        self.warmed = True
+        logger.info("Worker %d warmed up in %.2fs", os.getpid(), self.warmup_seconds)
+
+    def start(self, page_cache):
+        """Start the warm-up in the background (call from the lifespan hook)"""
+        self._reset()
+        self._task = asyncio.create_task(run_in_threadpool(self.warm_up, page_cache))
+
+    def stop(self):
+        directory.stop()
+        work_index.stop()
+
+    def liveness(self) -> Dict:
+        return {"status": "alive", "pid": os.getpid(), "uptime_seconds": round(time.time() - self.started_at, 1)}
+
+    async def _measure(self, check: Callable) -> Dict:
+        started = time.perf_counter()
+        try:
+            detail = await asyncio.wait_for(run_in_threadpool(check), self.check_timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "latency_ms": round(self.check_timeout * 1000, 1), "error": "timeout"}
+        except Exception as exc:
+            logger.warning("Readiness check failed: %r", exc)
+            return {"ok": False, "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "error": type(exc).__name__}
+        if detail is not None:
+            return {"ok": None, "detail": detail}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    async def readiness(self) -> Tuple[int, Dict]:
+        """
+        Measure the dependencies (or reuse recent results) and decide readiness
+
+        Returns:
+            (status_code, body): 200 once warmed up with every required check
+            passing, 503 otherwise
+        """
+        async with self._check_lock:
+            if self._results is None or time.monotonic() - self._checked_at > self.check_cache_seconds:
+                results = await asyncio.gather(*(self._measure(check) for check in self.checks.values()))
+                self._results = dict(zip(self.checks, results))
+                self._checked_at = time.monotonic()
+        results = self._results
+
+        failing = [name for name in self.required if results.get(name, {}).get("ok") is not True]
+        if not self.warmed:
+            status = "warming"
+        elif failing:
+            status = "unavailable"
+        else:
+            status = "ready"
+        body = {
+            "status": status,
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "checks": results,
+            "failing": failing,
+            "warmup": {"finished": self.warmed, "seconds": self.warmup_seconds, "steps": self.steps},
+        }
+        return (200 if status == "ready" else 503), body
+
+
+# Global state (one per worker process; start() resets it after the fork)
+lifecycle = Lifecycle()
@@ -0,0 +1,336 @@
+"""
+Local backend - in-process SQLite stand-in for the Supabase client
+
+Builds its tables from supabase_schema.sql and answers the same
+query-builder calls as supabase-py, so the app, CLI and benchmarks can
+run fully offline (DATA_BACKEND=local).
+"""
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from services.sql_query import RPCCall, SQLQuery
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "supabase_schema.sql")
+
+_TABLE_PATTERN = re.compile(r"CREATE TABLE (\w+) \((.*?)\n\)(?: PARTITION BY LIST \((\w+)\))?;", re.S)
+_PRIMARY_KEY_PATTERN = re.compile(r"^\s*PRIMARY KEY \(([^)]*)\)", re.M)
+_INDEX_PATTERN = re.compile(r"^CREATE (?:UNIQUE )?INDEX [^;]+;", re.M)
+_COLUMN_PATTERN = re.compile(r"^(\w+)\s+(\w+(?:\s*\([^)]*\))?(?:\s+WITH(?:OUT)? TIME ZONE)?)\s*(.*)$", re.I)
+_CONSTRAINT_WORDS = ("PRIMARY", "UNIQUE", "FOREIGN", "CONSTRAINT", "CHECK")
+_VIEW_PATTERN = re.compile(r"^CREATE VIEW (\w+) AS\n(.*?);", re.S | re.M)
+# Seed rows such as the default tenant (other INSERTs, e.g. storage buckets, are Supabase-only)
+_SEED_PATTERN = re.compile(r"^INSERT INTO (\w+) (\([^)]*\) VALUES \([^;]*\)) ON CONFLICT \(\w+\) DO NOTHING;", re.M)
+_TRIGGER_PATTERN = re.compile(
+    r"CREATE TRIGGER (\w+) (?:BEFORE|AFTER) [A-Z ]+? ON (\w+)\s+"
+    r"FOR EACH ROW EXECUTE FUNCTION (\w+)\(([^)]*)\);"
+)
+
+# Same text formats Python writes: ISO timestamps with microseconds, dashed UUIDs
+_SQLITE_NOW = "(strftime('%Y-%m-%dT%H:%M:%f', 'now') || '000+00:00')"
+_SQLITE_UUID = ("lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-' || hex(randomblob(2))"
+                " || '-' || hex(randomblob(2)) || '-' || hex(randomblob(6)))")
+
+# SQLite version of apply_activity_rollup() for one row (OLD or NEW) and sign
+_ROLLUP_UPSERT = """
+    INSERT INTO activity_rollups (id, tenant_id, user_id, academic_year, metric, row_count, amount_sum, updated_at)
+    VALUES ({uuid}, {row}.tenant_id, {row}.user_id, {row}.academic_year, '{metric}',
+            {sign}1, {sign}COALESCE({amount}, 0), {now})
+    ON CONFLICT (user_id, academic_year, metric) DO UPDATE SET
+        row_count = row_count + excluded.row_count,
+        amount_sum = amount_sum + excluded.amount_sum,
+        updated_at = excluded.updated_at;"""
+
+# SQLite version of bump_data_version() for one owner expression
+_VERSION_UPSERT = """
+    INSERT INTO data_versions (user_id, tenant_id, version, updated_at) VALUES ({owner}, {tenant}, 1, {now})
+    ON CONFLICT (user_id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at;"""
+
+
+def _sqlite_type(pg_type: str) -> str:
+    """Map a Postgres column type to a SQLite storage class"""
+    pg_type = pg_type.upper()
+    if pg_type.startswith(("INT", "BIGINT", "SMALLINT", "BOOLEAN")):
+        return "INTEGER"
+    if pg_type.startswith(("DECIMAL", "NUMERIC", "REAL", "DOUBLE", "FLOAT")):
+        return "REAL"
+    return "TEXT"
+
+
+def parse_schema(sql: str) -> Dict[str, List[Tuple[str, str, str]]]:
+    """
+    Parse CREATE TABLE statements from the Supabase schema
+
+    Returns:
+        Mapping of table name to (column, postgres_type, constraints) tuples
+    """
+    tables = {}
+    for name, body, _ in _TABLE_PATTERN.findall(sql):
+        columns = []
+        for line in body.splitlines():
+            line = line.strip().rstrip(",")
+            if not line or line.startswith("--") or line.split()[0].upper() in _CONSTRAINT_WORDS:
+                continue
+            match = _COLUMN_PATTERN.match(line)
+            if match:
+                columns.append(match.groups())
+        tables[name] = columns
+    return tables
+
+
+def parse_partitions(sql: str) -> Dict[str, str]:
+    """Partitioned tables of the Supabase schema mapped to their LIST partition column"""
+    return {name: column for name, _, column in _TABLE_PATTERN.findall(sql) if column}
+
+
+class LocalBucket:
+    """Storage bucket stand-in writing objects to the local filesystem"""
+
+    def __init__(self, root: str, bucket: str):
+        self._root = os.path.join(root, bucket)
+        self._bucket = bucket
+
+    @staticmethod
+    def _key(path: str) -> str:
+        """Object key with folders (e.g. tenant/user.jpg), never escaping the bucket"""
+        return "/".join(part for part in path.split("/") if part not in ("", ".", ".."))
+
+    def upload(self, path: str, content: bytes, file_options: Dict = None):
+        target = os.path.join(self._root, *self._key(path).split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as f:
+            f.write(content)
+        return {"path": path}
+
+    def get_public_url(self, path: str) -> str:
+        return f"/local-storage/{self._bucket}/{self._key(path)}"
+
+
+class LocalStorage:
+    def __init__(self, root: str):
+        self._root = root
+
+    def from_(self, bucket: str) -> LocalBucket:
+        return LocalBucket(self._root, bucket)
+
+    def get_bucket(self, bucket: str) -> Dict:
+        # Uploads create folders on demand; the root must exist and be writable
+        os.makedirs(self._root, exist_ok=True)
+        if not os.access(self._root, os.W_OK):
+            raise PermissionError(f"Storage directory is not writable: {self._root}")
+        return {"id": bucket, "name": bucket}
+
+
+def _rollup_triggers(name: str, table: str, columns: set, metric: str, amount_column: str = None) -> List[str]:
+    """SQLite triggers for apply_activity_rollup(metric[, amount_column])"""
+    def upsert(row, sign):
+        amount = f"{row}.{amount_column}" if amount_column else "NULL"
+        return _ROLLUP_UPSERT.format(row=row, sign=sign, metric=metric, amount=amount,
+                                     uuid=_SQLITE_UUID, now=_SQLITE_NOW)
+
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {table} "
+        f"WHEN NEW.user_id IS NOT NULL BEGIN {upsert('NEW', '')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {table} "
+        f"WHEN OLD.user_id IS NOT NULL BEGIN {upsert('OLD', '-')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_update_old AFTER UPDATE ON {table} "
+        f"WHEN OLD.user_id IS NOT NULL BEGIN {upsert('OLD', '-')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_update_new AFTER UPDATE ON {table} "
+        f"WHEN NEW.user_id IS NOT NULL BEGIN {upsert('NEW', '')} END",
+    ]
+
+
+def _updated_at_triggers(name: str, table: str, columns: set) -> List[str]:
+    """SQLite triggers for set_updated_at(): re-stamp the row after each write"""
+    stamp = f"UPDATE {table} SET updated_at = {_SQLITE_NOW} WHERE id = NEW.id;"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {table} BEGIN {stamp} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_update AFTER UPDATE ON {table} BEGIN {stamp} END",
+    ]
+
+
+def _tombstone_triggers(name: str, table: str, columns: set) -> List[str]:
+    """SQLite trigger for record_deleted_row()"""
+    user_id = "OLD.user_id" if "user_id" in columns else "NULL"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {name} AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO deleted_rows (id, tenant_id, table_name, row_id, user_id, deleted_at) "
+        f"VALUES ({_SQLITE_UUID}, OLD.tenant_id, '{table}', OLD.id, {user_id}, {_SQLITE_NOW}); END"
+    ]
+
+
+def _version_triggers(name: str, table: str, columns: set, owner_column: str) -> List[str]:
+    """SQLite triggers for bump_data_version(owner_column)"""
+    def upsert(row):
+        return _VERSION_UPSERT.format(owner=f"{row}.{owner_column}", tenant=f"{row}.tenant_id", now=_SQLITE_NOW)
+
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {table} "
+        f"WHEN NEW.{owner_column} IS NOT NULL BEGIN {upsert('NEW')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {table} "
+        f"WHEN OLD.{owner_column} IS NOT NULL BEGIN {upsert('OLD')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_update_old AFTER UPDATE ON {table} "
+        f"WHEN OLD.{owner_column} IS NOT NULL BEGIN {upsert('OLD')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_update_new AFTER UPDATE ON {table} "
+        f"WHEN NEW.{owner_column} IS NOT OLD.{owner_column} AND NEW.{owner_column} IS NOT NULL "
+        f"BEGIN {upsert('NEW')} END",
+    ]
+
+
+# Trigger functions in supabase_schema.sql -> SQLite translations
+_TRIGGER_TRANSLATIONS = {
+    "apply_activity_rollup": _rollup_triggers,
+    "set_updated_at": _updated_at_triggers,
+    "record_deleted_row": _tombstone_triggers,
+    "bump_data_version": _version_triggers,
+}
+
+
+class LocalClient:
+    """SQLite-backed client exposing supabase-py's table()/storage API"""
+
+    def __init__(self, path: str = ":memory:", storage_dir: str = "local_storage"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._lock = threading.Lock()
+        self.storage = LocalStorage(storage_dir)
+
+        with open(SCHEMA_PATH, encoding="utf-8") as f:
+            schema_sql = f.read()
+        self._schema = parse_schema(schema_sql)
+        self._boolean_columns = {
+            table: {c for c, t, _ in columns if t.upper() == "BOOLEAN"}
+            for table, columns in self._schema.items()
+        }
+        self._views = {name for name, _ in _VIEW_PATTERN.findall(schema_sql)}
+        self._partitions = parse_partitions(schema_sql)
+        self._create_tables(schema_sql)
+
+    def _create_tables(self, schema_sql: str):
+        primary_keys = {name: _PRIMARY_KEY_PATTERN.findall(body)
+                        for name, body, _ in _TABLE_PATTERN.findall(schema_sql)}
+        with self._lock, self._conn:
+            for table, columns in self._schema.items():
+                definitions = []
+                for column, pg_type, constraints in columns:
+                    # Defaults (uuid_generate_v4, NOW) are filled in by prepare_row
+                    constraints = re.sub(r"DEFAULT\s+\S+(\(\))?", "", constraints, flags=re.I).strip()
+                    definitions.append(f'"{column}" {_sqlite_type(pg_type)} {constraints}'.strip())
+                # Composite keys, e.g. (id, academic_year) of the partitioned activity tables
+                definitions.extend(f"PRIMARY KEY ({key})" for key in primary_keys[table])
+                self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({", ".join(definitions)})')
+            for statement in _INDEX_PATTERN.findall(schema_sql):
+                self._conn.execute(statement.replace("CREATE INDEX", "CREATE INDEX IF NOT EXISTS", 1)
+                                   .replace("CREATE UNIQUE INDEX", "CREATE UNIQUE INDEX IF NOT EXISTS", 1))
+            for name, table, function, args in _TRIGGER_PATTERN.findall(schema_sql):
+                columns = {column for column, _, _ in self._schema[table]}
+                arguments = [arg.strip().strip("'") for arg in args.split(",") if arg.strip()]
+                for statement in _TRIGGER_TRANSLATIONS[function](name, table, columns, *arguments):
+                    self._conn.execute(statement)
+            for name, query in _VIEW_PATTERN.findall(schema_sql):
+                self._conn.execute(f'CREATE VIEW IF NOT EXISTS "{name}" AS {query}')
+            for table, values in _SEED_PATTERN.findall(schema_sql):
+                if table in self._schema:
+                    self._conn.execute(f'INSERT OR IGNORE INTO "{table}" {values}')
+
+    # Dialect hooks used by SQLQuery
+    def placeholder(self, index: int) -> str:
+        return "?"
+
+    def operator(self, sql_operator: str) -> str:
+        # SQLite LIKE is already case-insensitive for ASCII
+        return "LIKE" if sql_operator == "ILIKE" else sql_operator
+
+    def bind(self, table: str, column: str, value):
+        return value
+
+    def prepare_row(self, table: str, row: Dict) -> Dict:
+        """Apply the column defaults Postgres would fill in"""
+        row = dict(row)
+        now = datetime.now(timezone.utc).isoformat()
+        for column, pg_type, constraints in self._schema.get(table, []):
+            if column in row:
+                continue
+            upper = constraints.upper()
+            if "UUID_GENERATE_V4" in upper or "GEN_RANDOM_UUID" in upper:
+                row[column] = str(uuid.uuid4())
+            elif "DEFAULT NOW()" in upper:
+                row[column] = now
+            elif "DEFAULT TRUE" in upper:
+                row[column] = True
+            elif "DEFAULT FALSE" in upper:
+                row[column] = False
+            elif "DEFAULT '" in upper:
+                row[column] = re.search(r"DEFAULT '([^']*)'", constraints, re.I).group(1)
+        return row
+
+    def run(self, statements: List[Tuple[str, List]]) -> List[Dict]:
+        """Run statements in one transaction and return all result rows"""
+        rows = []
+        with self._lock, self._conn:
+            for sql, params in statements:
+                rows.extend(dict(r) for r in self._conn.execute(sql, params).fetchall())
+        return rows
+
+    def table(self, name: str) -> "LocalQuery":
+        if name not in self._schema and name not in self._views:
+            raise ValueError(f"Unknown table: {name}")
+        return LocalQuery(self, name)
+
+    def rpc(self, function: str, params: Optional[Dict] = None) -> RPCCall:
+        """
+        Call one of the schema's maintenance functions
+
+        SQLite has no partitions: creating them is a no-op, and dropping a
+        year deletes its rows the way dropping its partitions would (no
+        rollup changes, no tombstones, data versions bumped).
+        """
+        functions = {
+            "create_academic_year_partitions": lambda p_year: 0,
+            "partition_academic_years": lambda: 0,
+            "drop_academic_year_partitions": self._drop_academic_year,
+        }
+        if function not in functions:
+            raise ValueError(f"Unknown function: {function}")
+        return RPCCall(lambda: functions[function](**(params or {})))
+
+    def _drop_academic_year(self, p_year: str, p_expected: Dict[str, int]) -> int:
+        with self._lock, self._conn:
+            rollups = [dict(row) for row in self._conn.execute(
+                "SELECT * FROM activity_rollups WHERE academic_year = ?", [p_year])]
+            last_tombstone = self._conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM deleted_rows").fetchone()[0]
+            total = 0
+            for table in self._partitions:
+                rows = self._conn.execute(f'SELECT COUNT(*) FROM "{table}" WHERE academic_year = ?',
+                                          [p_year]).fetchone()[0]
+                expected = int(p_expected.get(table, 0))
+                if rows != expected:
+                    raise ValueError(f"{table} has {rows} rows for {p_year}, archive has {expected}")
+                # The delete triggers bump data versions; their rollup and tombstone effects are undone below
+                self._conn.execute(f'DELETE FROM "{table}" WHERE academic_year = ?', [p_year])
+                total += rows
+            self._conn.execute("DELETE FROM deleted_rows WHERE rowid > ?", [last_tombstone])
+            self._conn.execute("DELETE FROM activity_rollups WHERE academic_year = ?", [p_year])
+            for row in rollups:
+                columns = ", ".join(f'"{column}"' for column in row)
+                self._conn.execute(f"INSERT INTO activity_rollups ({columns}) VALUES ({', '.join('?' * len(row))})",
+                                   list(row.values()))
+        return total
+
+
+class LocalQuery(SQLQuery):
+    def execute(self):
+        response = super().execute()
+        # Restore BOOLEAN columns that SQLite stores as integers
+        booleans = self._client._boolean_columns.get(self._table, ())
+        for row in response.data:
+            for column in booleans:
+                if row.get(column) is not None:
+                    row[column] = bool(row[column])
+        return response
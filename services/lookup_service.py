@@ -0,0 +1,41 @@
+"""
+Lookup Service - filter vocabularies for the dashboards
+
+Academic years, departments and designations are derived from the data
+itself, separately for each tenant. Academic years come from the
+department rollups the analytics already cache (one row per department,
+designation, year and metric with rows), not from scanning the activity
+tables. They change rarely, so each tenant's list is kept in the shared
+cache for LOOKUP_CACHE_SECONDS and every worker serves it from there,
+together with the years moved to the cold archive; departments and
+designations are read from the in-memory faculty directory.
+"""
+from typing import Dict, List
+
+from config import LOOKUP_CACHE_SECONDS
+from services import analytics_service, archive_service, shared_cache
+from services.faculty_directory import directory
+
+DEFAULT_ACADEMIC_YEARS = ["2024-2025", "2025-2026", "2026-2027"]
+
+
+def _load_academic_years(tenant_id: str) -> List[str]:
+    # The rollups count publications, awards, research projects, patents and
+    # conferences per year; years whose rows were all deleted are left out
+    years = {row["academic_year"] for row in analytics_service.get_rollups(tenant_id) if row.get("academic_year")}
+    return sorted(years, reverse=True)
+
+
+def academic_years(tenant_id: str) -> List[str]:
+    """A tenant's academic years with data (archived ones included), newest first"""
+    years = shared_cache.get_or_load(f"lookup:academic_years:{tenant_id}", LOOKUP_CACHE_SECONDS,
+                                     lambda: _load_academic_years(tenant_id))
+    years = set(years) | set(archive_service.archived_years(tenant_id))
+
+    # Fall back to the default years if there is no data yet
+    return sorted(years or DEFAULT_ACADEMIC_YEARS, reverse=True)
+
+
+def profile_vocabularies(tenant_id: str) -> Dict[str, List[str]]:
+    """{"departments": [...], "designations": [...]} used in a tenant's faculty profiles"""
+    return {"departments": directory.departments(tenant_id), "designations": directory.designations(tenant_id)}
@@ -0,0 +1,283 @@
+"""
+Password Policy Service - calibrated password hashing
+
+New hashes use PASSWORD_HASH_SCHEME (bcrypt or argon2) with a cost
+calibrated so that one verify takes about PASSWORD_HASH_TARGET_MS on this
+host: bcrypt's log2 rounds, or argon2's time cost at a fixed memory cost
+and parallelism. The calibration is measured once (at startup, or with
+`python -m manage calibrate-passwords`) and kept in PASSWORD_POLICY_FILE
+together with the hardware it was measured on (CPU model and count, not
+the host name), so every worker, restart and same-hardware host sharing
+the file uses the same parameters until the app moves to other hardware
+or the settings change.
+
+Stored hashes of the other scheme, with other parameters or below the
+policy cost still verify; verify_and_update() returns a new hash for them,
+which login saves, so login CPU per request follows the current policy.
+Hashes above the policy cost are kept: rehashing them would weaken them.
+"""
+import fcntl
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from config import (
+    PASSWORD_ARGON2_MEMORY_KIB,
+    PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_HASH_CALIBRATE,
+    PASSWORD_HASH_SCHEME,
+    PASSWORD_HASH_TARGET_MS,
+    PASSWORD_POLICY_FILE
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ("bcrypt", "argon2")
+# Cost parameter per scheme and its allowed range (bcrypt below 10 or
+# argon2 below 2 passes is too weak whatever the hardware)
+COST_PARAMETERS = {"bcrypt": ("rounds", 10, 16), "argon2": ("time_cost", 2, 20)}
+# Costs used without a calibration
+DEFAULT_COSTS = {"bcrypt": 12, "argon2": 3}
+CALIBRATION_SAMPLES = 3
+_SAMPLE_PASSWORD = "calibration-Sample-1"
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def host_fingerprint() -> str:
+    """What a calibration depends on: the hardware it ran on (identical hosts share it)"""
+    return f"{platform.machine()}/{_cpu_model()}/{os.cpu_count()}"
+
+
+class PasswordPolicy:
+    """A scheme and its cost parameters, plus how they were chosen"""
+
+    def __init__(self, scheme: str, params: Dict[str, int], target_ms: float = PASSWORD_HASH_TARGET_MS,
+                 measured_ms: Optional[float] = None, host: Optional[str] = None,
+                 calibrated_at: Optional[str] = None):
+        if scheme not in SCHEMES:
+            raise ValueError(f"Unknown password hash scheme: {scheme} (known: {', '.join(SCHEMES)})")
+        self.scheme = scheme
+        self.params = params
+        self.target_ms = target_ms
+        self.measured_ms = measured_ms
+        self.host = host
+        self.calibrated_at = calibrated_at
+
+    @classmethod
+    def default(cls, scheme: str = PASSWORD_HASH_SCHEME) -> "PasswordPolicy":
+        """The uncalibrated policy (library-level default cost)"""
+        return cls(scheme, _params(scheme, DEFAULT_COSTS.get(scheme, 0)))
+
+    def context(self) -> CryptContext:
+        """Hashes with this policy; verifies every known scheme and flags weaker hashes for update"""
+        cost_name = COST_PARAMETERS[self.scheme][0]
+        settings = {f"{self.scheme}__{name}": value for name, value in self.params.items() if name != cost_name}
+        # passlib's rounds/time_cost would also flag costlier hashes; only cheaper ones are outdated
+        settings[f"{self.scheme}__default_rounds"] = settings[f"{self.scheme}__min_rounds"] = self.params[cost_name]
+        schemes = [self.scheme] + [scheme for scheme in SCHEMES if scheme != self.scheme]
+        return CryptContext(schemes=schemes, default=self.scheme, deprecated="auto", **settings)
+
+    def matches_settings(self, scheme: str = PASSWORD_HASH_SCHEME, target_ms: float = PASSWORD_HASH_TARGET_MS) -> bool:
+        """Whether this calibration is still valid for the configured settings on this hardware"""
+        if (self.scheme, self.target_ms, self.host) != (scheme, target_ms, host_fingerprint()):
+            return False
+        return scheme != "argon2" or (self.params.get("memory_cost"), self.params.get("parallelism")) == (
+            PASSWORD_ARGON2_MEMORY_KIB, PASSWORD_ARGON2_PARALLELISM)
+
+    def to_dict(self) -> Dict:
+        return {"scheme": self.scheme, "params": self.params, "target_ms": self.target_ms,
+                "measured_ms": self.measured_ms, "host": self.host, "calibrated_at": self.calibrated_at}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PasswordPolicy":
+        return cls(data["scheme"], data["params"], data["target_ms"], data.get("measured_ms"),
+                   data.get("host"), data.get("calibrated_at"))
+
+
+def _params(scheme: str, cost: int) -> Dict[str, int]:
+    if scheme == "argon2":
+        return {"time_cost": cost, "memory_cost": PASSWORD_ARGON2_MEMORY_KIB,
+                "parallelism": PASSWORD_ARGON2_PARALLELISM}
+    return {"rounds": cost}
+
+
+def _handler(scheme: str):
+    from passlib import hash as passlib_hash
+
+    handler = getattr(passlib_hash, scheme)
+    if scheme == "argon2" and not handler.has_backend():
+        raise RuntimeError("argon2 password hashing requires argon2-cffi")
+    return handler
+
+
+def measure_ms(scheme: str, cost: int, samples: int = CALIBRATION_SAMPLES) -> float:
+    """Median time of one hash (a verify costs the same) at a cost on this host"""
+    handler = _handler(scheme).using(**_params(scheme, cost))
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(_SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(scheme: str = PASSWORD_HASH_SCHEME, target_ms: float = PASSWORD_HASH_TARGET_MS,
+              report=None) -> PasswordPolicy:
+    """
+    Measure this host and pick the cost whose verify time is closest to target_ms
+
+    Args:
+        scheme: "bcrypt" or "argon2"
+        target_ms: Wanted verify time
+        report: Called as report(cost, ms) for every measurement
+
+    Returns:
+        The calibrated policy (not saved)
+    """
+    _, low, high = COST_PARAMETERS[scheme]
+    measured = {}
+
+    def sample(cost: int) -> float:
+        measured[cost] = measure_ms(scheme, cost)
+        if report:
+            report(cost, measured[cost])
+        return measured[cost]
+
+    if scheme == "bcrypt":
+        # Every round doubles the work
+        cost = low + round(math.log2(max(target_ms, 1) / sample(low)))
+    else:
+        # Passes add work linearly on top of filling the memory once
+        per_pass = max(sample(low + 1) - sample(low), 0.1)
+        cost = low + round((target_ms - measured[low]) / per_pass)
+    cost = min(max(cost, low), high)
+    measured_ms = measured.get(cost) or sample(cost)
+    return PasswordPolicy(scheme, _params(scheme, cost), target_ms, round(measured_ms, 1), host_fingerprint(),
+                          datetime.now(timezone.utc).isoformat())
+
+
+def read_policy(path: str = PASSWORD_POLICY_FILE) -> Optional[PasswordPolicy]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return PasswordPolicy.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_policy(policy: PasswordPolicy, path: str = PASSWORD_POLICY_FILE):
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(policy.to_dict(), f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def load_policy(path: str = PASSWORD_POLICY_FILE) -> PasswordPolicy:
+    """
+    The stored calibration if it fits this hardware and the settings, otherwise a new one
+
+    Processes starting together wait for the one that calibrates (they
+    would slow down each other's measurements) and then read its file.
+    """
+    policy = read_policy(path)
+    if policy is not None and policy.matches_settings():
+        return policy
+    if not PASSWORD_HASH_CALIBRATE:
+        return PasswordPolicy.default()
+    try:
+        with open(f"{path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            policy = read_policy(path)
+            if policy is None or not policy.matches_settings():
+                policy = calibrate()
+                save_policy(policy, path)
+                logger.info("Calibrated %s password hashing on %s: %s (%.0fms)",
+                            policy.scheme, policy.host, policy.params, policy.measured_ms)
+    except OSError:
+        # Read-only deployment: calibrate for this process only
+        logger.warning("Could not store the password policy in %s", path, exc_info=True)
+        policy = calibrate()
+    return policy
+
+
+class _PolicyState:
+    """This process's policy and its CryptContext, loaded on first use"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.policy: Optional[PasswordPolicy] = None
+        self.context: Optional[CryptContext] = None
+
+    def load(self) -> CryptContext:
+        with self._lock:
+            if self.context is None:
+                self.policy = load_policy()
+                self.context = self.policy.context()
+            return self.context
+
+    def use(self, policy: PasswordPolicy):
+        with self._lock:
+            self.policy = policy
+            self.context = policy.context()
+
+
+_state = _PolicyState()
+
+
+def _context() -> CryptContext:
+    return _state.context or _state.load()
+
+
+def warm_up():
+    """Load or calibrate the policy (a startup step, before the first login)"""
+    _state.load()
+
+
+def current_policy() -> PasswordPolicy:
+    _state.load()
+    return _state.policy
+
+
+def use_policy(policy: PasswordPolicy):
+    """Switch this process to a policy (after a new calibration)"""
+    _state.use(policy)
+
+
+def hash_password(password: str) -> str:
+    return _context().hash(password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return _context().verify(password, password_hash)
+
+
+def verify_and_update(password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it when the stored hash is outdated
+
+    Returns:
+        (valid, new_hash): new_hash is None unless the password is valid and
+        the stored hash uses another scheme, other parameters or a lower cost
+    """
+    return _context().verify_and_update(password, password_hash)
+
+
+def needs_update(password_hash: str) -> bool:
+    return _context().needs_update(password_hash)
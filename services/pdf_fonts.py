@@ -0,0 +1,199 @@
+"""
+PDF Fonts Service - Unicode TTF fonts shared by every generated PDF
+
+fpdf2 parses a TTF (cmap, glyph widths, descriptor) every time add_font
+is called and decompiles the whole font again to subset it when the
+document is written; for a font with thousands of glyphs that costs more
+than rendering a short profile. So, once per process, each font is
+parsed and also cut down to a "common" font holding only the Latin and
+punctuation glyphs most documents use. Every document gets a light copy
+of the parsed font with its own subset map; at output time it subsets
+the small common font when all of its glyphs are in there, and the full
+file only when the text needs more. Either way only the glyphs the
+document uses are embedded.
+
+When no font file is configured or readable the documents fall back to
+core Helvetica and text is reduced to Latin-1 instead of failing.
+
+The light copies rely on fpdf2 internals (TTFFont attributes, SubsetMap),
+so fpdf2 is pinned in requirements.txt; check this module when bumping it.
+"""
+import copy
+import io
+import os
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from fontTools import subset as ftsubset
+from fontTools import ttLib
+from fpdf import FPDF
+from fpdf.fonts import SubsetMap, TTFFont
+
+from config import PDF_FONT_PATH, PDF_FONT_BOLD_PATH, PDF_FONT_ITALIC_PATH, PDF_FALLBACK_FONTS
+
+FONT_FAMILY = "body"
+CORE_FAMILY = "helvetica"
+
+# Common pasted punctuation outside Latin-1, used by the core font fallback
+_ASCII_PUNCTUATION = str.maketrans({
+    "‘": "'", "’": "'", "‚": "'", "‛": "'",
+    "“": '"', "”": '"', "„": '"', "′": "'", "″": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "−": "-",
+    "…": "...", "•": "*", " ": " ", " ": " ", "​": "",
+})
+
+# Characters in the per-process common font: Latin-1, Latin Extended-A,
+# general punctuation and a few symbols seen in pasted titles
+COMMON_CHARS = (
+    set(range(0x20, 0x7F)) | set(range(0xA0, 0x180))
+    | set(range(0x2010, 0x2027)) | set(range(0x2030, 0x203B))
+    | {0x20AC, 0x2122, 0x2212, 0x2264, 0x2265, 0x00D7}
+)
+
+
+class _CachedFont:
+    """A font file parsed once: fpdf2 metrics plus full and common sources"""
+
+    __slots__ = ("template", "data", "common_data", "common_glyphs")
+
+    def __init__(self, template: TTFFont, data: bytes, common_data: bytes, common_glyphs: frozenset):
+        self.template = template
+        self.data = data
+        self.common_data = common_data
+        self.common_glyphs = common_glyphs
+
+
+# (path, style) -> cached font
+_cache: Dict[Tuple[str, str], _CachedFont] = {}
+_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def font_files() -> Dict[str, str]:
+    """
+    Style ("", "B", "I") -> TTF path of the body font, empty when none is usable
+
+    Styles without their own file are left out rather than mapped to the
+    regular file, which would embed a second copy of the same glyphs.
+    """
+    if not PDF_FONT_PATH or not os.path.isfile(PDF_FONT_PATH):
+        return {}
+    files = {"": PDF_FONT_PATH}
+    for style, path in (("B", PDF_FONT_BOLD_PATH), ("I", PDF_FONT_ITALIC_PATH)):
+        if path and os.path.isfile(path):
+            files[style] = path
+    return files
+
+
+def _common_subset(data: bytes, template: TTFFont) -> Tuple[bytes, frozenset]:
+    """
+    Cut a font down to COMMON_CHARS, keeping glyph names so fpdf2 can subset it again
+
+    Hinting is dropped: PDF viewers rasterize without it and it is most of
+    what fpdf2 would otherwise recompile for every document.
+    """
+    ttfont = ttLib.TTFont(io.BytesIO(data), recalcTimestamp=False)
+    options = ftsubset.Options(notdef_outline=True, recommended_glyphs=True, glyph_names=True, hinting=False)
+    # Layout, color and bitmap tables that fpdf2 drops from embedded fonts anyway
+    options.drop_tables += ["FFTM", "GDEF", "GPOS", "GSUB", "MATH", "hdmx", "meta", "sbix",
+                            "CBDT", "CBLC", "EBDT", "EBLC", "EBSC", "SVG ", "CPAL", "COLR"]
+    subsetter = ftsubset.Subsetter(options)
+    subsetter.populate(unicodes=COMMON_CHARS & set(template.cmap))
+    subsetter.subset(ttfont)
+    output = io.BytesIO()
+    ttfont.save(output)
+    return output.getvalue(), frozenset(ttfont.getGlyphOrder())
+
+
+def _cached_font(path: str, style: str) -> _CachedFont:
+    """Parse a font file once per process"""
+    key = (path, style)
+    if key not in _cache:
+        with _cache_lock:
+            if key not in _cache:
+                scratch = FPDF()
+                scratch.add_font(FONT_FAMILY, style, path)
+                template = scratch.fonts[f"{FONT_FAMILY}{style}"]
+                # Documents open their own handle; keep only the parsed metrics
+                template.ttfont.close()
+                template.ttfont = None
+                with open(path, "rb") as f:
+                    data = f.read()
+                _cache[key] = _CachedFont(template, data, *_common_subset(data, template))
+    return _cache[key]
+
+
+def _attach(pdf: FPDF, family: str, style: str, path: str):
+    """Register a cached font in one document with fresh per-document state"""
+    cached = _cached_font(path, style)
+    font = copy.copy(cached.template)
+    font.i = len(pdf.fonts) + 1
+    font.fontkey = f"{family}{style}"
+    # Chosen in prepare_output once the document's glyphs are known
+    font.ttfont = None
+    font.subset = SubsetMap(font)
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    font._hbfont = None
+    # Text fonts only: color (COLR/CBDT) glyph renderers are not shared
+    font.color_font = None
+    pdf.fonts[font.fontkey] = font
+    pdf._cached_fonts[font.fontkey] = cached
+
+
+def register_fonts(pdf: FPDF) -> str:
+    """
+    Add the body font (and fallbacks) to a document
+
+    Args:
+        pdf: Freshly created document
+
+    Returns:
+        Family name to pass to set_font
+    """
+    files = font_files()
+    if not files:
+        return CORE_FAMILY
+    pdf._cached_fonts = {}
+    for style, path in files.items():
+        _attach(pdf, FONT_FAMILY, style, path)
+    fallbacks: List[str] = []
+    for i, path in enumerate(PDF_FALLBACK_FONTS):
+        if os.path.isfile(path):
+            family = f"fallback{i}"
+            _attach(pdf, family, "", path)
+            fallbacks.append(family)
+    if fallbacks:
+        pdf.set_fallback_fonts(fallbacks)
+    return FONT_FAMILY
+
+
+def prepare_output(pdf: FPDF):
+    """
+    Give each cached font the smallest source covering its glyphs
+
+    Call right before pdf.output(); fpdf2 subsets font.ttfont in place.
+    """
+    for fontkey, cached in getattr(pdf, "_cached_fonts", {}).items():
+        font = pdf.fonts[fontkey]
+        common = cached.common_glyphs.issuperset(font.subset.get_all_glyph_names())
+        data = cached.common_data if common else cached.data
+        font.ttfont = ttLib.TTFont(io.BytesIO(data), recalcBBoxes=False, recalcTimestamp=False, lazy=True)
+
+
+def to_latin1(text: str) -> str:
+    """Best-effort Latin-1 version of text for the core font fallback"""
+    text = text.translate(_ASCII_PUNCTUATION)
+    if text.isascii():
+        return text
+    result = []
+    for char in text:
+        if ord(char) < 256:
+            result.append(char)
+            continue
+        # Drop accents Latin-1 lacks ("ā" -> "a"), mark anything else
+        base = unicodedata.normalize("NFKD", char)[:1]
+        result.append(base if base and ord(base) < 256 else "?")
+    return "".join(result)
@@ -0,0 +1,137 @@
+"""
+Postgres backend - direct asyncpg connection pool to Supabase's Postgres
+
+Answers the same query-builder calls as supabase-py (see sql_query.py)
+but sends SQL over a pooled connection instead of one PostgREST HTTP
+request per query. asyncpg prepares and caches each distinct statement
+per connection, so repeated router queries skip parsing and planning.
+"""
+import asyncio
+import json
+import threading
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import asyncpg
+
+from services.sql_query import RPCCall, SQLQuery, quote_identifier
+
+
+def _to_json_value(value):
+    """Convert asyncpg values to the JSON-friendly types PostgREST returns"""
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+# data_type (information_schema) -> coercion for bound parameters
+_COERCIONS = {
+    "uuid": lambda v: v if isinstance(v, uuid.UUID) else uuid.UUID(str(v)),
+    "date": lambda v: v if isinstance(v, date) else date.fromisoformat(str(v)),
+    "timestamp with time zone": lambda v: v if isinstance(v, datetime) else _parse_timestamp(str(v)),
+    "timestamp without time zone": lambda v: v if isinstance(v, datetime) else _parse_timestamp(str(v)),
+    "integer": int,
+    "bigint": int,
+    "smallint": int,
+    "numeric": lambda v: Decimal(str(v)),
+    "double precision": float,
+    "real": float,
+    "boolean": lambda v: v if isinstance(v, bool) else str(v).lower() == "true",
+    "character varying": str,
+    "text": str,
+}
+
+
+class PostgresClient:
+    """asyncpg-backed client exposing supabase-py's table() API"""
+
+    def __init__(self, dsn: str, min_size: int = 2, max_size: int = 10,
+                 statement_cache_size: int = 256, storage=None):
+        self.storage = storage
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="pg-pool", daemon=True)
+        self._thread.start()
+        self._pool = self._call(self._create_pool(dsn, min_size, max_size, statement_cache_size))
+        self._column_types = self._load_column_types()
+
+    @staticmethod
+    async def _create_pool(dsn, min_size, max_size, statement_cache_size):
+        return await asyncpg.create_pool(
+            dsn,
+            min_size=min_size,
+            max_size=max_size,
+            statement_cache_size=statement_cache_size
+        )
+
+    def _call(self, coroutine):
+        """Run a coroutine on the pool's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _load_column_types(self) -> Dict[str, Dict[str, str]]:
+        rows = self._call(self._pool.fetch(
+            "SELECT table_name, column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = 'public'"
+        ))
+        types: Dict[str, Dict[str, str]] = {}
+        for row in rows:
+            types.setdefault(row["table_name"], {})[row["column_name"]] = row["data_type"]
+        return types
+
+    # Dialect hooks used by SQLQuery
+    def placeholder(self, index: int) -> str:
+        return f"${index}"
+
+    def operator(self, sql_operator: str) -> str:
+        return sql_operator
+
+    def bind(self, table: str, column: str, value):
+        """Coerce a bound value to the Python type asyncpg expects for the column"""
+        if value is None:
+            return None
+        coerce = _COERCIONS.get(self._column_types.get(table, {}).get(column))
+        return coerce(value) if coerce else value
+
+    def prepare_row(self, table: str, row: Dict) -> Dict:
+        # Column defaults are applied by Postgres itself
+        return row
+
+    async def _run(self, statements: List[Tuple[str, List]]) -> List[Dict]:
+        rows = []
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                for sql, params in statements:
+                    for record in await conn.fetch(sql, *params):
+                        rows.append({k: _to_json_value(v) for k, v in record.items()})
+        return rows
+
+    def run(self, statements: List[Tuple[str, List]]) -> List[Dict]:
+        """Run statements in one transaction on a pooled connection"""
+        return self._call(self._run(statements))
+
+    def table(self, name: str) -> SQLQuery:
+        if name not in self._column_types:
+            raise ValueError(f"Unknown table: {name}")
+        return SQLQuery(self, name)
+
+    def rpc(self, function: str, params: Optional[Dict] = None) -> RPCCall:
+        """Call a database function with named arguments, like PostgREST's /rpc"""
+        params = params or {}
+        arguments = ", ".join(f"{quote_identifier(name)} => ${i}" for i, name in enumerate(params, 1))
+        # JSON arguments are passed as text, as asyncpg expects for json/jsonb
+        values = [json.dumps(value) if isinstance(value, (dict, list)) else value for value in params.values()]
+        sql = f"SELECT {quote_identifier(function)}({arguments}) AS result"
+        return RPCCall(lambda: self.run([(sql, values)])[0]["result"])
+
+    def close(self):
+        self._call(self._pool.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
@@ -0,0 +1,255 @@
+"""
+Profiling service - opt-in sampling profiler for live requests
+
+pyinstrument samples the thread that started it. The middleware profiles
+the event loop, which covers async endpoints. Sync endpoints (the
+exports) run in the threadpool, so routers that use ProfiledRoute start
+a second profiler inside the worker thread, and that profile is the one
+saved for the request. A streamed body is produced after the endpoint
+returns, so the profile is saved once the body is sent; endpoints that
+stream a sync generator pass it through profiled_stream to sample the
+worker threads producing the chunks.
+
+Profiles are stored per tenant (PROFILES_DIR/<tenant>/) and an admin only
+sees their own tenant's; requests without a valid token are kept in
+PROFILES_DIR itself, for operators.
+"""
+import asyncio
+import functools
+import itertools
+import os
+import re
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Iterator, List, Dict, Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+from config import (
+    PROFILING_SAMPLE_EVERY,
+    PROFILING_INTERVAL,
+    PROFILES_DIR,
+    PROFILES_RETENTION
+)
+from services.auth_utils import decode_access_token, token_tenant
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_SUFFIX = ".speedscope.json"
+
+# Tenant ids become folder names
+_TENANT_PATTERN = re.compile(r"^[\w][\w.-]{0,63}$")
+
+_request_counter = itertools.count(1)
+
+# Set by the middleware for a request being profiled; sync endpoints of
+# that request append the profiler they ran in their worker thread
+_thread_profilers: ContextVar[Optional[list]] = ContextVar("thread_profilers", default=None)
+
+
+def _is_admin_request(request: Request) -> bool:
+    """Check whether the request carries a valid admin bearer token"""
+    auth_header = request.headers.get("authorization", "")
+    if not auth_header.lower().startswith("bearer "):
+        return False
+    payload = decode_access_token(auth_header[7:])
+    return payload is not None and payload.get("user_type") == "admin"
+
+
+def should_profile(request: Request) -> bool:
+    """
+    Decide whether a request should be profiled
+
+    Admins can ask for a profile explicitly with the X-Profile header or
+    the ?profile=1 query flag. When PROFILING_SAMPLE_EVERY is set, every
+    Nth request is profiled as well.
+    """
+    requested = (
+        request.headers.get(PROFILE_HEADER) == "1"
+        or request.query_params.get("profile") == "1"
+    )
+    if requested and _is_admin_request(request):
+        return True
+
+    if PROFILING_SAMPLE_EVERY > 0:
+        return next(_request_counter) % PROFILING_SAMPLE_EVERY == 0
+
+    return False
+
+
+def _profile_name(request: Request) -> str:
+    """Build a sortable, filesystem-safe name for a profile file (known before the body is sent)"""
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    path = re.sub(r"[^A-Za-z0-9]+", "-", request.url.path).strip("-") or "root"
+    return f"{timestamp}_{request.method}_{path[:80]}{PROFILE_SUFFIX}"
+
+
+def _profiles_folder(tenant_id: Optional[str]) -> Optional[str]:
+    """A tenant's profile folder; PROFILES_DIR itself for requests without a tenant"""
+    if tenant_id is None:
+        return PROFILES_DIR
+    if not _TENANT_PATTERN.match(tenant_id):
+        return None
+    return os.path.join(PROFILES_DIR, tenant_id)
+
+
+def _enforce_retention(folder: str):
+    """Delete the oldest profiles of a folder beyond PROFILES_RETENTION"""
+    profiles = sorted(
+        (f for f in os.listdir(folder) if f.endswith(PROFILE_SUFFIX)),
+        reverse=True
+    )
+    for stale in profiles[PROFILES_RETENTION:]:
+        try:
+            os.remove(os.path.join(folder, stale))
+        except FileNotFoundError:
+            pass
+
+
+def _save_profile(profiler, folder: str, name: str):
+    """Render the session as speedscope JSON and write it to the tenant's folder"""
+    from pyinstrument.renderers import SpeedscopeRenderer
+
+    os.makedirs(folder, exist_ok=True)
+    output = profiler.output(renderer=SpeedscopeRenderer())
+    with open(os.path.join(folder, name), "w", encoding="utf-8") as f:
+        f.write(output)
+    _enforce_retention(folder)
+
+
+async def profile_request(request: Request, call_next):
+    """
+    HTTP middleware that profiles selected requests with pyinstrument.
+    Requests that are not selected pass straight through.
+    """
+    if not should_profile(request):
+        return await call_next(request)
+    folder = _profiles_folder(token_tenant(request.headers.get("authorization")))
+    if folder is None:
+        return await call_next(request)
+
+    from pyinstrument import Profiler
+
+    profiler = Profiler(interval=PROFILING_INTERVAL, async_mode="enabled")
+    thread_profilers = []
+    token = _thread_profilers.set(thread_profilers)
+    profiler.start()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        profiler.stop()
+        raise
+    finally:
+        _thread_profilers.reset(token)
+
+    name = _profile_name(request)
+    body = response.body_iterator
+
+    async def profiled_body():
+        # call_next returns before the body is produced; keep sampling until it is sent
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            profiler.stop()
+            # A sync endpoint's work happened in its worker thread
+            await run_in_threadpool(_save_profile, thread_profilers[0] if thread_profilers else profiler,
+                                    folder, name)
+
+    response.body_iterator = profiled_body()
+    response.headers["X-Profile-Id"] = name
+    return response
+
+
+def profile_in_thread(endpoint: Callable) -> Callable:
+    """Wrap a sync endpoint so a profiled request is sampled in the thread that runs it"""
+    if asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    def run(*args, **kwargs):
+        thread_profilers = _thread_profilers.get()
+        if thread_profilers is None:
+            return endpoint(*args, **kwargs)
+
+        from pyinstrument import Profiler
+
+        profiler = Profiler(interval=PROFILING_INTERVAL, async_mode="disabled")
+        thread_profilers.append(profiler)
+        profiler.start()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.stop()
+
+    return run
+
+
+def profiled_stream(chunks: Iterator):
+    """
+    Sample a sync streamed body into the profile of the endpoint building it
+
+    Starlette pulls the chunks in worker threads after the endpoint has
+    returned, where neither the endpoint's nor the middleware's profiler
+    runs. Call it inside a ProfiledRoute endpoint; outside a profiled
+    request the chunks are returned unchanged.
+    """
+    thread_profilers = _thread_profilers.get()
+    if not thread_profilers:
+        return chunks
+    return _profiled_chunks(thread_profilers[0], iter(chunks))
+
+
+def _profiled_chunks(profiler, chunks: Iterator):
+    # Each chunk may come from a different worker thread; the sessions add up
+    done = object()
+    while True:
+        profiler.start()
+        try:
+            chunk = next(chunks, done)
+        finally:
+            profiler.stop()
+        if chunk is done:
+            return
+        yield chunk
+
+
+class ProfiledRoute(APIRoute):
+    """Route class for routers with sync endpoints (see profile_in_thread)"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, profile_in_thread(endpoint), **kwargs)
+
+
+def list_profiles(tenant_id: str) -> List[Dict]:
+    """
+    List a tenant's stored profiles, newest first
+
+    Returns:
+        List of dicts with name, size and created_at
+    """
+    folder = _profiles_folder(tenant_id)
+    if folder is None or not os.path.isdir(folder):
+        return []
+
+    profiles = []
+    for name in sorted(os.listdir(folder), reverse=True):
+        if not name.endswith(PROFILE_SUFFIX):
+            continue
+        stat = os.stat(os.path.join(folder, name))
+        profiles.append({
+            "name": name,
+            "size": stat.st_size,
+            "created_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat()
+        })
+    return profiles
+
+
+def get_profile_path(tenant_id: str, name: str) -> Optional[str]:
+    """Resolve a tenant's stored profile name to its path, or None if unknown"""
+    folder = _profiles_folder(tenant_id)
+    if folder is None or os.path.basename(name) != name or not name.endswith(PROFILE_SUFFIX):
+        return None
+    path = os.path.join(folder, name)
+    return path if os.path.isfile(path) else None
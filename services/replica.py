@@ -0,0 +1,139 @@
+"""
+Replica Service - in-memory copies of tables kept fresh by polling
+
+Base class for per-process replicas (faculty directory, publication
+de-duplication index). Rows carry a database-maintained updated_at and
+deletes leave a tombstone in deleted_rows (the same change tracking the
+sync feed uses), so a poll reads only what moved since the previous one.
+
+Every poll re-reads a SYNC_SAFETY_LAG_SECONDS overlap, so rows from
+transactions that committed late are not skipped; subclasses must apply
+rows idempotently. A read never serves data older than max_staleness:
+if the background poller has fallen behind (or was never started, as in
+scripts and tests) the read polls inline first.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from config import SYNC_SAFETY_LAG_SECONDS
+from database import supabase, fetch_all
+
+logger = logging.getLogger(__name__)
+
+
+class PolledReplica:
+    """Replicated tables plus the poller and staleness bound around them"""
+
+    # Replicated table -> selected columns (must include id and updated_at)
+    TABLES: Dict[str, str] = {}
+
+    def __init__(self, poll_seconds: float, max_staleness: float):
+        self.poll_seconds = poll_seconds
+        self.max_staleness = max_staleness
+        self._reset()
+
+    def _reset(self):
+        """Empty the replica; also run in forked children, which must not share locks or threads"""
+        self._lock = threading.RLock()
+        # Start of the last successful poll, as wall clock and monotonic time
+        self._watermark: Optional[datetime] = None
+        self._synced_at: Optional[float] = None
+        self._stale = False
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._clear()
+
+    # ---- subclass hooks (called with the lock held) ----
+
+    def _clear(self):
+        raise NotImplementedError
+
+    def _apply(self, table: str, rows: List[Dict]):
+        raise NotImplementedError
+
+    def _apply_tombstone(self, tombstone: Dict):
+        raise NotImplementedError
+
+    def _applied(self):
+        """Called after each poll's changes are applied"""
+
+    # ---- replication ----
+
+    def _fetch(self, table: str, columns: str, since: Optional[str]) -> List[Dict]:
+        def build_query():
+            query = supabase.table(table).select(columns)
+            if since:
+                query = query.gt("updated_at", since)
+            return query.order("updated_at").order("id")
+        return fetch_all(build_query)
+
+    def _fetch_tombstones(self, since: str) -> List[Dict]:
+        return fetch_all(lambda: supabase.table("deleted_rows").select("id, table_name, row_id, user_id")
+                         .in_("table_name", list(self.TABLES)).gt("deleted_at", since)
+                         .order("deleted_at").order("id"))
+
+    def poll(self):
+        """Apply every change since the last poll (the first call loads everything)"""
+        started = datetime.now(timezone.utc)
+        started_monotonic = time.monotonic()
+        since = None
+        if self._watermark is not None:
+            since = (self._watermark - timedelta(seconds=SYNC_SAFETY_LAG_SECONDS)).isoformat()
+
+        changes = {table: self._fetch(table, columns, since) for table, columns in self.TABLES.items()}
+        tombstones = self._fetch_tombstones(since) if since else []
+
+        with self._lock:
+            for table, rows in changes.items():
+                self._apply(table, rows)
+            for tombstone in tombstones:
+                self._apply_tombstone(tombstone)
+            if any(changes.values()) or tombstones:
+                self._applied()
+            self._watermark = started
+            self._synced_at = started_monotonic
+            self._stale = False
+
+    def _is_stale(self) -> bool:
+        return (self._synced_at is None or self._stale
+                or time.monotonic() - self._synced_at > self.max_staleness)
+
+    def _ensure_fresh(self):
+        """Poll inline when never loaded, invalidated, or older than the staleness bound"""
+        if self._is_stale():
+            with self._lock:
+                if self._is_stale():
+                    self.poll()
+
+    def invalidate(self):
+        """Make the next read in this worker poll first (after a local write)"""
+        self._stale = True
+
+    def staleness(self) -> Optional[float]:
+        """Seconds since the last successful poll, None before the first load"""
+        return None if self._synced_at is None else time.monotonic() - self._synced_at
+
+    # ---- background poller ----
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.poll()
+            except Exception:
+                # Keep serving the last snapshot; reads poll inline past the bound
+                logger.exception("%s poll failed", type(self).__name__)
+
+    def start(self):
+        """Start this process's poller thread and load the replica"""
+        # Poller first, so a failed initial load is retried in the background
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        self._ensure_fresh()
+
+    def stop(self):
+        self._stop.set()
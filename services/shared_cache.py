@@ -0,0 +1,164 @@
+"""
+Shared Cache Service - small key/value cache shared by all worker processes
+
+Module-level dicts are private to one worker, so with several workers a
+logout handled by one of them would not revoke the access token in the
+others, and every worker would reload the same lookup lists. This cache
+is a single SQLite table in WAL mode at SHARED_CACHE_PATH (tmpfs by
+default): readers never block, a lookup is one primary-key read, and
+every worker sees a write as soon as it commits. Values are JSON.
+
+A second table is a short append-only event log, the cross-worker leg of
+services/event_bus.py: each worker appends what it publishes and tails
+what the others did.
+
+Connections are opened per thread and per process, so nothing is shared
+across a fork.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+import orjson
+
+from config import SHARED_CACHE_PATH, EVENTS_RETENTION_SECONDS
+
+# Expired rows are purged on every Nth write
+PURGE_EVERY = 256
+
+_local = threading.local()
+_writes = 0
+
+
+def _connection() -> sqlite3.Connection:
+    """This thread's connection, reopened after a fork"""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        conn = sqlite3.connect(SHARED_CACHE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        # Losing the cache on a crash is harmless
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, origin INTEGER NOT NULL, topic TEXT NOT NULL, "
+            "payload BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+def get(key: str) -> Optional[Any]:
+    """Cached value, or None if missing or expired"""
+    row = _connection().execute(
+        "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+    ).fetchone()
+    return orjson.loads(row[0]) if row else None
+
+
+def contains(key: str) -> bool:
+    """Whether a live entry exists, without decoding it"""
+    return _connection().execute(
+        "SELECT 1 FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+    ).fetchone() is not None
+
+
+def set(key: str, value: Any, ttl: float):
+    """
+    Store a value for every worker
+
+    Args:
+        key: Cache key, namespaced by the caller ("revoked:<jti>")
+        value: JSON-serializable value
+        ttl: Seconds until the entry expires
+    """
+    global _writes
+    now = time.time()
+    conn = _connection()
+    conn.execute(
+        "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+        (key, orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), now + ttl)
+    )
+    _writes += 1
+    if _writes % PURGE_EVERY == 0:
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+
+
+def add(key: str, value: Any, ttl: float) -> bool:
+    """
+    Store a value only if no live entry exists (an atomic claim across workers)
+
+    Returns:
+        True if this call stored the value
+    """
+    now = time.time()
+    cursor = _connection().execute(
+        "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+        "WHERE cache.expires_at <= ?",
+        (key, orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), now + ttl, now)
+    )
+    return cursor.rowcount == 1
+
+
+def delete(key: str):
+    _connection().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+def get_or_load(key: str, ttl: float, loader: Callable[[], Any]) -> Any:
+    """
+    Cached value, loading and storing it on a miss
+
+    Two workers missing at once may both call loader; the last write wins,
+    which is fine for data that is only cached for freshness.
+    """
+    value = get(key)
+    if value is None:
+        value = loader()
+        set(key, value, ttl)
+    return value
+
+
+def append_event(origin: int, topic: str, payload: Any) -> int:
+    """
+    Append an event to the shared log
+
+    Args:
+        origin: Publishing process (its own relay skips the event)
+        topic: Event topic ("user:<id>", "tenant:<id>")
+        payload: JSON-serializable event
+
+    Returns:
+        The event's id, increasing across all workers
+    """
+    global _writes
+    now = time.time()
+    conn = _connection()
+    cursor = conn.execute(
+        "INSERT INTO events (origin, topic, payload, created_at) VALUES (?, ?, ?, ?)",
+        (origin, topic, orjson.dumps(payload), now)
+    )
+    _writes += 1
+    if _writes % PURGE_EVERY == 0:
+        conn.execute("DELETE FROM events WHERE created_at <= ?", (now - EVENTS_RETENTION_SECONDS,))
+    return cursor.lastrowid
+
+
+def events_after(event_id: int, limit: int = 1000) -> List[Tuple[int, int, str, Any]]:
+    """(id, origin, topic, payload) of logged events after event_id, oldest first"""
+    rows = _connection().execute(
+        "SELECT id, origin, topic, payload FROM events WHERE id > ? ORDER BY id LIMIT ?", (event_id, limit)
+    ).fetchall()
+    return [(row[0], row[1], row[2], orjson.loads(row[3])) for row in rows]
+
+
+def last_event_id() -> int:
+    row = _connection().execute("SELECT MAX(id) FROM events").fetchone()
+    return row[0] or 0
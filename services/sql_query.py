@@ -0,0 +1,321 @@
+"""
+SQL query builder - PostgREST-style query calls compiled to plain SQL
+
+Implements the subset of the supabase-py query builder that the routers
+use (select/insert/upsert/update/delete, eq/ilike/or_ filters, order,
+limit, range, returning="minimal", execute) so that non-Supabase backends can stand in for the
+Supabase client without touching router code.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# PostgREST operator -> SQL operator
+OPERATORS = {
+    "eq": "=",
+    "neq": "<>",
+    "gt": ">",
+    "gte": ">=",
+    "lt": "<",
+    "lte": "<=",
+    "like": "LIKE",
+    "ilike": "ILIKE",
+}
+
+
+class QueryResponse:
+    """Result object mirroring supabase-py's APIResponse (data + count)"""
+
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class RPCCall:
+    """Deferred database function call mirroring supabase-py's rpc(...).execute()"""
+
+    def __init__(self, call: Callable[[], Any]):
+        self._call = call
+
+    def execute(self) -> QueryResponse:
+        return QueryResponse(self._call())
+
+
+def quote_identifier(name: str) -> str:
+    """Validate and quote a table or column name"""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return f'"{name}"'
+
+
+def _split_top_level(expression: str) -> List[str]:
+    """Split a PostgREST filter list on commas that are not inside parentheses"""
+    parts, depth, current = [], 0, []
+    for char in expression:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_filter_expression(expression: str) -> List[Tuple]:
+    """
+    Parse a PostgREST logical filter string into filter nodes
+
+    Args:
+        expression: e.g. "name.ilike.%a%,and(updated_at.eq.X,id.gt.Y)"
+
+    Returns:
+        List of ("cond", column, operator, value) or ("and"/"or", [nodes])
+    """
+    nodes = []
+    for part in _split_top_level(expression):
+        for group in ("and", "or"):
+            if part.startswith(f"{group}(") and part.endswith(")"):
+                nodes.append((group, parse_filter_expression(part[len(group) + 1:-1])))
+                break
+        else:
+            column, operator, value = part.split(".", 2)
+            if operator == "in":
+                value = [v.strip().strip('"') for v in value.strip("()").split(",")]
+            elif operator == "is":
+                value = None if value == "null" else value == "true"
+            nodes.append(("cond", column, operator, value))
+    return nodes
+
+
+class SQLQuery:
+    """
+    Chainable query builder compiled to a single SQL statement on execute().
+    The client supplies placeholder style, operator spelling, parameter
+    binding and execution.
+    """
+
+    def __init__(self, client, table: str):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._columns = "*"
+        self._count = None
+        self._payload: Union[Dict, List[Dict], None] = None
+        self._returning = True
+        self._on_conflict: List[str] = []
+        self._ignore_duplicates = False
+        self._filters: List[Tuple] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+
+    # Actions
+    def select(self, columns: str = "*", count: Optional[str] = None):
+        self._action = "select"
+        self._columns = columns
+        self._count = count
+        return self
+
+    def _set_returning(self, returning: Any):
+        # supabase-py passes a ReturnMethod enum whose value is the string
+        self._returning = getattr(returning, "value", returning) != "minimal"
+
+    def insert(self, data: Union[Dict, List[Dict]], returning: Any = "representation", **kwargs):
+        self._action = "insert"
+        self._payload = data
+        self._set_returning(returning)
+        return self
+
+    def upsert(self, data: Union[Dict, List[Dict]], returning: Any = "representation",
+               on_conflict: str = "", ignore_duplicates: bool = False, **kwargs):
+        self._action = "insert"
+        self._payload = data
+        self._set_returning(returning)
+        # PostgREST resolves conflicts on the primary key unless told otherwise
+        self._on_conflict = [c.strip() for c in (on_conflict or "id").split(",") if c.strip()]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, data: Dict, returning: Any = "representation", **kwargs):
+        self._action = "update"
+        self._payload = data
+        self._set_returning(returning)
+        return self
+
+    def delete(self, returning: Any = "representation", **kwargs):
+        self._action = "delete"
+        self._set_returning(returning)
+        return self
+
+    # Filters
+    def _add(self, column: str, operator: str, value: Any):
+        self._filters.append(("cond", column, operator, value))
+        return self
+
+    def eq(self, column: str, value: Any):
+        return self._add(column, "eq", value)
+
+    def neq(self, column: str, value: Any):
+        return self._add(column, "neq", value)
+
+    def gt(self, column: str, value: Any):
+        return self._add(column, "gt", value)
+
+    def gte(self, column: str, value: Any):
+        return self._add(column, "gte", value)
+
+    def lt(self, column: str, value: Any):
+        return self._add(column, "lt", value)
+
+    def lte(self, column: str, value: Any):
+        return self._add(column, "lte", value)
+
+    def like(self, column: str, pattern: str):
+        return self._add(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str):
+        return self._add(column, "ilike", pattern)
+
+    def in_(self, column: str, values: List[Any]):
+        return self._add(column, "in", list(values))
+
+    def is_(self, column: str, value: Any):
+        return self._add(column, "is", value)
+
+    def or_(self, filters: str):
+        self._filters.append(("or", parse_filter_expression(filters)))
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, size: int):
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    # Compilation
+    def _compile_node(self, node: Tuple, params: List) -> str:
+        kind = node[0]
+        if kind in ("and", "or"):
+            parts = [self._compile_node(child, params) for child in node[1]]
+            return "(" + f" {kind.upper()} ".join(parts) + ")"
+
+        _, column, operator, value = node
+        column_sql = quote_identifier(column)
+        if operator == "is":
+            # PostgREST spells these as strings: is_("col", "null"), "is.true"
+            keyword = str(value).lower() if value is not None else "null"
+            if keyword in ("null", "true", "false"):
+                return f"{column_sql} IS {keyword.upper()}"
+            params.append(self._client.bind(self._table, column, value))
+            return f"{column_sql} = {self._client.placeholder(len(params))}"
+        if operator == "in":
+            if not value:
+                return "1 = 0"
+            marks = []
+            for item in value:
+                params.append(self._client.bind(self._table, column, item))
+                marks.append(self._client.placeholder(len(params)))
+            return f"{column_sql} IN ({', '.join(marks)})"
+        if operator not in OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {operator}")
+        if operator in ("like", "ilike"):
+            params.append(value.replace("*", "%"))
+        else:
+            params.append(self._client.bind(self._table, column, value))
+        sql_operator = self._client.operator(OPERATORS[operator])
+        return f"{column_sql} {sql_operator} {self._client.placeholder(len(params))}"
+
+    def _where(self, params: List) -> str:
+        if not self._filters:
+            return ""
+        return " WHERE " + " AND ".join(self._compile_node(f, params) for f in self._filters)
+
+    def _select_list(self) -> str:
+        if self._columns.strip() == "*":
+            return "*"
+        return ", ".join(quote_identifier(c.strip()) for c in self._columns.split(",") if c.strip())
+
+    def _compile_select(self) -> Tuple[str, List]:
+        params: List = []
+        sql = f"SELECT {self._select_list()} FROM {quote_identifier(self._table)}{self._where(params)}"
+        if self._order:
+            sql += " ORDER BY " + ", ".join(
+                f"{quote_identifier(c)} {'DESC' if desc else 'ASC'}" for c, desc in self._order
+            )
+        if self._limit is not None:
+            sql += f" LIMIT {int(self._limit)}"
+        if self._offset is not None:
+            sql += f" OFFSET {int(self._offset)}"
+        return sql, params
+
+    def _compile_count(self) -> Tuple[str, List]:
+        params: List = []
+        return f"SELECT COUNT(*) AS count FROM {quote_identifier(self._table)}{self._where(params)}", params
+
+    def _returning_clause(self) -> str:
+        return " RETURNING *" if self._returning else ""
+
+    def _compile_insert(self, row: Dict, supplied: List[str]) -> Tuple[str, List]:
+        columns = list(row.keys())
+        params = [self._client.bind(self._table, c, row[c]) for c in columns]
+        marks = ", ".join(self._client.placeholder(i) for i in range(1, len(columns) + 1))
+        sql = (
+            f"INSERT INTO {quote_identifier(self._table)} "
+            f"({', '.join(quote_identifier(c) for c in columns)}) VALUES ({marks})"
+        )
+        if self._on_conflict:
+            target = ", ".join(quote_identifier(c) for c in self._on_conflict)
+            # Only the caller's columns are updated, never backend-filled defaults (id, created_at)
+            assignments = [f"{quote_identifier(c)} = EXCLUDED.{quote_identifier(c)}"
+                           for c in supplied if c not in self._on_conflict]
+            if self._ignore_duplicates or not assignments:
+                sql += f" ON CONFLICT ({target}) DO NOTHING"
+            else:
+                sql += f" ON CONFLICT ({target}) DO UPDATE SET {', '.join(assignments)}"
+        return sql + self._returning_clause(), params
+
+    def _compile_update(self) -> Tuple[str, List]:
+        params: List = []
+        assignments = []
+        for column, value in self._payload.items():
+            params.append(self._client.bind(self._table, column, value))
+            assignments.append(f"{quote_identifier(column)} = {self._client.placeholder(len(params))}")
+        sql = f"UPDATE {quote_identifier(self._table)} SET {', '.join(assignments)}"
+        return sql + self._where(params) + self._returning_clause(), params
+
+    def _compile_delete(self) -> Tuple[str, List]:
+        params: List = []
+        sql = f"DELETE FROM {quote_identifier(self._table)}{self._where(params)}"
+        return sql + self._returning_clause(), params
+
+    def statements(self) -> List[Tuple[str, List]]:
+        """Compile the query into the (sql, params) statements to run"""
+        if self._action == "select":
+            return [self._compile_select()]
+        if self._action == "insert":
+            rows = self._payload if isinstance(self._payload, list) else [self._payload]
+            return [self._compile_insert(self._client.prepare_row(self._table, row), list(row)) for row in rows]
+        if self._action == "update":
+            return [self._compile_update()]
+        return [self._compile_delete()]
+
+    def execute(self) -> QueryResponse:
+        data = self._client.run(self.statements())
+        count = None
+        if self._count:
+            count = self._client.run([self._compile_count()])[0]["count"]
+        return QueryResponse(data, count)
@@ -0,0 +1,132 @@
+"""
+Sync Service - incremental change feed over the faculty data tables
+
+Rows carry a database-maintained updated_at and deletes leave a
+tombstone in deleted_rows (see supabase_schema.sql). A sync run pages
+through everything changed after a watermark with keyset pagination on
+(updated_at, id); the opaque cursor pins the upper bound of the run so
+every page sees the same window. When has_more is false the client
+stores the returned watermark as `since` for the next run. The feed
+only ever contains the requesting admin's tenant.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from config import SYNC_PAGE_SIZE, SYNC_SAFETY_LAG_SECONDS
+from database import for_tenant
+
+# Synced table -> selected columns (never expose password hashes)
+SYNC_TABLES = {
+    "faculty_users": "id, tenant_id, name, email, employee_id, phone, is_active, created_at, updated_at",
+    "faculty_profiles": "*",
+    "previous_work": "*",
+    "courses_taught": "*",
+    "publications": "*",
+    "book_publications": "*",
+    "awards": "*",
+    "ict_creations": "*",
+    "research_guidance": "*",
+    "pg_dissertations": "*",
+    "research_projects": "*",
+    "patents": "*",
+    "conferences": "*",
+    "seminars": "*",
+    "lectures": "*",
+    "other_details": "*",
+    "memberships": "*",
+}
+
+# Tombstones are paged like a table, keyed on deleted_at
+TOMBSTONES = "deleted_rows"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(state: Dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """Decode a cursor, validating every value that ends up in a filter"""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        datetime.fromisoformat(state["until"])
+        if state["since"] is not None:
+            datetime.fromisoformat(state["since"])
+        for table, (last_time, last_id) in state["positions"].items():
+            if table not in SYNC_TABLES and table != TOMBSTONES:
+                raise ValueError(table)
+            datetime.fromisoformat(last_time)
+            uuid.UUID(last_id)
+        if not isinstance(state["done"], list):
+            raise ValueError("done")
+        return state
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise InvalidCursor("Invalid sync cursor")
+
+
+def _page(tenant_id: str, table: str, columns: str, time_column: str, since: Optional[str], until: str,
+          position: Optional[List[str]], limit: int) -> List[Dict]:
+    """One keyset page of a tenant's rows with since < time_column <= until, after position"""
+    query = for_tenant(tenant_id).table(table).select(columns).lte(time_column, until)
+    if position:
+        last_time, last_id = position
+        query = query.or_(f"{time_column}.gt.{last_time},and({time_column}.eq.{last_time},id.gt.{last_id})")
+    elif since:
+        query = query.gt(time_column, since)
+    return query.order(time_column).order("id").limit(limit + 1).execute().data
+
+
+def get_changes(tenant_id: str, since: Optional[str] = None, cursor: Optional[str] = None,
+                limit: int = SYNC_PAGE_SIZE) -> Dict:
+    """
+    Fetch one page of a tenant's change feed
+
+    Args:
+        tenant_id: Tenant whose changes are returned
+        since: Watermark from the previous run (None for a full snapshot)
+        cursor: Cursor from the previous page of this run
+        limit: Maximum rows per table in this page
+
+    Returns:
+        Changed rows per table, tombstones, has_more, and either the
+        cursor for the next page or the watermark for the next run
+    """
+    if cursor:
+        state = decode_cursor(cursor)
+    else:
+        until = datetime.now(timezone.utc) - timedelta(seconds=SYNC_SAFETY_LAG_SECONDS)
+        state = {"since": since, "until": until.isoformat(), "positions": {}, "done": []}
+
+    sources = [(table, columns, "updated_at") for table, columns in SYNC_TABLES.items()]
+    sources.append((TOMBSTONES, "*", "deleted_at"))
+
+    changes = {}
+    for table, columns, time_column in sources:
+        if table in state["done"]:
+            continue
+        rows = _page(tenant_id, table, columns, time_column, state["since"], state["until"],
+                     state["positions"].get(table), limit)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            state["positions"][table] = [rows[-1][time_column], rows[-1]["id"]]
+        else:
+            state["positions"].pop(table, None)
+            state["done"].append(table)
+        if rows:
+            changes[table] = rows
+
+    deleted = changes.pop(TOMBSTONES, [])
+    has_more = len(state["done"]) < len(sources)
+    return {
+        "changes": changes,
+        "deleted": deleted,
+        "has_more": has_more,
+        "cursor": encode_cursor(state) if has_more else None,
+        "watermark": None if has_more else state["until"]
+    }
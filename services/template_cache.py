@@ -0,0 +1,112 @@
+"""
+Template cache - pre-rendered page shells served with strong ETags
+
+The HTML templates take no per-request context, so each page is rendered
+once, kept in memory together with gzip/brotli copies and answered with
+304 Not Modified when the client already has the current version.
+"""
+import gzip
+import hashlib
+import threading
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.templating import Jinja2Templates
+
+from services.asset_pipeline import accepted_encodings
+
+# Page shells that may be served through /templates/{name}
+KNOWN_TEMPLATES = (
+    "login.html",
+    "admin_dashboard.html",
+    "faculty_dashboard.html",
+    "enter.html",
+    "add_faculty.html",
+)
+
+# Pages link fingerprinted assets, so browsers must revalidate the shell
+PAGE_CACHE_CONTROL = "no-cache"
+
+
+class RenderedPage:
+    """One rendered template with its compressed variants and ETags"""
+
+    __slots__ = ("body", "variants", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        digest = hashlib.sha256(body).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        # encoding -> (compressed body, representation-specific strong ETag)
+        self.variants: Dict[str, tuple] = {
+            "gzip": (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gz"'),
+        }
+        try:
+            import brotli
+        except ImportError:
+            return
+        self.variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+    def etags(self) -> set:
+        return {self.etag} | {etag for _, etag in self.variants.values()}
+
+
+class TemplateCache:
+    """Renders whitelisted templates once and serves the cached bytes"""
+
+    def __init__(self, templates: Jinja2Templates, hot_reload: bool = False):
+        self._templates = templates
+        self._hot_reload = hot_reload
+        self._pages: Dict[str, RenderedPage] = {}
+        self._lock = threading.Lock()
+
+    def _render(self, name: str) -> RenderedPage:
+        html = self._templates.get_template(name).render()
+        return RenderedPage(html.encode("utf-8"))
+
+    def get(self, name: str) -> Optional[RenderedPage]:
+        """Return the rendered page, rendering it on first use"""
+        if name not in KNOWN_TEMPLATES:
+            return None
+        if self._hot_reload:
+            return self._render(name)
+
+        page = self._pages.get(name)
+        if page is None:
+            with self._lock:
+                page = self._pages.get(name)
+                if page is None:
+                    page = self._pages[name] = self._render(name)
+        return page
+
+    def warm(self):
+        """Render every known template ahead of the first request"""
+        for name in KNOWN_TEMPLATES:
+            self.get(name)
+
+    def response(self, request: Request, name: str) -> Response:
+        """Serve a cached page, honouring If-None-Match and Accept-Encoding"""
+        page = self.get(name)
+        if page is None:
+            return HTMLResponse(content="Template not found", status_code=404)
+
+        if_none_match = request.headers.get("if-none-match", "")
+        matched = {tag.strip() for tag in if_none_match.split(",")} & page.etags()
+        if matched:
+            return Response(status_code=304, headers={
+                "ETag": matched.pop(),
+                "Cache-Control": PAGE_CACHE_CONTROL,
+                "Vary": "Accept-Encoding"
+            })
+
+        headers = {"Cache-Control": PAGE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+        accepted = accepted_encodings(request.headers)
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in page.variants:
+                body, etag = page.variants[encoding]
+                headers.update({"ETag": etag, "Content-Encoding": encoding})
+                return HTMLResponse(content=body, headers=headers)
+
+        headers["ETag"] = page.etag
+        return HTMLResponse(content=page.body, headers=headers)
@@ -0,0 +1,184 @@
+"""
+Token Service - rotating refresh tokens stored hashed in refresh_tokens
+
+Each login starts a token family. Refreshing atomically revokes the
+presented token, checks that the account is still active and issues its
+successor in the same family, so a refresh costs one indexed UPDATE on
+token_hash, one primary-key SELECT and one INSERT and no password
+hashing. Presenting an already rotated token means it leaked; the whole
+family is revoked and the user has to log in again. So is a deactivated
+or deleted account's family, at its next refresh.
+
+Tabs of one browser share a refresh token and tend to refresh at the same
+moment. Within REFRESH_REUSE_GRACE_SECONDS of a rotation the old token is
+therefore answered with the successor it was rotated to (kept that long
+in the shared cache) rather than treated as a theft.
+"""
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from config import REFRESH_REUSE_GRACE_SECONDS, REFRESH_TOKEN_EXPIRE_DAYS
+from database import supabase
+from services import shared_cache
+
+# "rotated:<token_hash>" -> family_id of refresh tokens already rotated or
+# revoked by any worker, kept until the token would have expired
+ROTATED_PREFIX = "rotated:"
+# "successor:<token_hash>" -> the session and refresh token a token was
+# just rotated to ({} while the successor is being issued), for the grace window
+SUCCESSOR_PREFIX = "successor:"
+# Successors followed when the successor was itself rotated within the window
+MAX_SUCCESSOR_HOPS = 3
+
+# Session user_type -> table of the account (and its is_active flag)
+USER_TABLES = {"admin": "admins", "faculty": "faculty_users"}
+
+
+def hash_token(token: str) -> str:
+    """SHA-256 hex digest stored instead of the raw refresh token"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _remember_revoked(token_hash: str, family_id: str):
+    shared_cache.set(ROTATED_PREFIX + token_hash, family_id, REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def issue_refresh_token(user: Dict, family_id: Optional[str] = None) -> str:
+    """
+    Create and store a new refresh token
+
+    Args:
+        user: Session claims (user_id, user_type, email, name, employee_id, tenant_id)
+        family_id: Token family to continue; a new family when omitted
+
+    Returns:
+        Raw refresh token (only its hash is stored)
+    """
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    supabase.table("refresh_tokens").insert({
+        "user_id": user["user_id"],
+        "user_type": user["user_type"],
+        "email": user["email"],
+        "name": user["name"],
+        "employee_id": user.get("employee_id"),
+        "tenant_id": user["tenant_id"],
+        "family_id": family_id or str(uuid.uuid4()),
+        "token_hash": hash_token(token),
+        "expires_at": expires_at.isoformat()
+    }, returning="minimal").execute()
+    return token
+
+
+def is_active(user_type: str, user_id: str) -> bool:
+    """Whether the account still exists and is not deactivated (as login checks it)"""
+    table = USER_TABLES.get(user_type)
+    if table is None:
+        return False
+    result = supabase.table(table).select("is_active").eq("id", user_id).execute()
+    return bool(result.data) and bool(result.data[0].get("is_active", True))
+
+
+def _recent_successor(token_hash: str) -> Optional[Dict]:
+    """
+    The live successor of a token rotated within the grace window
+
+    Returns:
+        None if the token was not rotated just now; {} while its successor
+        is being issued or once it was revoked (logout, detected reuse);
+        otherwise the newest session of the chain
+    """
+    session = shared_cache.get(SUCCESSOR_PREFIX + token_hash)
+    for _ in range(MAX_SUCCESSOR_HOPS):
+        if not session:
+            break
+        newer = shared_cache.get(SUCCESSOR_PREFIX + hash_token(session["refresh_token"]))
+        if not newer:
+            break
+        session = newer
+    if session:
+        live = supabase.table("refresh_tokens").select("id").eq(
+            "token_hash", hash_token(session["refresh_token"])).is_("revoked_at", "null").execute()
+        if not live.data:
+            return {}
+    return session
+
+
+def revoke_family(family_id: str):
+    """Revoke every live token of a family (logout or detected reuse)"""
+    supabase.table("refresh_tokens").update({
+        "revoked_at": datetime.now(timezone.utc).isoformat()
+    }, returning="minimal").eq("family_id", family_id).is_("revoked_at", "null").execute()
+
+
+def rotate_refresh_token(token: str) -> Optional[Dict]:
+    """
+    Consume a refresh token and issue its successor
+
+    Args:
+        token: Raw refresh token presented by the client
+
+    Returns:
+        Stored session claims plus "refresh_token" (the successor),
+        or None if the token is unknown, expired or already used, or the
+        account was deactivated since login
+    """
+    token_hash = hash_token(token)
+    successor = _recent_successor(token_hash)
+    if successor is not None:
+        # Rotated a moment ago by another tab or request: not a theft
+        return successor or None
+    family_id = shared_cache.get(ROTATED_PREFIX + token_hash)
+    if family_id:
+        revoke_family(family_id)
+        return None
+
+    # Revoke-and-return in one statement so concurrent refreshes cannot both win
+    result = supabase.table("refresh_tokens").update({
+        "revoked_at": datetime.now(timezone.utc).isoformat()
+    }).eq("token_hash", token_hash).is_("revoked_at", "null").execute()
+
+    if not result.data:
+        # Unknown token, or a rotated one replayed: revoke its family if it exists
+        existing = supabase.table("refresh_tokens").select("family_id, revoked_at").eq(
+            "token_hash", token_hash).execute()
+        if existing.data:
+            revoked_at = existing.data[0]["revoked_at"]
+            grace_start = datetime.now(timezone.utc) - timedelta(seconds=REFRESH_REUSE_GRACE_SECONDS)
+            if revoked_at and _parse_timestamp(revoked_at) > grace_start:
+                # Lost the race to a concurrent refresh of the same token
+                return _recent_successor(token_hash) or None
+            _remember_revoked(token_hash, existing.data[0]["family_id"])
+            revoke_family(existing.data[0]["family_id"])
+        return None
+
+    row = result.data[0]
+    shared_cache.set(SUCCESSOR_PREFIX + token_hash, {}, REFRESH_REUSE_GRACE_SECONDS)
+    _remember_revoked(token_hash, row["family_id"])
+    if _parse_timestamp(row["expires_at"]) <= datetime.now(timezone.utc):
+        return None
+    if not is_active(row["user_type"], row["user_id"]):
+        revoke_family(row["family_id"])
+        return None
+
+    session = {key: row[key] for key in ("user_id", "user_type", "email", "name", "employee_id", "tenant_id")}
+    session["refresh_token"] = issue_refresh_token(session, row["family_id"])
+    shared_cache.set(SUCCESSOR_PREFIX + token_hash, session, REFRESH_REUSE_GRACE_SECONDS)
+    return session
+
+
+def revoke_refresh_token(token: str):
+    """Revoke the family of a refresh token (logout)"""
+    token_hash = hash_token(token)
+    result = supabase.table("refresh_tokens").select("family_id").eq("token_hash", token_hash).execute()
+    if result.data:
+        _remember_revoked(token_hash, result.data[0]["family_id"])
+        revoke_family(result.data[0]["family_id"])
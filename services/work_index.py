@@ -0,0 +1,358 @@
+"""
+Work Index Service - de-duplication of co-authored publications
+
+Each co-author enters a shared paper separately, so raw row counts of
+publications, conferences and book_publications overstate the number of
+distinct works. This index groups entries of the same work without
+comparing every pair:
+
+- exact keys: DOI (from the URL), normalized URL and normalized title
+  (case-folded, accents and punctuation stripped) go into hash buckets;
+- near duplicates: a MinHash signature of the title's character
+  4-grams is split into LSH bands, so titles that differ by a typo or a
+  subtitle land in a shared bucket and are confirmed by the estimated
+  similarity (DEDUP_SIMILARITY).
+
+Title matches never put two different ISSN/ISBNs in one group, so two
+different papers that happen to share a title in different venues are
+not merged, and a shared URL is ignored when the titles clearly differ
+(a journal home page is not a paper). Entries linked by any match form
+a group. Buckets are per tenant and table, so entries of different
+institutions are never compared. The index is an in-memory replica per
+worker, updated incrementally from the updated_at change feed (see
+services/replica.py); its first load also reads the archived academic
+years (services/archive_service.py).
+"""
+import hashlib
+import os
+import re
+import struct
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import DEDUP_SIMILARITY, WORK_INDEX_POLL_SECONDS, WORK_INDEX_MAX_STALENESS_SECONDS
+from services import archive_service
+from services.replica import PolledReplica
+
+# Table -> (title column, identifier column, URL column or None)
+WORK_TABLES = {
+    "publications": ("title", "issn_isbn", "url"),
+    "conferences": ("paper_title", "issn_isbn", None),
+    "book_publications": ("chapter_book_name", "issn_isbn", "url"),
+}
+
+# MinHash: NUM_PERM values, LSH_BANDS bands of NUM_PERM // LSH_BANDS rows.
+# 8 bands of 4 make titles with ~0.6 similarity candidates; the signature
+# then confirms DEDUP_SIMILARITY.
+NUM_PERM = 32
+LSH_BANDS = 8
+SHINGLE_SIZE = 4
+# Titles shorter than this (e.g. "Editorial") only match on DOI/URL
+MIN_TITLE_LENGTH = 12
+# URL, title and LSH buckets larger than this are too generic to compare pairwise
+MAX_BUCKET_SIZE = 64
+# Link kinds, strongest first
+MATCH_KINDS = ("doi", "url", "title", "similar")
+# A shared URL does not link entries whose titles are less similar than this
+DIFFERENT_TITLE_SIMILARITY = 0.3
+
+_DOI_PATTERN = re.compile(r"10\.\d{4,9}/[^\s?#]+", re.I)
+_NON_WORD = re.compile(r"[\W_]+")
+_UNPACK = struct.Struct(f"<{NUM_PERM // 2}I").unpack
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """Case-folded title without accents, punctuation or repeated spaces"""
+    if not title:
+        return ""
+    text = unicodedata.normalize("NFKD", title.casefold())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def normalize_identifier(value: Optional[str]) -> str:
+    """ISSN/ISBN reduced to digits and X ("978-0-12 345" -> "978012345")"""
+    return re.sub(r"[^0-9X]", "", (value or "").upper())
+
+
+def doi_and_url(url: Optional[str]) -> Tuple[str, str]:
+    """(DOI, URL without scheme, www. and trailing slash), either may be empty"""
+    if not url:
+        return "", ""
+    url = url.strip()
+    match = _DOI_PATTERN.search(url)
+    doi = match.group(0).rstrip(".").lower() if match else ""
+    bare = re.sub(r"^[a-z]+://(www\.)?", "", url, flags=re.I).rstrip("/")
+    return doi, bare.lower()
+
+
+def minhash(title_key: str) -> Tuple[int, ...]:
+    """MinHash signature of a normalized title's character shingles"""
+    text = f" {title_key} "
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    # One 64-byte BLAKE2 digest gives 16 hash functions; two salts give 32
+    columns = []
+    for salt in (b"a", b"b"):
+        rows = [_UNPACK(hashlib.blake2b(shingle.encode(), digest_size=64, salt=salt).digest())
+                for shingle in shingles]
+        columns.extend(min(column) for column in zip(*rows))
+    return tuple(columns)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+class WorkEntry:
+    """One row of a work table with its normalized keys"""
+
+    __slots__ = ("id", "table", "tenant_id", "user_id", "academic_year", "title", "title_key",
+                 "identifier", "doi", "url", "signature")
+
+    def __init__(self, table: str, row: Dict):
+        title_column, identifier_column, url_column = WORK_TABLES[table]
+        self.id = row["id"]
+        self.table = table
+        self.tenant_id = row["tenant_id"]
+        self.user_id = row.get("user_id")
+        self.academic_year = row.get("academic_year")
+        self.title = row.get(title_column)
+        self.title_key = normalize_title(self.title)
+        self.identifier = normalize_identifier(row.get(identifier_column))
+        self.doi, self.url = doi_and_url(row.get(url_column) if url_column else None)
+        long_title = len(self.title_key) >= MIN_TITLE_LENGTH
+        self.signature = minhash(self.title_key) if long_title else None
+
+    def keys(self) -> List[Tuple[Tuple[str, str], str, str]]:
+        """Exact-match buckets of this entry: ((tenant, table), kind, value)"""
+        partition = (self.tenant_id, self.table)
+        keys = []
+        if self.doi:
+            keys.append((partition, "doi", self.doi))
+        if self.url:
+            keys.append((partition, "url", self.url))
+        if self.signature is not None:
+            keys.append((partition, "title", self.title_key))
+        return keys
+
+    def bands(self) -> List[Tuple[Tuple[str, str], int, Tuple[int, ...]]]:
+        if self.signature is None:
+            return []
+        partition = (self.tenant_id, self.table)
+        rows = NUM_PERM // LSH_BANDS
+        return [(partition, band, self.signature[band * rows:(band + 1) * rows]) for band in range(LSH_BANDS)]
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "user_id": self.user_id, "academic_year": self.academic_year, "title": self.title}
+
+
+def _titles_differ(a: WorkEntry, b: WorkEntry) -> bool:
+    """Clearly different titles, e.g. two papers linking the same journal home page"""
+    return (a.signature is not None and b.signature is not None
+            and similarity(a.signature, b.signature) < DIFFERENT_TITLE_SIMILARITY)
+
+
+class _UnionFind:
+    """Groups of entries, each remembering the ISSN/ISBN its title matches are held to"""
+
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+        self.identifier: Dict[str, str] = {}
+
+    def find(self, item: str) -> str:
+        root = self.parent.setdefault(item, item)
+        while root != self.parent[root]:
+            root = self.parent[root]
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: WorkEntry, b: WorkEntry, check_identifier: bool) -> bool:
+        """Merge the groups of a and b; title matches never join two different ISSN/ISBNs"""
+        root_a, root_b = self.find(a.id), self.find(b.id)
+        if root_a == root_b:
+            return True
+        identifier_a = self.identifier.get(root_a, a.identifier)
+        identifier_b = self.identifier.get(root_b, b.identifier)
+        if check_identifier and identifier_a and identifier_b and identifier_a != identifier_b:
+            return False
+        self.parent[root_b] = root_a
+        self.identifier[root_a] = identifier_a or identifier_b
+        return True
+
+
+class WorkIndex(PolledReplica):
+    """Per-process de-duplication index over the work tables"""
+
+    TABLES = {table: "*" for table in WORK_TABLES}
+
+    def __init__(self, poll_seconds: float = WORK_INDEX_POLL_SECONDS,
+                 max_staleness: float = WORK_INDEX_MAX_STALENESS_SECONDS,
+                 threshold: float = DEDUP_SIMILARITY):
+        self.threshold = threshold
+        super().__init__(poll_seconds, max_staleness)
+
+    def _clear(self):
+        self._entries: Dict[str, WorkEntry] = {}
+        self._buckets: Dict[tuple, Set[str]] = defaultdict(set)
+        # Confirmed matches, kept up to date on every insert: id -> {other id: kind}
+        self._links: Dict[str, Dict[str, str]] = defaultdict(dict)
+        # Computed on demand from the links: entry id -> group root, root -> match kinds
+        self._groups: Optional[Dict[str, str]] = None
+        self._matches: Dict[str, Set[str]] = {}
+
+    def _fetch(self, table: str, columns: str, since: Optional[str]) -> List[Dict]:
+        rows = super()._fetch(table, columns, since)
+        # Archived years never change, so only the full load reads them
+        return rows if since else archive_service.merge_archived(table, rows)
+
+    def _linked(self, kind: str, a: WorkEntry, b: WorkEntry) -> bool:
+        """Whether two entries sharing a bucket of this kind are the same work"""
+        if kind == "doi":
+            return True
+        if kind == "url":
+            return not _titles_differ(a, b)
+        if a.identifier and b.identifier and a.identifier != b.identifier:
+            return False
+        return kind == "title" or similarity(a.signature, b.signature) >= self.threshold
+
+    def _index(self, entry: WorkEntry):
+        """Bucket a new entry and link it to the matching entries already there"""
+        links = self._links[entry.id]
+        for key in entry.keys() + entry.bands():
+            bucket = self._buckets[key]
+            # Exact keys are (partition, kind, value), LSH bands (partition, band number, values)
+            kind = key[1] if isinstance(key[1], str) else "similar"
+            if kind == "doi" or len(bucket) < MAX_BUCKET_SIZE:
+                for other_id in bucket:
+                    # Keep the strongest kind when several keys link the same pair
+                    current = links.get(other_id)
+                    if current is not None and MATCH_KINDS.index(current) <= MATCH_KINDS.index(kind):
+                        continue
+                    if self._linked(kind, entry, self._entries[other_id]):
+                        links[other_id] = self._links[other_id][entry.id] = kind
+            bucket.add(entry.id)
+
+    def _unindex(self, entry: WorkEntry):
+        for key in entry.keys() + entry.bands():
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry.id)
+                if not bucket:
+                    del self._buckets[key]
+        for other_id in self._links.pop(entry.id, {}):
+            self._links[other_id].pop(entry.id, None)
+
+    def _apply(self, table: str, rows: List[Dict]):
+        for row in rows:
+            old = self._entries.pop(row["id"], None)
+            if old is not None:
+                self._unindex(old)
+            entry = WorkEntry(table, row)
+            self._index(entry)
+            self._entries[entry.id] = entry
+
+    def _apply_tombstone(self, tombstone: Dict):
+        entry = self._entries.pop(tombstone["row_id"], None)
+        if entry is not None:
+            self._unindex(entry)
+
+    def _applied(self):
+        self._groups = None
+
+    def _build_groups(self):
+        """Union the confirmed links, identifier-backed kinds first"""
+        edges = {kind: [] for kind in MATCH_KINDS}
+        for entry_id, links in self._links.items():
+            for other_id, kind in links.items():
+                if entry_id < other_id:
+                    edges[kind].append((self._entries[entry_id], self._entries[other_id]))
+
+        # Title matches are then checked against the ISSN/ISBN of whole groups
+        groups = _UnionFind()
+        linked = []
+        for kind, pairs in edges.items():
+            for a, b in sorted(pairs, key=lambda pair: (pair[0].id, pair[1].id)):
+                if groups.union(a, b, check_identifier=kind in ("title", "similar")):
+                    linked.append((a.id, kind))
+        matches = defaultdict(set)
+        for entry_id, kind in linked:
+            matches[groups.find(entry_id)].add(kind)
+        self._groups = {entry_id: groups.find(entry_id) for entry_id in self._entries}
+        self._matches = dict(matches)
+
+    def _grouped(self) -> Dict[str, str]:
+        self._ensure_fresh()
+        with self._lock:
+            if self._groups is None:
+                self._build_groups()
+            return self._groups
+
+    def _select(self, tenant_id: str, table: str, academic_year: Optional[str],
+                user_ids: Optional[Set[str]]) -> List[WorkEntry]:
+        return [entry for entry in self._entries.values()
+                if entry.table == table and entry.tenant_id == tenant_id
+                and (not academic_year or entry.academic_year == academic_year)
+                and (user_ids is None or entry.user_id in user_ids)]
+
+    def unique_counts(self, tenant_id: str, academic_year: Optional[str] = None,
+                      user_ids: Optional[Set[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Entry and distinct-work counts per work table
+
+        Args:
+            tenant_id: Tenant whose entries are counted
+            academic_year: Only entries of this year
+            user_ids: Only entries of these faculty (e.g. one department)
+
+        Returns:
+            {table: {"entries": n, "unique_works": k}}
+        """
+        groups = self._grouped()
+        with self._lock:
+            counts = {}
+            for table in WORK_TABLES:
+                entries = self._select(tenant_id, table, academic_year, user_ids)
+                counts[table] = {
+                    "entries": len(entries),
+                    "unique_works": len({groups[entry.id] for entry in entries})
+                }
+            return counts
+
+    def duplicate_groups(self, tenant_id: str, table: Optional[str] = None, academic_year: Optional[str] = None,
+                         user_ids: Optional[Set[str]] = None) -> List[Dict]:
+        """
+        Suspected duplicate groups (two or more entries) of one tenant, largest first
+
+        A group is listed when at least one entry passes the filters; all
+        of its entries are returned so the reviewer sees the whole work.
+        """
+        groups = self._grouped()
+        with self._lock:
+            members = defaultdict(list)
+            for entry_id, root in groups.items():
+                members[root].append(self._entries[entry_id])
+            result = []
+            for root, entries in members.items():
+                if len(entries) < 2 or entries[0].tenant_id != tenant_id or (table and entries[0].table != table):
+                    continue
+                if not any((not academic_year or entry.academic_year == academic_year)
+                           and (user_ids is None or entry.user_id in user_ids) for entry in entries):
+                    continue
+                entries.sort(key=lambda entry: (entry.academic_year or "", entry.id))
+                result.append({
+                    "table": entries[0].table,
+                    "title": entries[0].title,
+                    "match": sorted(self._matches.get(root, ())),
+                    "entries": [entry.to_dict() for entry in entries]
+                })
+        result.sort(key=lambda group: (-len(group["entries"]), group["title"] or ""))
+        return result
+
+
+# Global index (one per worker process)
+work_index = WorkIndex()
+# A forked worker starts empty with its own lock and poller
+os.register_at_fork(after_in_child=work_index._reset)
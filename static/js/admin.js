@@ -18,14 +18,8 @@ const message = document.getElementById('message');
 const messageText = message.querySelector('.message-text');
 const generateBtn = document.getElementById('generate-btn');
 
-// Check if admin is logged in
-const token = localStorage.getItem('access_token');
-const userType = localStorage.getItem('user_type');
-
-if (!token || userType !== 'admin') {
-    // Not logged in as admin, but allow form to work
-    console.log('Note: Running without admin authentication');
-}
+// Only a signed-in admin can create accounts (in their own institution)
+checkAuth('admin');
 
 form.addEventListener('submit', async function (event) {
     event.preventDefault();
@@ -45,12 +39,8 @@ form.addEventListener('submit', async function (event) {
     const API_URL = '/api/generate-password';
 
     try {
-        const response = await fetch(API_URL, {
+        const response = await authFetch(API_URL, {
             method: 'POST',
-            // Important: Set the header for JSON data
-            headers: {
-                'Content-Type': 'application/json'
-            },
             // Convert JavaScript object to JSON string
             body: JSON.stringify(data)
         });
@@ -1,5 +1,12 @@
 // Admin Dashboard JavaScript
 let dataLoaded = false;
+// Faculty shown in the details modal, refreshed when their data changes
+let openFacultyId = null;
+// Export id -> label of exports whose progress is shown
+const runningExports = new Map();
+// Other workers' faculty directories catch up within a poll, so list reloads wait briefly
+const LIST_RELOAD_DELAY_MS = 2500;
+let listReloadTimer = null;
 
 document.addEventListener('DOMContentLoaded', () => {
     // Check authentication
@@ -25,10 +32,60 @@ document.addEventListener('DOMContentLoaded', () => {
     // Add Faculty Form
     setupAddFacultyForm();
 
-    // Load initial data (only faculty list since departments/years are hardcoded)
-    loadFacultyList();
+    // Admin, filter options and faculty list in one round trip
+    loadBootstrap();
+
+    // Then apply changes as they happen instead of reloading
+    openEventStream({
+        'data.changed': onDataChanged,
+        'resync': searchFaculty,
+        'export.progress': onExportProgress,
+        'export.done': onExportDone,
+        'export.failed': onExportFailed
+    });
 });
 
+function onDataChanged(change) {
+    if (change.table === 'faculty_users' || change.table === 'faculty_profiles') {
+        clearTimeout(listReloadTimer);
+        listReloadTimer = setTimeout(searchFaculty, LIST_RELOAD_DELAY_MS);
+    }
+    if (change.user_id === openFacultyId) {
+        viewFacultyDetails(openFacultyId, true);
+    }
+}
+
+async function loadBootstrap() {
+    const tbody = document.getElementById('faculty-list');
+    tbody.innerHTML = '<tr><td colspan="6" class="px-6 py-8 text-center text-gray-400"><span class="loading"></span> Loading...</td></tr>';
+
+    try {
+        const response = await authFetch('/api/admin/bootstrap');
+        const data = await response.json();
+
+        document.getElementById('admin-name').textContent = `Welcome, ${data.user.name}`;
+        addSelectOptions('year-filter', data.academic_years);
+        addSelectOptions('dept-filter', data.departments);
+        addSelectOptions('designation-filter', data.designations);
+        renderFacultyList(data.faculty);
+    } catch (error) {
+        tbody.innerHTML = '<tr><td colspan="6" class="px-6 py-8 text-center text-red-400">Error loading data</td></tr>';
+    }
+}
+
+// Append values missing from a filter's predefined options
+function addSelectOptions(selectId, values) {
+    const select = document.getElementById(selectId);
+    const existing = new Set(Array.from(select.options).map(option => option.value));
+    (values || []).forEach(value => {
+        if (existing.has(value)) return;
+        const option = document.createElement('option');
+        option.value = value;
+        option.textContent = value;
+        select.appendChild(option);
+    });
+}
+
 function switchTab(tabId) {
     // Update buttons
     document.querySelectorAll('.tab-btn').forEach(btn => {
@@ -58,9 +115,8 @@ function setupAddFacultyForm() {
         const data = Object.fromEntries(formData.entries());
 
         try {
-            const response = await fetch('/api/generate-password', {
+            const response = await authFetch('/api/generate-password', {
                 method: 'POST',
-                headers: getAuthHeaders(),
                 body: JSON.stringify(data)
             });
 
@@ -101,14 +157,21 @@ async function loadFacultyList(search = '', dept = '', designation = '') {
         if (designation) params.append('designation', designation);
         if (params.toString()) url += '?' + params.toString();
 
-        const response = await fetch(url, {
-            headers: getAuthHeaders()
-        });
+        const response = await authFetch(url);
 
         const data = await response.json();
 
-        if (data.faculty && data.faculty.length > 0) {
-            tbody.innerHTML = data.faculty.map(f => `
+        renderFacultyList(data.faculty);
+    } catch (error) {
+        tbody.innerHTML = '<tr><td colspan="6" class="px-6 py-8 text-center text-red-400">Error loading data</td></tr>';
+    }
+}
+
+function renderFacultyList(faculty) {
+    const tbody = document.getElementById('faculty-list');
+
+    if (faculty && faculty.length > 0) {
+        tbody.innerHTML = faculty.map(f => `
                 <tr class="hover:bg-gray-700/50">
                     <td class="px-6 py-4 text-white font-medium">${f.name}</td>
                     <td class="px-6 py-4 text-gray-300">${f.email}</td>
@@ -121,38 +184,8 @@ async function loadFacultyList(search = '', dept = '', designation = '') {
                     </td>
                 </tr>
             `).join('');
-        } else {
-            tbody.innerHTML = '<tr><td colspan="6" class="px-6 py-8 text-center text-gray-400">No faculty found</td></tr>';
-        }
-    } catch (error) {
-        tbody.innerHTML = '<tr><td colspan="5" class="px-6 py-8 text-center text-red-400">Error loading data</td></tr>';
-    }
-}
-
-// loadDepartments and loadAcademicYears removed - using hardcoded values in HTML
-
-
-async function loadAcademicYears() {
-    try {
-        const response = await fetch('/api/admin/academic-years', {
-            headers: getAuthHeaders()
-        });
-        const data = await response.json();
-
-        const select = document.getElementById('year-filter');
-        // Clear existing options except first
-        while (select.options.length > 1) {
-            select.remove(1);
-        }
-
-        data.academic_years.forEach(year => {
-            const option = document.createElement('option');
-            option.value = year;
-            option.textContent = year;
-            select.appendChild(option);
-        });
-    } catch (error) {
-        console.error('Failed to load academic years:', error);
+    } else {
+        tbody.innerHTML = '<tr><td colspan="6" class="px-6 py-8 text-center text-gray-400">No faculty found</td></tr>';
     }
 }
 
@@ -163,22 +196,23 @@ function searchFaculty() {
     loadFacultyList(search, dept, designation);
 }
 
-async function viewFacultyDetails(facultyId) {
+async function viewFacultyDetails(facultyId, quiet = false) {
     const modal = document.getElementById('detail-modal');
     const content = document.getElementById('modal-content');
     const yearFilter = document.getElementById('year-filter').value;
 
+    openFacultyId = facultyId;
     modal.classList.remove('hidden');
     modal.classList.add('flex');
-    content.innerHTML = '<div class="text-center py-8"><span class="loading"></span> Loading details...</div>';
+    if (!quiet) {
+        content.innerHTML = '<div class="text-center py-8"><span class="loading"></span> Loading details...</div>';
+    }
 
     try {
         let url = `/api/admin/faculty/${facultyId}`;
         if (yearFilter) url += `?academic_year=${yearFilter}`;
 
-        const response = await fetch(url, {
-            headers: getAuthHeaders()
-        });
+        const response = await authFetch(url);
 
         const data = await response.json();
 
@@ -231,43 +265,94 @@ function renderSection(title, items, fields) {
 }
 
 function closeModal() {
+    openFacultyId = null;
     const modal = document.getElementById('detail-modal');
     modal.classList.add('hidden');
     modal.classList.remove('flex');
 }
 
-async function exportFacultyPDF(facultyId) {
-    const yearFilter = document.getElementById('year-filter').value;
-    let url = `/api/admin/export/faculty/${facultyId}/pdf`;
-    if (yearFilter) url += `?academic_year=${yearFilter}`;
+// Export with the current filters; progress arrives on the event stream under progressId
+async function runExport(path, params, label) {
+    const progressId = randomId();
+    const query = new URLSearchParams({ progress_id: progressId });
+    Object.entries(params).forEach(([key, value]) => {
+        if (value) query.append(key, value);
+    });
+
+    runningExports.set(progressId, label);
+    showExportProgress(`${label}: starting...`);
+    try {
+        await downloadFile(`${path}?${query}`, label);
+        showExportProgress(`${label}: downloaded`);
+    } catch (error) {
+        showExportProgress(`${label}: ${error.message}`, true);
+    } finally {
+        runningExports.delete(progressId);
+    }
+}
 
-    window.open(url + `&token=${localStorage.getItem('access_token')}`, '_blank');
+function showExportProgress(text, isError = false) {
+    const element = document.getElementById('export-progress');
+    element.textContent = text;
+    element.classList.toggle('text-red-400', isError);
+    element.classList.remove('hidden');
 }
 
-async function exportAllExcel() {
-    const yearFilter = document.getElementById('year-filter').value;
-    const deptFilter = document.getElementById('dept-filter').value;
-    const designationFilter = document.getElementById('designation-filter').value;
+const EXPORT_STAGES = {
+    loading: 'loading data',
+    counting: 'counting entries',
+    rendering: 'rendering',
+    exporting: 'exporting tables'
+};
+
+function onExportProgress(event) {
+    const label = runningExports.get(event.export_id);
+    if (!label) return;
+    let text = `${label}: ${EXPORT_STAGES[event.stage] || event.stage}`;
+    if (event.total) text += ` ${event.done}/${event.total}`;
+    if (event.rows !== undefined) text += `, ${event.rows} rows`;
+    if (event.pages !== undefined) text += `, ${event.pages} pages`;
+    showExportProgress(text);
+}
 
-    let url = '/api/admin/export/all/excel?';
-    if (yearFilter) url += `academic_year=${yearFilter}&`;
-    if (deptFilter) url += `department=${deptFilter}&`;
-    if (designationFilter) url += `designation=${designationFilter}&`;
+function onExportDone(event) {
+    const label = runningExports.get(event.export_id);
+    if (label) showExportProgress(`${label}: generated, downloading...`);
+}
 
-    window.open(url + `token=${localStorage.getItem('access_token')}`, '_blank');
+function onExportFailed(event) {
+    const label = runningExports.get(event.export_id);
+    if (label) showExportProgress(`${label}: ${event.detail}`, true);
 }
 
-async function exportAllPDF() {
-    const yearFilter = document.getElementById('year-filter').value;
-    const deptFilter = document.getElementById('dept-filter').value;
-    const designationFilter = document.getElementById('designation-filter').value;
+function exportFilters() {
+    return {
+        academic_year: document.getElementById('year-filter').value,
+        department: document.getElementById('dept-filter').value,
+        designation: document.getElementById('designation-filter').value
+    };
+}
+
+function exportFacultyPDF(facultyId) {
+    const { academic_year } = exportFilters();
+    runExport(`/api/admin/export/faculty/${facultyId}/pdf`, { academic_year }, 'Faculty PDF');
+}
 
-    let url = '/api/admin/export/all/pdf?';
-    if (yearFilter) url += `academic_year=${yearFilter}&`;
-    if (deptFilter) url += `department=${deptFilter}&`;
-    if (designationFilter) url += `designation=${designationFilter}&`;
+function exportAllExcel() {
+    runExport('/api/admin/export/all/excel', exportFilters(), 'Faculty summary (Excel)');
+}
 
-    window.open(url + `token=${localStorage.getItem('access_token')}`, '_blank');
+function exportAllPDF() {
+    runExport('/api/admin/export/all/pdf', exportFilters(), 'Faculty summary (PDF)');
+}
+
+function exportDepartmentBook() {
+    const { academic_year, department } = exportFilters();
+    if (!department) {
+        showExportProgress('Select a department for the faculty book', true);
+        return;
+    }
+    runExport('/api/admin/export/department/pdf', { academic_year, department }, `${department} faculty book`);
 }
 
 // Close modal on escape key
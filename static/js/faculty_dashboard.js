@@ -1,4 +1,17 @@
 // Faculty Dashboard JavaScript
+
+// Data currently rendered, so a change to one table refetches only that table
+let currentData = {};
+
+// Tables with their own list endpoint; other changes reload everything
+const TABLE_ENDPOINTS = {
+    publications: '/api/faculty/publications',
+    awards: '/api/faculty/awards',
+    research_projects: '/api/faculty/research-projects',
+    patents: '/api/faculty/patents',
+    conferences: '/api/faculty/conferences'
+};
+
 document.addEventListener('DOMContentLoaded', () => {
     // Check authentication
     if (!checkAuth('faculty')) return;
@@ -16,13 +29,39 @@ document.addEventListener('DOMContentLoaded', () => {
         });
     });
 
-    // Load data
-    loadMyData();
+    // User, year filter and all data in one round trip
+    loadBootstrap();
 
     // Setup quick add form
     setupQuickAddForm();
+
+    // Changes made in other tabs, devices or by imports
+    openEventStream({
+        'data.changed': onDataChanged,
+        'resync': loadMyData
+    });
 });
 
+async function onDataChanged(change) {
+    const endpoint = TABLE_ENDPOINTS[change.table];
+    if (!endpoint) {
+        loadMyData();
+        return;
+    }
+
+    const yearFilter = document.getElementById('data-year-filter').value;
+    const url = yearFilter ? `${endpoint}?academic_year=${encodeURIComponent(yearFilter)}` : endpoint;
+    try {
+        const response = await authFetch(url);
+        if (!response.ok) return;
+        const data = await response.json();
+        currentData[change.table] = data[change.table];
+        renderDataSections(currentData);
+    } catch (error) {
+        console.error('Failed to refresh data:', error);
+    }
+}
+
 function switchTab(tabId) {
     document.querySelectorAll('.tab-btn').forEach(btn => {
         btn.classList.toggle('active', btn.dataset.tab === tabId);
@@ -34,6 +73,36 @@ function switchTab(tabId) {
     document.getElementById(`${tabId}-tab`).classList.remove('hidden');
 }
 
+async function loadBootstrap() {
+    try {
+        const response = await authFetch('/api/faculty/bootstrap');
+        const data = await response.json();
+
+        document.getElementById('welcome-text').textContent = `Welcome, ${data.user.name}!`;
+        addYearOptions(data.academic_years);
+        currentData = data;
+        renderProfile(data.profile);
+        renderDataSections(data);
+    } catch (error) {
+        console.error('Failed to load data:', error);
+        document.getElementById('data-sections').innerHTML =
+            '<p class="text-red-400 text-center py-8">Error loading data. Please try again.</p>';
+    }
+}
+
+// Append academic years with data that the filter does not list yet
+function addYearOptions(years) {
+    const select = document.getElementById('data-year-filter');
+    const existing = new Set(Array.from(select.options).map(option => option.value));
+    (years || []).forEach(year => {
+        if (existing.has(year)) return;
+        const option = document.createElement('option');
+        option.value = year;
+        option.textContent = year;
+        select.appendChild(option);
+    });
+}
+
 async function loadMyData() {
     const yearFilter = document.getElementById('data-year-filter').value;
 
@@ -42,11 +111,10 @@ async function loadMyData() {
         let url = '/api/faculty/all-data';
         if (yearFilter) url += `?academic_year=${yearFilter}`;
 
-        const response = await fetch(url, {
-            headers: getAuthHeaders()
-        });
+        const response = await authFetch(url);
 
         const data = await response.json();
+        currentData = data;
 
         // Render profile
         renderProfile(data.profile);
@@ -122,8 +190,8 @@ function renderDataSections(data) {
                         </thead>
                         <tbody>
                             ${items.map((item, i) => `
-                                <tr>
-                                    <td>${i + 1}</td>
+                                <tr${item.archived ? ' class="archived"' : ''}>
+                                    <td>${i + 1}${item.archived ? ' <span class="archived-badge" title="Archived academic year (read-only)">archived</span>' : ''}</td>
                                     ${section.fields.map(f => `<td>${item[f] || '-'}</td>`).join('')}
                                 </tr>
                             `).join('')}
@@ -151,19 +219,25 @@ function formatFieldName(field) {
 function setupQuickAddForm() {
     const form = document.getElementById('quick-pub-form');
     const message = document.getElementById('pub-message');
+    // Kept across "Network error" retries of the same entry, so the server
+    // adds it once even if the first attempt did reach it
+    let idempotencyKey = null;
+    form.addEventListener('input', () => { idempotencyKey = null; });
 
     form.addEventListener('submit', async (e) => {
         e.preventDefault();
 
         const formData = new FormData(form);
         const data = Object.fromEntries(formData.entries());
+        idempotencyKey = idempotencyKey || randomId();
 
         try {
-            const response = await fetch('/api/faculty/publications', {
+            const response = await authFetch('/api/faculty/publications', {
                 method: 'POST',
-                headers: getAuthHeaders(),
+                headers: { 'Idempotency-Key': idempotencyKey },
                 body: JSON.stringify(data)
             });
+            idempotencyKey = null;
 
             const result = await response.json();
 
@@ -173,8 +247,8 @@ function setupQuickAddForm() {
                 message.classList.remove('hidden');
                 form.reset();
 
-                // Reload data
-                loadMyData();
+                // The list refreshes from the data.changed event; reload if live updates are unavailable
+                if (!window.EventSource) loadMyData();
 
                 setTimeout(() => message.classList.add('hidden'), 3000);
             } else {
@@ -196,14 +270,8 @@ function downloadMyPDF() {
     let url = '/api/faculty/export/my-pdf';
     if (yearFilter) url += `?academic_year=${yearFilter}`;
 
-    // Open download in new window with auth
-    const token = localStorage.getItem('access_token');
-
-    fetch(url, {
-        headers: {
-            'Authorization': `Bearer ${token}`
-        }
-    })
+    // Download with auth (refreshes the access token if needed)
+    authFetch(url)
         .then(response => response.blob())
         .then(blob => {
             const downloadUrl = window.URL.createObjectURL(blob);
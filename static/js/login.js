@@ -1,3 +1,198 @@
+// Shared auth helpers (also loaded by the dashboards)
+
+const DASHBOARDS = {
+    admin: '/templates/admin_dashboard.html',
+    faculty: '/templates/faculty_dashboard.html'
+};
+
+// Refresh the access token this many ms before it expires
+const REFRESH_MARGIN_MS = 60 * 1000;
+
+let refreshInFlight = null;
+
+function storeTokens(result) {
+    localStorage.setItem('access_token', result.access_token);
+    localStorage.setItem('refresh_token', result.refresh_token);
+    localStorage.setItem('access_expires_at', Date.now() + result.expires_in * 1000);
+    localStorage.setItem('user_type', result.user_type);
+    localStorage.setItem('user_id', result.user_id);
+    localStorage.setItem('user_name', result.name);
+}
+
+function clearTokens() {
+    ['access_token', 'refresh_token', 'access_expires_at', 'user_type', 'user_id', 'user_name']
+        .forEach(key => localStorage.removeItem(key));
+}
+
+function redirectToDashboard(userType) {
+    window.location.href = DASHBOARDS[userType] || '/';
+}
+
+function showMessage(text, type) {
+    const msg = document.createElement('div');
+    msg.className = `message login-message ${type}`;
+    msg.textContent = text;
+    document.querySelector('.container').appendChild(msg);
+}
+
+function checkAuth(requiredType) {
+    const hasSession = localStorage.getItem('access_token') || localStorage.getItem('refresh_token');
+    if (!hasSession || localStorage.getItem('user_type') !== requiredType) {
+        window.location.href = '/';
+        return false;
+    }
+    return true;
+}
+
+function getAuthHeaders() {
+    return {
+        'Content-Type': 'application/json',
+        'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+    };
+}
+
+// Exchange the refresh token for a new token pair; concurrent callers share one request.
+// Every tab uses the tokens in localStorage, so the exchange runs under a lock shared by
+// the tabs and is skipped when another tab rotated the token while this one waited.
+async function refreshAccessToken() {
+    if (!refreshInFlight) {
+        const seenRefreshToken = localStorage.getItem('refresh_token');
+        const exchange = () => exchangeRefreshToken(seenRefreshToken);
+        refreshInFlight = (navigator.locks ? navigator.locks.request('token-refresh', exchange) : exchange())
+            .finally(() => {
+                refreshInFlight = null;
+            });
+    }
+    return refreshInFlight;
+}
+
+async function exchangeRefreshToken(seenRefreshToken) {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) return false;
+    if (refreshToken !== seenRefreshToken) return true;
+
+    try {
+        const response = await fetch('/api/refresh', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken })
+        });
+        if (response.ok) {
+            storeTokens(await response.json());
+            return true;
+        }
+    } catch (error) {
+        return false;
+    }
+    // Without the lock (older browsers) another tab may have stored a new pair meanwhile
+    return localStorage.getItem('refresh_token') !== refreshToken;
+}
+
+// fetch() with the bearer token, refreshing it when it is about to expire or rejected
+async function authFetch(url, options = {}) {
+    const expiresAt = Number(localStorage.getItem('access_expires_at') || 0);
+    if (Date.now() > expiresAt - REFRESH_MARGIN_MS) {
+        await refreshAccessToken();
+    }
+
+    const send = () => fetch(url, {
+        ...options,
+        headers: { ...getAuthHeaders(), ...(options.headers || {}) }
+    });
+
+    let response = await send();
+    if (response.status === 401) {
+        if (await refreshAccessToken()) {
+            response = await send();
+        } else {
+            clearTokens();
+            window.location.href = '/';
+        }
+    }
+    return response;
+}
+
+// Live updates from /api/events: handlers maps event names to callbacks taking the parsed data.
+// EventSource cannot send headers, so the access token goes in the URL; the server ends the
+// stream with "reauth" when that token expires and we reconnect with a fresh one.
+function openEventStream(handlers) {
+    if (!window.EventSource) return;
+
+    let source = null;
+    let lastEventId = null;
+    let retryDelay = 1000;
+
+    const connect = async () => {
+        const expiresAt = Number(localStorage.getItem('access_expires_at') || 0);
+        if (Date.now() > expiresAt - REFRESH_MARGIN_MS && !(await refreshAccessToken())) return;
+
+        const params = new URLSearchParams({ token: localStorage.getItem('access_token') });
+        if (lastEventId) params.append('last_event_id', lastEventId);
+        source = new EventSource(`/api/events?${params}`);
+        source.onopen = () => { retryDelay = 1000; };
+        Object.entries(handlers).forEach(([name, handler]) => {
+            source.addEventListener(name, event => {
+                lastEventId = event.lastEventId || lastEventId;
+                handler(JSON.parse(event.data || '{}'));
+            });
+        });
+        source.addEventListener('reauth', reconnect);
+        // EventSource retries network errors itself; it gives up (CLOSED) on an HTTP error
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) reconnect();
+        };
+    };
+
+    const reconnect = () => {
+        source.close();
+        setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+    };
+
+    connect();
+}
+
+// Random id for idempotency keys and export progress; randomUUID needs a secure context
+function randomId() {
+    return window.crypto && crypto.randomUUID
+        ? crypto.randomUUID()
+        : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
+// Download an authenticated response as a file
+async function downloadFile(url, fallbackName) {
+    const response = await authFetch(url);
+    if (!response.ok) {
+        const error = await response.json().catch(() => ({}));
+        throw new Error(error.detail || `Download failed (${response.status})`);
+    }
+    const disposition = response.headers.get('Content-Disposition') || '';
+    const match = disposition.match(/filename="?([^";]+)"?/);
+    const blob = await response.blob();
+    const downloadUrl = window.URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = downloadUrl;
+    a.download = match ? match[1] : fallbackName;
+    document.body.appendChild(a);
+    a.click();
+    window.URL.revokeObjectURL(downloadUrl);
+    a.remove();
+}
+
+async function logout() {
+    try {
+        await fetch('/api/logout', {
+            method: 'POST',
+            headers: getAuthHeaders(),
+            body: JSON.stringify({ refresh_token: localStorage.getItem('refresh_token') })
+        });
+    } catch (error) {
+        console.error('Logout error:', error);
+    }
+    clearTokens();
+    window.location.href = '/';
+}
+
 document.addEventListener('DOMContentLoaded', () => {
     const form = document.getElementById('login-form');
 
@@ -6,8 +201,8 @@ document.addEventListener('DOMContentLoaded', () => {
 
     const loginBtn = document.getElementById('login-btn');
 
-    // Check if already logged in
-    const token = localStorage.getItem('access_token');
+    // Check if already logged in (an expired access token is refreshed on first use)
+    const token = localStorage.getItem('access_token') || localStorage.getItem('refresh_token');
     if (token) {
         const userType = localStorage.getItem('user_type');
         redirectToDashboard(userType);
@@ -35,11 +230,8 @@ document.addEventListener('DOMContentLoaded', () => {
             if (response.ok) {
                 const result = await response.json();
 
-                // Store token and user info
-                localStorage.setItem('access_token', result.access_token);
-                localStorage.setItem('user_type', result.user_type);
-                localStorage.setItem('user_id', result.user_id);
-                localStorage.setItem('user_name', result.name);
+                // Store tokens and user info
+                storeTokens(result);
 
                 showMessage('Login successful! Redirecting...', 'success');
 
@@ -62,4 +254,4 @@ document.addEventListener('DOMContentLoaded', () => {
             loginBtn.disabled = false;
         }
     });
-});
\ No newline at end of file
+});
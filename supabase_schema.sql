@@ -11,6 +11,7 @@ CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 -- ============================================
 CREATE TABLE admins (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
     name VARCHAR(255) NOT NULL,
@@ -24,10 +25,11 @@ CREATE TABLE admins (
 -- ============================================
 CREATE TABLE faculty_users (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     email VARCHAR(255) UNIQUE NOT NULL,
     password_hash VARCHAR(255) NOT NULL,
     name VARCHAR(255) NOT NULL,
-    employee_id VARCHAR(100) UNIQUE NOT NULL,
+    employee_id VARCHAR(100) NOT NULL,
     phone VARCHAR(20),
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -39,6 +41,7 @@ CREATE TABLE faculty_users (
 -- ============================================
 CREATE TABLE faculty_profiles (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID UNIQUE REFERENCES faculty_users(id) ON DELETE CASCADE,
     name_prefix VARCHAR(20),
     name VARCHAR(255),
@@ -58,12 +61,14 @@ CREATE TABLE faculty_profiles (
 -- ============================================
 CREATE TABLE previous_work (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     institution VARCHAR(255),
     position_held VARCHAR(255),
     from_year INTEGER,
     to_year INTEGER,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- ============================================
@@ -71,17 +76,20 @@ CREATE TABLE previous_work (
 -- ============================================
 CREATE TABLE courses_taught (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     course_name VARCHAR(255),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- ============================================
 -- 5. PUBLICATIONS (Research Papers in Journals)
 -- ============================================
 CREATE TABLE publications (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -91,14 +99,18 @@ CREATE TABLE publications (
     issn_isbn VARCHAR(100),
     url TEXT,
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE publications_default PARTITION OF publications DEFAULT;
 
 -- ============================================
 -- 6. BOOK PUBLICATIONS
 -- ============================================
 CREATE TABLE book_publications (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -108,14 +120,18 @@ CREATE TABLE book_publications (
     issn_isbn VARCHAR(100),
     url TEXT,
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE book_publications_default PARTITION OF book_publications DEFAULT;
 
 -- ============================================
 -- 7. AWARDS
 -- ============================================
 CREATE TABLE awards (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -124,14 +140,18 @@ CREATE TABLE awards (
     level VARCHAR(50),
     award_date DATE,
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE awards_default PARTITION OF awards DEFAULT;
 
 -- ============================================
 -- 8. ICT CREATIONS
 -- ============================================
 CREATE TABLE ict_creations (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -139,14 +159,18 @@ CREATE TABLE ict_creations (
     content TEXT,
     url TEXT,
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE ict_creations_default PARTITION OF ict_creations DEFAULT;
 
 -- ============================================
 -- 9. RESEARCH GUIDANCE
 -- ============================================
 CREATE TABLE research_guidance (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -154,27 +178,33 @@ CREATE TABLE research_guidance (
     thesis_submitted INTEGER,
     degree_awarded INTEGER,
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE research_guidance_default PARTITION OF research_guidance DEFAULT;
 
 -- ============================================
 -- 10. PG DISSERTATIONS
 -- ============================================
 CREATE TABLE pg_dissertations (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     student_name VARCHAR(255),
     usn VARCHAR(100),
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
 -- ============================================
 -- 11. RESEARCH PROJECTS
 -- ============================================
 CREATE TABLE research_projects (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -184,28 +214,36 @@ CREATE TABLE research_projects (
     investigator_type VARCHAR(100),
     grant_amount DECIMAL(15, 2),
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE research_projects_default PARTITION OF research_projects DEFAULT;
 
 -- ============================================
 -- 12. PATENTS
 -- ============================================
 CREATE TABLE patents (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
     title VARCHAR(500),
     patent_number VARCHAR(100),
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE patents_default PARTITION OF patents DEFAULT;
 
 -- ============================================
 -- 13. CONFERENCES
 -- ============================================
 CREATE TABLE conferences (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -214,14 +252,18 @@ CREATE TABLE conferences (
     conference_details TEXT,
     level VARCHAR(100),
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE conferences_default PARTITION OF conferences DEFAULT;
 
 -- ============================================
 -- 14. SEMINARS/WORKSHOPS
 -- ============================================
 CREATE TABLE seminars (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -229,14 +271,18 @@ CREATE TABLE seminars (
     details TEXT,
     degree_awarded VARCHAR(255),
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE seminars_default PARTITION OF seminars DEFAULT;
 
 -- ============================================
 -- 15. INVITED LECTURES
 -- ============================================
 CREATE TABLE lectures (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -244,14 +290,18 @@ CREATE TABLE lectures (
     lecture_date DATE,
     location VARCHAR(255),
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE lectures_default PARTITION OF lectures DEFAULT;
 
 -- ============================================
 -- 16. OTHER DETAILS
 -- ============================================
 CREATE TABLE other_details (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -259,14 +309,18 @@ CREATE TABLE other_details (
     detail_date DATE,
     location VARCHAR(255),
     file_url TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE other_details_default PARTITION OF other_details DEFAULT;
 
 -- ============================================
 -- 17. PROFESSIONAL MEMBERSHIPS
 -- ============================================
 CREATE TABLE memberships (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
     user_id UUID REFERENCES faculty_users(id) ON DELETE CASCADE,
     si_no INTEGER,
     academic_year VARCHAR(20) NOT NULL,
@@ -275,20 +329,442 @@ CREATE TABLE memberships (
     date_period VARCHAR(100),
     location VARCHAR(255),
     file_url TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, academic_year)
+) PARTITION BY LIST (academic_year);
+CREATE TABLE memberships_default PARTITION OF memberships DEFAULT;
+
+-- ============================================
+-- 18. REFRESH TOKENS (Rotating session tokens, stored hashed)
+-- ============================================
+CREATE TABLE refresh_tokens (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
+    user_id UUID NOT NULL,
+    user_type VARCHAR(20) NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    employee_id VARCHAR(100),
+    family_id UUID NOT NULL,
+    token_hash VARCHAR(64) UNIQUE NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    revoked_at TIMESTAMP WITH TIME ZONE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- ============================================
+-- 19. ACTIVITY ROLLUPS (Analytics, maintained by triggers)
+-- ============================================
+CREATE TABLE activity_rollups (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
+    user_id UUID NOT NULL,
+    academic_year VARCHAR(20) NOT NULL,
+    metric VARCHAR(50) NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    amount_sum DECIMAL(15, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- ============================================
+-- 20. DELETED ROWS (Tombstones for the sync change feed)
+-- ============================================
+CREATE TABLE deleted_rows (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
+    table_name VARCHAR(50) NOT NULL,
+    row_id UUID NOT NULL,
+    user_id UUID,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- ============================================
+-- 21. DATA VERSIONS (Per-faculty version behind conditional GETs)
+-- ============================================
+CREATE TABLE data_versions (
+    user_id UUID PRIMARY KEY,
+    tenant_id VARCHAR(50) NOT NULL DEFAULT 'default',
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- ============================================
+-- 22. TENANTS (Institutions served by this deployment)
+-- Every other table carries tenant_id; single-institution installs
+-- keep everything in the 'default' tenant.
+-- ============================================
+CREATE TABLE tenants (
+    id VARCHAR(50) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO tenants (id, name) VALUES ('default', 'Default Institution') ON CONFLICT (id) DO NOTHING;
+
 -- ============================================
 -- INDEXES FOR PERFORMANCE
 -- ============================================
 CREATE INDEX idx_admins_email ON admins(email);
 CREATE INDEX idx_faculty_users_email ON faculty_users(email);
-CREATE INDEX idx_faculty_users_employee_id ON faculty_users(employee_id);
-CREATE INDEX idx_publications_academic_year ON publications(academic_year);
-CREATE INDEX idx_awards_academic_year ON awards(academic_year);
-CREATE INDEX idx_research_projects_academic_year ON research_projects(academic_year);
-CREATE INDEX idx_patents_academic_year ON patents(academic_year);
-CREATE INDEX idx_conferences_academic_year ON conferences(academic_year);
+CREATE UNIQUE INDEX idx_faculty_users_tenant_employee_id ON faculty_users(tenant_id, employee_id);
+CREATE INDEX idx_publications_tenant_academic_year ON publications(tenant_id, academic_year);
+CREATE INDEX idx_awards_tenant_academic_year ON awards(tenant_id, academic_year);
+CREATE INDEX idx_research_projects_tenant_academic_year ON research_projects(tenant_id, academic_year);
+CREATE INDEX idx_patents_tenant_academic_year ON patents(tenant_id, academic_year);
+CREATE INDEX idx_conferences_tenant_academic_year ON conferences(tenant_id, academic_year);
+CREATE INDEX idx_faculty_profiles_tenant_department ON faculty_profiles(tenant_id, department);
+CREATE INDEX idx_refresh_tokens_family_id ON refresh_tokens(family_id);
+CREATE UNIQUE INDEX idx_activity_rollups_key ON activity_rollups(user_id, academic_year, metric);
+CREATE INDEX idx_activity_rollups_tenant ON activity_rollups(tenant_id, academic_year);
+-- Per-faculty reads; every request filters on its tenant first
+CREATE INDEX idx_faculty_profiles_tenant_user ON faculty_profiles(tenant_id, user_id);
+CREATE INDEX idx_previous_work_tenant_user ON previous_work(tenant_id, user_id);
+CREATE INDEX idx_courses_taught_tenant_user ON courses_taught(tenant_id, user_id);
+CREATE INDEX idx_publications_tenant_user ON publications(tenant_id, user_id);
+CREATE INDEX idx_book_publications_tenant_user ON book_publications(tenant_id, user_id);
+CREATE INDEX idx_awards_tenant_user ON awards(tenant_id, user_id);
+CREATE INDEX idx_ict_creations_tenant_user ON ict_creations(tenant_id, user_id);
+CREATE INDEX idx_research_guidance_tenant_user ON research_guidance(tenant_id, user_id);
+CREATE INDEX idx_pg_dissertations_tenant_user ON pg_dissertations(tenant_id, user_id);
+CREATE INDEX idx_research_projects_tenant_user ON research_projects(tenant_id, user_id);
+CREATE INDEX idx_patents_tenant_user ON patents(tenant_id, user_id);
+CREATE INDEX idx_conferences_tenant_user ON conferences(tenant_id, user_id);
+CREATE INDEX idx_seminars_tenant_user ON seminars(tenant_id, user_id);
+CREATE INDEX idx_lectures_tenant_user ON lectures(tenant_id, user_id);
+CREATE INDEX idx_other_details_tenant_user ON other_details(tenant_id, user_id);
+CREATE INDEX idx_memberships_tenant_user ON memberships(tenant_id, user_id);
+-- Change tracking stays global: the in-memory replicas poll every tenant
+-- at once, and a sync window is small enough to filter by tenant
+CREATE INDEX idx_faculty_users_updated_at ON faculty_users(updated_at, id);
+CREATE INDEX idx_faculty_profiles_updated_at ON faculty_profiles(updated_at, id);
+CREATE INDEX idx_previous_work_updated_at ON previous_work(updated_at, id);
+CREATE INDEX idx_courses_taught_updated_at ON courses_taught(updated_at, id);
+CREATE INDEX idx_publications_updated_at ON publications(updated_at, id);
+CREATE INDEX idx_book_publications_updated_at ON book_publications(updated_at, id);
+CREATE INDEX idx_awards_updated_at ON awards(updated_at, id);
+CREATE INDEX idx_ict_creations_updated_at ON ict_creations(updated_at, id);
+CREATE INDEX idx_research_guidance_updated_at ON research_guidance(updated_at, id);
+CREATE INDEX idx_pg_dissertations_updated_at ON pg_dissertations(updated_at, id);
+CREATE INDEX idx_research_projects_updated_at ON research_projects(updated_at, id);
+CREATE INDEX idx_patents_updated_at ON patents(updated_at, id);
+CREATE INDEX idx_conferences_updated_at ON conferences(updated_at, id);
+CREATE INDEX idx_seminars_updated_at ON seminars(updated_at, id);
+CREATE INDEX idx_lectures_updated_at ON lectures(updated_at, id);
+CREATE INDEX idx_other_details_updated_at ON other_details(updated_at, id);
+CREATE INDEX idx_memberships_updated_at ON memberships(updated_at, id);
+CREATE INDEX idx_deleted_rows_deleted_at ON deleted_rows(deleted_at, id);
+
+-- ============================================
+-- ANALYTICS ROLLUPS
+-- Every insert/update/delete on an activity table adjusts the per
+-- faculty, per year counters in activity_rollups. TG_ARGV: metric name
+-- and, optionally, the column summed into amount_sum.
+-- ============================================
+CREATE OR REPLACE FUNCTION apply_activity_rollup() RETURNS TRIGGER AS $$
+DECLARE
+    v_metric TEXT := TG_ARGV[0];
+    v_amount_column TEXT := TG_ARGV[1];
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+        INSERT INTO activity_rollups (tenant_id, user_id, academic_year, metric, row_count, amount_sum)
+        VALUES (OLD.tenant_id, OLD.user_id, OLD.academic_year, v_metric, -1,
+                -COALESCE((to_jsonb(OLD) ->> v_amount_column)::NUMERIC, 0))
+        ON CONFLICT (user_id, academic_year, metric) DO UPDATE SET
+            row_count = activity_rollups.row_count + EXCLUDED.row_count,
+            amount_sum = activity_rollups.amount_sum + EXCLUDED.amount_sum,
+            updated_at = NOW();
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.user_id IS NOT NULL THEN
+        INSERT INTO activity_rollups (tenant_id, user_id, academic_year, metric, row_count, amount_sum)
+        VALUES (NEW.tenant_id, NEW.user_id, NEW.academic_year, v_metric, 1,
+                COALESCE((to_jsonb(NEW) ->> v_amount_column)::NUMERIC, 0))
+        ON CONFLICT (user_id, academic_year, metric) DO UPDATE SET
+            row_count = activity_rollups.row_count + EXCLUDED.row_count,
+            amount_sum = activity_rollups.amount_sum + EXCLUDED.amount_sum,
+            updated_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER publications_rollup AFTER INSERT OR UPDATE OR DELETE ON publications
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('publications');
+CREATE TRIGGER awards_rollup AFTER INSERT OR UPDATE OR DELETE ON awards
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('awards');
+CREATE TRIGGER patents_rollup AFTER INSERT OR UPDATE OR DELETE ON patents
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('patents');
+CREATE TRIGGER conferences_rollup AFTER INSERT OR UPDATE OR DELETE ON conferences
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('conferences');
+CREATE TRIGGER research_projects_rollup AFTER INSERT OR UPDATE OR DELETE ON research_projects
+    FOR EACH ROW EXECUTE FUNCTION apply_activity_rollup('research_projects', 'grant_amount');
+
+-- Rollups by department/designation; department changes apply immediately
+CREATE VIEW department_rollups AS
+SELECT r.tenant_id, p.department, p.designation, r.academic_year, r.metric,
+       SUM(r.row_count) AS row_count, SUM(r.amount_sum) AS amount_sum
+FROM activity_rollups r
+LEFT JOIN faculty_profiles p ON p.user_id = r.user_id
+GROUP BY r.tenant_id, p.department, p.designation, r.academic_year, r.metric
+HAVING SUM(r.row_count) > 0;
+
+-- ============================================
+-- CHANGE TRACKING (Sync change feed)
+-- updated_at is stamped by the database on every write and deletes
+-- leave a tombstone in deleted_rows, so /api/admin/sync/changes can
+-- page through everything changed since a watermark.
+-- ============================================
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_deleted_row() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO deleted_rows (tenant_id, table_name, row_id, user_id)
+    VALUES (OLD.tenant_id, TG_TABLE_NAME, OLD.id, (to_jsonb(OLD) ->> 'user_id')::UUID);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER faculty_users_updated_at BEFORE INSERT OR UPDATE ON faculty_users
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER faculty_users_tombstone AFTER DELETE ON faculty_users
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER faculty_profiles_updated_at BEFORE INSERT OR UPDATE ON faculty_profiles
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER faculty_profiles_tombstone AFTER DELETE ON faculty_profiles
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER previous_work_updated_at BEFORE INSERT OR UPDATE ON previous_work
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER previous_work_tombstone AFTER DELETE ON previous_work
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER courses_taught_updated_at BEFORE INSERT OR UPDATE ON courses_taught
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER courses_taught_tombstone AFTER DELETE ON courses_taught
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER publications_updated_at BEFORE INSERT OR UPDATE ON publications
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER publications_tombstone AFTER DELETE ON publications
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER book_publications_updated_at BEFORE INSERT OR UPDATE ON book_publications
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER book_publications_tombstone AFTER DELETE ON book_publications
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER awards_updated_at BEFORE INSERT OR UPDATE ON awards
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER awards_tombstone AFTER DELETE ON awards
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER ict_creations_updated_at BEFORE INSERT OR UPDATE ON ict_creations
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER ict_creations_tombstone AFTER DELETE ON ict_creations
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER research_guidance_updated_at BEFORE INSERT OR UPDATE ON research_guidance
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER research_guidance_tombstone AFTER DELETE ON research_guidance
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER pg_dissertations_updated_at BEFORE INSERT OR UPDATE ON pg_dissertations
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER pg_dissertations_tombstone AFTER DELETE ON pg_dissertations
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER research_projects_updated_at BEFORE INSERT OR UPDATE ON research_projects
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER research_projects_tombstone AFTER DELETE ON research_projects
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER patents_updated_at BEFORE INSERT OR UPDATE ON patents
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER patents_tombstone AFTER DELETE ON patents
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER conferences_updated_at BEFORE INSERT OR UPDATE ON conferences
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER conferences_tombstone AFTER DELETE ON conferences
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER seminars_updated_at BEFORE INSERT OR UPDATE ON seminars
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER seminars_tombstone AFTER DELETE ON seminars
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER lectures_updated_at BEFORE INSERT OR UPDATE ON lectures
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER lectures_tombstone AFTER DELETE ON lectures
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER other_details_updated_at BEFORE INSERT OR UPDATE ON other_details
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER other_details_tombstone AFTER DELETE ON other_details
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+CREATE TRIGGER memberships_updated_at BEFORE INSERT OR UPDATE ON memberships
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+CREATE TRIGGER memberships_tombstone AFTER DELETE ON memberships
+    FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+
+-- ============================================
+-- DATA VERSIONS (Conditional GETs)
+-- Any write to a faculty member's rows bumps their counter in
+-- data_versions, so read endpoints can build a strong ETag from one
+-- primary-key lookup and answer If-None-Match without querying the data.
+-- TG_ARGV: column holding the faculty user id.
+-- ============================================
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS TRIGGER AS $$
+DECLARE
+    v_owner_column TEXT := TG_ARGV[0];
+    v_old_owner UUID;
+    v_new_owner UUID;
+    v_tenant VARCHAR(50);
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        v_old_owner := (to_jsonb(OLD) ->> v_owner_column)::UUID;
+        v_tenant := OLD.tenant_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        v_new_owner := (to_jsonb(NEW) ->> v_owner_column)::UUID;
+        v_tenant := NEW.tenant_id;
+    END IF;
+    INSERT INTO data_versions (user_id, tenant_id, version)
+    SELECT DISTINCT owner, v_tenant, 1 FROM unnest(ARRAY[v_old_owner, v_new_owner]) AS owner
+    WHERE owner IS NOT NULL
+    ON CONFLICT (user_id) DO UPDATE SET
+        version = data_versions.version + 1,
+        updated_at = NOW();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER faculty_users_data_version AFTER INSERT OR UPDATE OR DELETE ON faculty_users
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('id');
+CREATE TRIGGER faculty_profiles_data_version AFTER INSERT OR UPDATE OR DELETE ON faculty_profiles
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER previous_work_data_version AFTER INSERT OR UPDATE OR DELETE ON previous_work
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER courses_taught_data_version AFTER INSERT OR UPDATE OR DELETE ON courses_taught
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER publications_data_version AFTER INSERT OR UPDATE OR DELETE ON publications
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER book_publications_data_version AFTER INSERT OR UPDATE OR DELETE ON book_publications
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER awards_data_version AFTER INSERT OR UPDATE OR DELETE ON awards
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER ict_creations_data_version AFTER INSERT OR UPDATE OR DELETE ON ict_creations
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER research_guidance_data_version AFTER INSERT OR UPDATE OR DELETE ON research_guidance
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER pg_dissertations_data_version AFTER INSERT OR UPDATE OR DELETE ON pg_dissertations
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER research_projects_data_version AFTER INSERT OR UPDATE OR DELETE ON research_projects
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER patents_data_version AFTER INSERT OR UPDATE OR DELETE ON patents
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER conferences_data_version AFTER INSERT OR UPDATE OR DELETE ON conferences
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER seminars_data_version AFTER INSERT OR UPDATE OR DELETE ON seminars
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER lectures_data_version AFTER INSERT OR UPDATE OR DELETE ON lectures
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER other_details_data_version AFTER INSERT OR UPDATE OR DELETE ON other_details
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+CREATE TRIGGER memberships_data_version AFTER INSERT OR UPDATE OR DELETE ON memberships
+    FOR EACH ROW EXECUTE FUNCTION bump_data_version('user_id');
+
+-- ============================================
+-- ACADEMIC-YEAR PARTITIONS
+-- The activity tables (those with an academic_year) are LIST-partitioned
+-- by academic_year, so queries for one year only scan that year's
+-- partition. A DEFAULT partition holds years without a partition of
+-- their own. partition_academic_years() gives every year found in the
+-- default partitions its own partition (run at the start of a year:
+-- python -m manage partition). drop_academic_year_partitions() removes a
+-- closed year after manage.py archive has copied it to Parquet. Moving
+-- rows between detached partitions and dropping a partition fire no row
+-- triggers, so the analytics rollups keep the year and no tombstones
+-- reach the sync feed. The faculty whose rows are dropped get their data
+-- version bumped instead.
+-- ============================================
+CREATE OR REPLACE FUNCTION activity_tables() RETURNS TEXT[] AS $$
+    SELECT ARRAY['publications', 'book_publications', 'awards', 'ict_creations', 'research_guidance',
+                 'research_projects', 'patents', 'conferences', 'seminars', 'lectures', 'other_details',
+                 'memberships'];
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION academic_year_partition(p_table TEXT, p_year TEXT) RETURNS TEXT AS $$
+    SELECT p_table || '_y' || regexp_replace(p_year, '[^A-Za-z0-9]+', '_', 'g');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Returns the number of partitions created
+CREATE OR REPLACE FUNCTION create_academic_year_partitions(p_year TEXT) RETURNS INTEGER AS $$
+DECLARE
+    v_table TEXT;
+    v_partition TEXT;
+    v_default TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    FOREACH v_table IN ARRAY activity_tables() LOOP
+        v_partition := academic_year_partition(v_table, p_year);
+        v_default := v_table || '_default';
+        CONTINUE WHEN to_regclass(v_partition) IS NOT NULL;
+        -- The year's rows may sit in the default partition, which may not
+        -- overlap a new partition: move them while it is detached
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', v_table, v_default);
+        EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', v_partition, v_table);
+        EXECUTE format('INSERT INTO %I SELECT * FROM %I WHERE academic_year = %L', v_partition, v_default, p_year);
+        EXECUTE format('DELETE FROM %I WHERE academic_year = %L', v_default, p_year);
+        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES IN (%L)', v_table, v_partition, p_year);
+        EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', v_table, v_default);
+        v_created := v_created + 1;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION partition_academic_years() RETURNS INTEGER AS $$
+DECLARE
+    v_table TEXT;
+    v_year TEXT;
+    v_years TEXT[] := '{}';
+    v_created INTEGER := 0;
+BEGIN
+    FOREACH v_table IN ARRAY activity_tables() LOOP
+        FOR v_year IN EXECUTE format('SELECT DISTINCT academic_year FROM %I', v_table || '_default') LOOP
+            v_years := array_append(v_years, v_year);
+        END LOOP;
+    END LOOP;
+    FOR v_year IN SELECT DISTINCT unnest(v_years) LOOP
+        v_created := v_created + create_academic_year_partitions(v_year);
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- p_expected: {table: rows archived} over all tenants; a table whose
+-- partition holds a different count (rows written after the archive was
+-- taken) aborts the whole drop. Returns the number of rows dropped.
+CREATE OR REPLACE FUNCTION drop_academic_year_partitions(p_year TEXT, p_expected JSONB) RETURNS BIGINT AS $$
+DECLARE
+    v_table TEXT;
+    v_partition TEXT;
+    v_rows BIGINT;
+    v_total BIGINT := 0;
+BEGIN
+    PERFORM create_academic_year_partitions(p_year);
+    FOREACH v_table IN ARRAY activity_tables() LOOP
+        v_partition := academic_year_partition(v_table, p_year);
+        EXECUTE format('LOCK TABLE %I IN SHARE MODE', v_partition);
+        EXECUTE format('SELECT count(*) FROM %I', v_partition) INTO v_rows;
+        IF v_rows <> COALESCE((p_expected ->> v_table)::BIGINT, 0) THEN
+            RAISE EXCEPTION '% has % rows for %, archive has %', v_table, v_rows, p_year,
+                COALESCE((p_expected ->> v_table)::BIGINT, 0);
+        END IF;
+        EXECUTE format('INSERT INTO data_versions (user_id, tenant_id, version)
+                        SELECT DISTINCT user_id, tenant_id, 1 FROM %I WHERE user_id IS NOT NULL
+                        ON CONFLICT (user_id) DO UPDATE SET
+                            version = data_versions.version + 1,
+                            updated_at = NOW()', v_partition);
+        EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', v_table, v_partition);
+        EXECUTE format('DROP TABLE %I', v_partition);
+        v_total := v_total + v_rows;
+    END LOOP;
+    RETURN v_total;
+END;
+$$ LANGUAGE plpgsql;
 
 -- ============================================
 -- ROW LEVEL SECURITY (RLS) POLICIES
@@ -301,6 +777,11 @@ ALTER TABLE faculty_profiles ENABLE ROW LEVEL SECURITY;
 ALTER TABLE publications ENABLE ROW LEVEL SECURITY;
 ALTER TABLE awards ENABLE ROW LEVEL SECURITY;
 ALTER TABLE research_projects ENABLE ROW LEVEL SECURITY;
+ALTER TABLE refresh_tokens ENABLE ROW LEVEL SECURITY;
+ALTER TABLE activity_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE deleted_rows ENABLE ROW LEVEL SECURITY;
+ALTER TABLE data_versions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE tenants ENABLE ROW LEVEL SECURITY;
 
 -- Allow all operations via service role (backend will use service key)
 CREATE POLICY "Service role has full access" ON admins FOR ALL USING (true);
@@ -309,6 +790,11 @@ CREATE POLICY "Service role has full access" ON faculty_profiles FOR ALL USING (
 CREATE POLICY "Service role has full access" ON publications FOR ALL USING (true);
 CREATE POLICY "Service role has full access" ON awards FOR ALL USING (true);
 CREATE POLICY "Service role has full access" ON research_projects FOR ALL USING (true);
+CREATE POLICY "Service role has full access" ON refresh_tokens FOR ALL USING (true);
+CREATE POLICY "Service role has full access" ON activity_rollups FOR ALL USING (true);
+CREATE POLICY "Service role has full access" ON deleted_rows FOR ALL USING (true);
+CREATE POLICY "Service role has full access" ON data_versions FOR ALL USING (true);
+CREATE POLICY "Service role has full access" ON tenants FOR ALL USING (true);
 
 -- ============================================
 -- STORAGE BUCKET (Profile Pictures)
@@ -337,6 +823,6 @@ ON storage.objects FOR DELETE
 USING (bucket_id = 'profile-pictures');
 
 -- ============================================
--- DONE! 18 Tables + 1 Storage Bucket created.
+-- DONE! 23 Tables + 1 Storage Bucket created.
 -- Run this in Supabase SQL Editor.
 -- ============================================
@@ -0,0 +1,63 @@
+"""
+Test fixtures - the app on a throwaway offline backend
+
+Configuration is read at import, so the environment points the app at a
+temporary SQLite database before anything imports it. Two tenants are
+seeded once per session with the benchmark data generator.
+"""
+import os
+import tempfile
+
+import pytest
+
+WORK_DIR = tempfile.mkdtemp(prefix="fms-tests-")
+os.environ.update({
+    "DATA_BACKEND": "local",
+    "LOCAL_DB_PATH": os.path.join(WORK_DIR, "tests.db"),
+    "LOCAL_STORAGE_DIR": os.path.join(WORK_DIR, "storage"),
+    "SHARED_CACHE_PATH": os.path.join(WORK_DIR, "shared_cache.db"),
+    "PROFILING_ENABLED": "true",
+    "PROFILES_DIR": os.path.join(WORK_DIR, "profiles"),
+})
+
+OTHER_TENANT = "tests-other"
+
+
+@pytest.fixture(scope="session")
+def faculty():
+    """Seeded faculty_users rows by tenant"""
+    from benchmarks import seed
+    from config import DEFAULT_TENANT
+    from database import supabase
+
+    return {
+        DEFAULT_TENANT: seed.seed(supabase, 3),
+        OTHER_TENANT: seed.seed(supabase, 2, tenant_id=OTHER_TENANT),
+    }
+
+
+@pytest.fixture(scope="session")
+def client(faculty):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def login(client):
+    """Log in with the seed password; returns the token response"""
+    from benchmarks import seed
+
+    def login(email: str) -> dict:
+        response = client.post("/api/login", json={"email": email, "password": seed.BENCH_PASSWORD})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return login
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
@@ -0,0 +1,89 @@
+"""
+Idempotency-Key handling of write requests
+"""
+import hashlib
+import json
+import uuid
+
+import pytest
+
+from config import DEFAULT_TENANT
+from services import idempotency, shared_cache
+from conftest import bearer
+
+PATH = "/api/faculty/publications"
+
+
+@pytest.fixture
+def user(faculty):
+    return faculty[DEFAULT_TENANT][2]
+
+
+@pytest.fixture
+def headers(login, user):
+    return bearer(login(user["email"]))
+
+
+def publication(title: str) -> bytes:
+    return json.dumps({"academic_year": "2024-2025", "title": title}).encode()
+
+
+def post(client, headers: dict, key: str, body: bytes):
+    return client.post(PATH, content=body,
+                       headers={**headers, "Content-Type": "application/json", "Idempotency-Key": key})
+
+
+def titles(client, headers: dict) -> list:
+    rows = client.get(PATH, headers=headers).json()["publications"]
+    return [row["title"] for row in rows]
+
+
+def test_retry_replays_the_stored_response(client, headers):
+    key = str(uuid.uuid4())
+    body = publication(f"Replayed {key}")
+
+    first = post(client, headers, key, body)
+    retry = post(client, headers, key, body)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers.get("idempotent-replayed") == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert titles(client, headers).count(f"Replayed {key}") == 1
+
+
+def test_key_reused_for_a_different_body_is_rejected(client, headers):
+    key = str(uuid.uuid4())
+    assert post(client, headers, key, publication("First body")).status_code == 200
+
+    response = post(client, headers, key, publication("Second body"))
+    assert response.status_code == 422
+    assert "Second body" not in titles(client, headers)
+
+
+def test_retry_while_the_original_runs_gets_409(client, headers, user):
+    key = str(uuid.uuid4())
+    body = publication(f"In flight {key}")
+    # The claim the original request holds while its endpoint runs
+    scope = {"method": "POST", "path": PATH}
+    shared_cache.add(idempotency._cache_key(user["id"], scope, key),
+                     {"fingerprint": hashlib.sha256(body).hexdigest()}, 60)
+
+    response = post(client, headers, key, body)
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+    assert f"In flight {key}" not in titles(client, headers)
+
+
+def test_keys_are_scoped_to_the_caller(client, headers, login, faculty):
+    key = str(uuid.uuid4())
+    other = bearer(login(faculty[DEFAULT_TENANT][0]["email"]))
+    assert post(client, headers, key, publication("Caller one")).status_code == 200
+
+    response = post(client, other, key, publication("Caller two"))
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+
+
+def test_malformed_key_is_rejected(client, headers):
+    assert post(client, headers, "bad key", publication("Malformed")).status_code == 400
@@ -0,0 +1,15 @@
+"""
+Import-time budget of the app (see benchmarks/startup.py for the breakdown)
+"""
+import tempfile
+
+from benchmarks import startup
+
+# Every worker boot imports main; keep it under a second on the offline backend
+IMPORT_BUDGET_MS = 1000
+
+
+def test_import_main_within_budget():
+    imports = startup.measure_imports(3, startup.offline_env(tempfile.mkdtemp(prefix="fms-startup-")))
+    assert imports["median_ms"] <= IMPORT_BUDGET_MS, imports["slowest"]
+    assert imports["lazy_imported"] == []
@@ -0,0 +1,56 @@
+"""
+An admin only ever sees their own tenant's faculty, data versions and profiles
+"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from config import DEFAULT_TENANT
+from conftest import OTHER_TENANT, bearer
+from services import etag_service
+
+
+@pytest.fixture
+def admin(login):
+    from benchmarks import seed
+
+    return bearer(login(seed.BENCH_ADMIN_EMAIL))
+
+
+def test_faculty_list_holds_only_the_callers_tenant(client, admin, faculty):
+    listed = {row["id"] for row in client.get("/api/admin/faculty", headers=admin).json()["faculty"]}
+
+    assert listed == {user["id"] for user in faculty[DEFAULT_TENANT]}
+
+
+def test_other_tenants_faculty_is_not_found(client, admin, faculty):
+    foreign = faculty[OTHER_TENANT][0]["id"]
+
+    assert client.get(f"/api/admin/faculty/{foreign}", headers=admin).status_code == 404
+    assert client.get(f"/api/admin/faculty/{uuid.uuid4()}", headers=admin).status_code == 404
+
+
+def test_etag_does_not_reveal_other_tenants_data_versions(client, admin, faculty):
+    foreign = faculty[OTHER_TENANT][0]["id"]
+    version = etag_service.current_version(OTHER_TENANT, foreign)
+    assert version > 0
+    path = f"/api/admin/faculty/{foreign}"
+    # The tag the caller would get if the lookup ignored the tenant
+    request = SimpleNamespace(url=SimpleNamespace(path=path, query=""))
+    guess = etag_service.make_etag(request, foreign, version, DEFAULT_TENANT)
+
+    assert client.get(path, headers={**admin, "If-None-Match": guess}).status_code == 404
+
+
+def test_profiles_are_listed_per_tenant(client, admin, login):
+    from benchmarks import seed
+
+    other = bearer(login(f"bench.admin@{seed.bench_domain(OTHER_TENANT)}"))
+    response = client.get("/api/admin/academic-years", headers={**other, "X-Profile": "1"})
+    name = response.headers["X-Profile-Id"]
+
+    assert name in {p["name"] for p in client.get("/api/admin/profiles", headers=other).json()["profiles"]}
+    assert name not in {p["name"] for p in client.get("/api/admin/profiles", headers=admin).json()["profiles"]}
+    assert client.get(f"/api/admin/profiles/{name}", headers=admin).status_code == 404
+    assert client.get(f"/api/admin/profiles/{name}", headers=other).status_code == 200
@@ -0,0 +1,72 @@
+"""
+Refresh token rotation, reuse detection and the multi-tab grace window
+"""
+import pytest
+
+from config import DEFAULT_TENANT
+from database import supabase
+from services import token_service
+
+
+@pytest.fixture
+def faculty_email(faculty):
+    return faculty[DEFAULT_TENANT][0]["email"]
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/api/refresh", json={"refresh_token": refresh_token})
+
+
+def test_refresh_rotates_the_token(client, login, faculty_email):
+    first = login(faculty_email)["refresh_token"]
+
+    response = refresh(client, first)
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+    assert second != first
+    assert response.json()["user_type"] == "faculty"
+
+    assert refresh(client, second).status_code == 200
+
+
+def test_reuse_within_grace_window_gets_the_same_successor(client, login, faculty_email):
+    first = login(faculty_email)["refresh_token"]
+
+    one_tab = refresh(client, first)
+    other_tab = refresh(client, first)
+
+    assert one_tab.status_code == other_tab.status_code == 200
+    assert one_tab.json()["refresh_token"] == other_tab.json()["refresh_token"]
+
+
+def test_reuse_after_grace_window_revokes_the_family(client, login, faculty_email, monkeypatch):
+    monkeypatch.setattr(token_service, "REFRESH_REUSE_GRACE_SECONDS", 0)
+    first = login(faculty_email)["refresh_token"]
+    second = refresh(client, first).json()["refresh_token"]
+
+    assert refresh(client, first).status_code == 401
+    # The legitimate holder is logged out too: the token may have been stolen
+    assert refresh(client, second).status_code == 401
+
+
+def test_logout_revokes_the_session(client, login, faculty_email):
+    tokens = login(faculty_email)
+    response = client.post("/api/logout", json={"refresh_token": tokens["refresh_token"]},
+                           headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert response.status_code == 200
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_deactivated_account_cannot_refresh(client, login, faculty):
+    user = faculty[DEFAULT_TENANT][1]
+    first = login(user["email"])["refresh_token"]
+    supabase.table("faculty_users").update({"is_active": False}).eq("id", user["id"]).execute()
+    try:
+        assert refresh(client, first).status_code == 401
+    finally:
+        supabase.table("faculty_users").update({"is_active": True}).eq("id", user["id"]).execute()
+
+
+def test_unknown_token_is_rejected(client):
+    assert refresh(client, "not-a-token").status_code == 401